@@ -0,0 +1,254 @@
+"""
+Бенчмарки публичных функций на синтетических выписках разного размера.
+
+Запуск: python -m benchmarks.run --sizes 10k,1m [--save-baseline] [--tolerance 0.25]
+
+Для каждой функции и размера измеряется лучшее время из нескольких запусков и пиковая память
+(tracemalloc) отдельного запуска. Результаты сравниваются с benchmarks/baseline.json: если время
+или память выросли больше чем на tolerance, бенчмарк помечается как регрессия и код возврата равен 1.
+Базовые значения зависят от машины, поэтому их нужно пересохранять при смене окружения.
+"""
+
+from __future__ import annotations
+
+import argparse
+import datetime
+import gc
+import json
+import logging
+import os
+import sys
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, NamedTuple, Optional
+
+import pandas as pd
+
+from src.currency import RateHistory, normalize_currency
+from src.main import convert_to_str_dict
+from src.query import TransactionIndex, TransactionQuery
+from src.reports import spending_by_category, spending_by_weekday, spending_by_workday
+from src.rollup import DailyRollup
+from src.services import analyze_cashback_categories, cashback_by_category, invest_savings_by_month
+from src.synthetic import generate_transactions
+from src.views import get_cards, get_top_transactions
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+DEFAULT_SIZES = "10k,1m"
+DEFAULT_TOLERANCE = 0.25
+REPORT_DATE = "2021-12-31"
+
+
+class Benchmark(NamedTuple):
+    """Функция, строящая измеряемый вызов по таблице транзакций, и наибольший размер выписки для нее."""
+
+    prepare: Callable[[pd.DataFrame], Callable[[], Any]]
+    max_rows: Optional[int] = None
+
+
+def _records(table: pd.DataFrame) -> Dict[str, List[Dict[Any, Any]]]:
+    return {"transactions": table.reset_index(drop=True).to_dict("records")}
+
+
+# FAILED-операции по карте *7197 в супермаркетах дороже 1000 рублей за последний квартал
+QUERY = (
+    TransactionQuery()
+    .status("FAILED")
+    .card("*7197")
+    .mcc("5411.0")
+    .amount(maximum=-1000)
+    .between(datetime.datetime(2021, 10, 1), datetime.datetime(2022, 1, 1))
+)
+
+
+BENCHMARKS: Dict[str, Benchmark] = {
+    "reports.spending_by_category": Benchmark(
+        lambda table: lambda: spending_by_category.__wrapped__(table, "Каршеринг", REPORT_DATE)
+    ),
+    "reports.spending_by_weekday": Benchmark(
+        lambda table: lambda: spending_by_weekday.__wrapped__(table, REPORT_DATE)
+    ),
+    "reports.spending_by_workday": Benchmark(
+        lambda table: lambda: spending_by_workday.__wrapped__(table, REPORT_DATE)
+    ),
+    "reports.spending_by_category[memoized]": Benchmark(
+        lambda table: lambda: spending_by_category(table, "Каршеринг", REPORT_DATE)
+    ),
+    "services.analyze_cashback_categories": Benchmark(
+        lambda table: lambda: analyze_cashback_categories({"transactions": table}, 2021, 12)
+    ),
+    "services.cashback_by_category": Benchmark(lambda table: lambda: cashback_by_category(table)),
+    "services.invest_savings_by_month": Benchmark(lambda table: lambda: invest_savings_by_month(table)),
+    "views.get_top_transactions": Benchmark(lambda table: lambda: get_top_transactions({"transactions": table})),
+    "views.get_cards": Benchmark(lambda table: lambda: get_cards({"transactions": table})),
+    "rollup.DailyRollup.from_transactions": Benchmark(lambda table: lambda: DailyRollup.from_transactions(table)),
+    "currency.normalize_currency": Benchmark(
+        lambda table: lambda: normalize_currency(table, RateHistory(cache_path=None), "RUB")
+    ),
+    "query.TransactionIndex": Benchmark(lambda table: lambda: TransactionIndex(table)),
+    "query.TransactionIndex.positions": Benchmark(
+        lambda table: (lambda index: lambda: index.positions(QUERY))(TransactionIndex(table))
+    ),
+    "main.convert_to_str_dict": Benchmark(
+        lambda table: (lambda data: lambda: convert_to_str_dict(data))(_records(table)), max_rows=1_000_000
+    ),
+}
+
+
+# Бенчмарк-ключ должен выполняться быстрее бенчмарка-значения на том же размере выписки
+FASTER_THAN = {"reports.spending_by_category[memoized]": "reports.spending_by_category"}
+
+
+def parse_size(size: str) -> int:
+    """
+    Разбирает размер выписки вида 10k, 1m или 250000.
+
+    Args:
+        size (str): Размер.
+
+    Returns:
+        int: Число строк.
+    """
+    multipliers = {"k": 1_000, "m": 1_000_000}
+    size = size.strip().lower()
+    if size[-1:] in multipliers:
+        return int(float(size[:-1]) * multipliers[size[-1]])
+    return int(size)
+
+
+def measure(call: Callable[[], Any], repeat: int) -> Dict[str, float]:
+    """
+    Измеряет лучшее время вызова и пиковую память отдельного вызова.
+
+    Args:
+        call (Callable[[], Any]): Измеряемый вызов.
+        repeat (int): Число запусков для измерения времени.
+
+    Returns:
+        Dict[str, float]: Время в секундах и пиковая память в мегабайтах.
+    """
+    call()
+    timings = []
+    for _ in range(repeat):
+        gc.collect()
+        started = time.perf_counter()
+        call()
+        timings.append(time.perf_counter() - started)
+    gc.collect()
+    tracemalloc.start()
+    try:
+        call()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return {"seconds": min(timings), "peak_mb": peak / 2**20}
+
+
+def run(sizes: List[int], names: Optional[List[str]] = None, repeat: int = 3, seed: int = 0) -> Dict[str, Any]:
+    """
+    Выполняет бенчмарки для всех размеров выписки.
+
+    Args:
+        sizes (List[int]): Размеры выписки.
+        names (Optional[List[str]]): Имена бенчмарков. Defaults to None — все.
+        repeat (int): Число запусков для измерения времени. Defaults to 3.
+        seed (int): Зерно генератора выписки. Defaults to 0.
+
+    Returns:
+        Dict[str, Any]: Результаты по ключам «имя@размер».
+    """
+    results: Dict[str, Any] = {}
+    for rows in sizes:
+        table = generate_transactions(rows, seed)
+        for name, benchmark in BENCHMARKS.items():
+            if names is not None and name not in names:
+                continue
+            if benchmark.max_rows is not None and rows > benchmark.max_rows:
+                continue
+            results[f"{name}@{rows}"] = measure(benchmark.prepare(table), repeat)
+        del table
+    return results
+
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    """
+    Находит регрессии относительно базовых значений.
+
+    Args:
+        results (Dict[str, Any]): Текущие результаты.
+        baseline (Dict[str, Any]): Базовые результаты.
+        tolerance (float): Допустимый относительный рост времени и памяти.
+
+    Returns:
+        List[str]: Описания регрессий.
+    """
+    regressions = []
+    for key, result in results.items():
+        if key not in baseline:
+            continue
+        for metric in ("seconds", "peak_mb"):
+            before, after = baseline[key][metric], result[metric]
+            if after > before * (1 + tolerance):
+                regressions.append(f"{key}: {metric} {before:.4g} -> {after:.4g} (+{(after / before - 1):.0%})")
+    return regressions
+
+
+def check_faster(results: Dict[str, Any]) -> List[str]:
+    """
+    Проверяет, что бенчмарки из FASTER_THAN быстрее тех, с которыми они сравниваются.
+
+    Например, попадание в кэш отчетов должно стоить меньше расчета отчета без кэша.
+
+    Args:
+        results (Dict[str, Any]): Текущие результаты.
+
+    Returns:
+        List[str]: Описания нарушений.
+    """
+    violations = []
+    for key, result in results.items():
+        name, rows = key.rsplit("@", 1)
+        reference = results.get(f"{FASTER_THAN.get(name)}@{rows}")
+        if reference is not None and result["seconds"] >= reference["seconds"]:
+            violations.append(
+                f"{key}: {result['seconds']:.4g} s не быстрее {FASTER_THAN[name]}@{rows}: {reference['seconds']:.4g} s"
+            )
+    return violations
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Бенчмарки на синтетических выписках")
+    parser.add_argument("--sizes", default=DEFAULT_SIZES, help="Размеры выписки через запятую, например 10k,1m,10m")
+    parser.add_argument("--only", default=None, help="Имена бенчмарков через запятую")
+    parser.add_argument("--repeat", type=int, default=3, help="Число запусков для измерения времени")
+    parser.add_argument("--baseline", default=BASELINE_PATH, help="Файл базовых значений")
+    parser.add_argument("--save-baseline", action="store_true", help="Сохранить результаты как базовые")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE, help="Допустимый рост, доля")
+    args = parser.parse_args([] if argv is None else argv)
+
+    logging.disable(logging.INFO)
+    sizes = [parse_size(size) for size in args.sizes.split(",")]
+    names = args.only.split(",") if args.only else None
+    results = run(sizes, names, args.repeat)
+    for key, result in results.items():
+        print(f"{key:<55} {result['seconds'] * 1000:>10.2f} ms {result['peak_mb']:>10.1f} MB")
+
+    baseline: Dict[str, Any] = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+    if args.save_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump({**baseline, **results}, f, ensure_ascii=False, indent=2, sort_keys=True)
+        return 0
+    regressions = compare(results, baseline, args.tolerance)
+    for regression in regressions:
+        print(f"РЕГРЕССИЯ {regression}")
+    violations = check_faster(results)
+    for violation in violations:
+        print(f"НАРУШЕНИЕ {violation}")
+    return 1 if regressions or violations else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -3,4 +3,23 @@ import os
 ROOT_DIR = os.path.dirname(__file__)
 
 DATA_DIR = os.path.join(ROOT_DIR, 'data')
-LOGS_DIR = os.path.join(ROOT_DIR, 'logs')
\ No newline at end of file
+LOGS_DIR = os.path.join(ROOT_DIR, 'logs')
+
+API_KEY = os.getenv('API_KEY', '02d04bda4326f77763e22e13426f9588')
+EXCHANGE_RATES_URL = 'https://api.exchangerate-api.com/v4/latest'
+STOCK_PRICES_URL = 'https://www.alphavantage.co/query'
+RATE_HISTORY_URL = 'https://www.cbr.ru/scripts/XML_dynamic.asp'
+REQUEST_TIMEOUT = float(os.getenv('REQUEST_TIMEOUT', '10'))
+BASE_CURRENCY = os.getenv('BASE_CURRENCY', 'RUB')
+
+CACHE_DIR = os.path.join(ROOT_DIR, '.cache')
+REPORT_CACHE_DIR = os.getenv('REPORT_CACHE_DIR')
+
+OUTPUT_DIR = os.path.join(ROOT_DIR, 'output')
+REPORTS_DIR = os.getenv('REPORTS_DIR', os.path.join(ROOT_DIR, 'reports'))
+
+METRICS_DIR = os.getenv('METRICS_DIR')
+PROFILE_DIR = os.getenv('PROFILE_DIR')
+
+SERVER_HOST = os.getenv('SERVER_HOST', '127.0.0.1')
+SERVER_PORT = int(os.getenv('SERVER_PORT', '8000'))
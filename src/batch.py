@@ -0,0 +1,254 @@
+from __future__ import annotations
+
+import argparse
+import datetime
+import json
+import logging
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, List, Optional, Sequence
+
+from config import OUTPUT_DIR
+from src.transactions import DATE_TIME_FORMAT, DEFAULT_REPORT_CATEGORY
+from src.writers import FILE_MODE
+
+logger = logging.getLogger(__name__)
+
+SUMMARY_FILE = "batch_summary.json"
+
+
+@dataclass(frozen=True)
+class BatchJob:
+    """Задание пакетной обработки: выписка, настройки и дата отчета одного пользователя."""
+
+    user: str
+    statement: str
+    settings: Dict[str, Any]
+    date: str
+
+
+@dataclass
+class JobResult:
+    """Результат задания: созданные файлы, время выполнения и ошибка, если задание не выполнено."""
+
+    user: str
+    ok: bool
+    seconds: float
+    outputs: List[str] = field(default_factory=list)
+    error: Optional[str] = None
+
+
+def load_manifest(manifest_path: str) -> List[BatchJob]:
+    """
+    Читает манифест пакетной обработки.
+
+    Манифест — JSON-список заданий с ключами «user», «statement», «settings» и «date». Настройки задаются
+    словарем или путем к JSON-файлу; относительные пути считаются от каталога манифеста.
+
+    Args:
+        manifest_path (str): Путь к манифесту.
+
+    Returns:
+        List[BatchJob]: Задания.
+    """
+    base_dir = os.path.dirname(os.path.abspath(manifest_path))
+    with open(manifest_path, "r", encoding="utf-8") as f:
+        entries = json.load(f)
+    jobs = []
+    for entry in entries:
+        settings = entry["settings"]
+        if isinstance(settings, str):
+            with open(os.path.join(base_dir, settings), "r", encoding="utf-8") as f:
+                settings = json.load(f)
+        jobs.append(
+            BatchJob(
+                user=str(entry["user"]),
+                statement=os.path.join(base_dir, entry["statement"]),
+                settings=settings,
+                date=entry["date"],
+            )
+        )
+    return jobs
+
+
+def _write(directory: str, file_name: str, content: str) -> str:
+    path = os.path.join(directory, file_name)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        os.fchmod(f.fileno(), FILE_MODE)
+        f.write(content)
+    os.replace(tmp_path, path)
+    return path
+
+
+def run_job(job: BatchJob, output_dir: str, store: Optional[str] = None) -> JobResult:
+    """
+    Строит дашборд и отчеты одного пользователя и сохраняет их в его каталог.
+
+    Ошибки не пробрасываются, а записываются в результат, чтобы не останавливать остальные задания.
+
+    Args:
+        job (BatchJob): Задание.
+        output_dir (str): Общий каталог результатов.
+        store (Optional[str]): Колоночное хранилище выписки. Defaults to None — выписка читается из файла.
+
+    Returns:
+        JobResult: Результат задания.
+    """
+    from src.column_store import open_column_store
+    from src.currency import normalize_currency
+    from src.loader import load_transactions
+    from src.reports import spending_by_category, spending_by_weekday, spending_by_workday
+    from src.rollup import DailyRollup
+    from src.services import analyze_cashback_categories
+    from src.views import get_json_response
+    from src.writers import write_reports
+
+    started = time.perf_counter()
+    outputs: List[str] = []
+    try:
+        if not job.user or os.path.basename(job.user) != job.user or job.user in (".", ".."):
+            raise ValueError(f"Недопустимое имя пользователя: {job.user!r}")
+        user_dir = os.path.join(output_dir, job.user)
+        os.makedirs(user_dir, exist_ok=True)
+        date_time = datetime.datetime.strptime(job.date, DATE_TIME_FORMAT)
+        report_date = date_time.strftime("%Y-%m-%d")
+
+        if store is not None:
+            transactions = open_column_store(store)
+        else:
+            transactions = normalize_currency(load_transactions(job.statement))
+        dashboard = get_json_response(date_time, {"transactions": transactions}, job.settings)
+        outputs.append(_write(user_dir, "dashboard.json", dashboard))
+        cashback = analyze_cashback_categories({"transactions": transactions}, date_time.year, date_time.month)
+        outputs.append(_write(user_dir, "cashback_categories.json", cashback))
+
+        rollup = DailyRollup.from_transactions(transactions)
+        category = job.settings.get("report_category", DEFAULT_REPORT_CATEGORY)
+        reports = {
+            "spending_by_category.json": spending_by_category(rollup, category, report_date),
+            "spending_by_weekday.json": spending_by_weekday(rollup, report_date),
+            "spending_by_workday.json": spending_by_workday(rollup, report_date),
+        }
+        outputs.extend(write_reports(reports, output_dir=user_dir).values())
+    except Exception as error:
+        logger.exception("Задание пользователя %s завершилось ошибкой", job.user)
+        return JobResult(job.user, False, time.perf_counter() - started, outputs, f"{type(error).__name__}: {error}")
+    return JobResult(job.user, True, time.perf_counter() - started, outputs)
+
+
+def _prefetch_market_data(jobs: Sequence[BatchJob]) -> Dict[str, Dict[str, Any]]:
+    from src.market_cache import get_market_data_cache
+
+    currencies = sorted({currency for job in jobs for currency in job.settings.get("user_currencies", [])})
+    stocks = sorted({stock for job in jobs for stock in job.settings.get("user_stocks", [])})
+    cache = get_market_data_cache()
+    cache.get_market_data(currencies, stocks)
+    return cache.snapshot()
+
+
+def _build_stores(jobs: Sequence[BatchJob]) -> Dict[str, str]:
+    from src.column_store import build_column_store
+
+    stores = {}
+    for statement in sorted({job.statement for job in jobs}):
+        try:
+            stores[statement] = build_column_store(statement)
+        except Exception as error:
+            logger.warning("Колоночное хранилище для %s не собрано: %s", statement, error)
+    return stores
+
+
+def _init_worker(market_entries: Dict[str, Dict[str, Any]]) -> None:
+    from src.market_cache import get_market_data_cache
+
+    logging.basicConfig(level=logging.WARNING)
+    get_market_data_cache().merge(market_entries)
+
+
+def run_batch(
+    jobs: Sequence[BatchJob], output_dir: str = OUTPUT_DIR, max_workers: Optional[int] = None
+) -> List[JobResult]:
+    """
+    Выполняет задания в пуле процессов и сохраняет сводку в batch_summary.json.
+
+    Курсы валют и цены акций для всех заданий запрашиваются один раз до запуска пула и передаются процессам.
+    Каждая выписка до запуска пула разбирается один раз в колоночное хранилище, которое процессы
+    открывают отображением в память, деля одну копию данных; если хранилище собрать не удалось,
+    задание читает выписку само.
+    Процессы запускаются методом spawn, чтобы не наследовать потоки HTTP-клиента родительского процесса.
+
+    Args:
+        jobs (Sequence[BatchJob]): Задания.
+        output_dir (str): Каталог результатов. Defaults to output.
+        max_workers (Optional[int]): Число процессов. Defaults to None — по числу ядер.
+
+    Returns:
+        List[JobResult]: Результаты в порядке заданий.
+    """
+    started = time.perf_counter()
+    os.makedirs(output_dir, exist_ok=True)
+    results: List[Optional[JobResult]] = [None] * len(jobs)
+    if jobs:
+        market_entries = _prefetch_market_data(jobs)
+        stores = _build_stores(jobs)
+        workers = min(max_workers or os.cpu_count() or 1, len(jobs))
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(workers, context, initializer=_init_worker, initargs=(market_entries,)) as pool:
+            futures = {
+                pool.submit(run_job, job, output_dir, stores.get(job.statement)): index
+                for index, job in enumerate(jobs)
+            }
+            for future in as_completed(futures):
+                index = futures[future]
+                try:
+                    result = future.result()
+                except Exception as error:
+                    result = JobResult(jobs[index].user, False, 0.0, error=f"{type(error).__name__}: {error}")
+                results[index] = result
+                if result.ok:
+                    logger.info("Задание %s выполнено за %.2f с", result.user, result.seconds)
+                else:
+                    logger.warning("Задание %s не выполнено: %s", result.user, result.error)
+    completed = [result for result in results if result is not None]
+    summary = {
+        "seconds": time.perf_counter() - started,
+        "succeeded": sum(result.ok for result in completed),
+        "failed": sum(not result.ok for result in completed),
+        "jobs": [asdict(result) for result in completed],
+    }
+    _write(output_dir, SUMMARY_FILE, json.dumps(summary, ensure_ascii=False, indent=2))
+    return completed
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Запускает пакетную обработку из командной строки.
+
+    Args:
+        argv (Optional[List[str]], optional): Аргументы командной строки. Defaults to None — без аргументов.
+
+    Returns:
+        int: Код завершения: 0, если все задания выполнены, иначе 1.
+    """
+    parser = argparse.ArgumentParser(description="Пакетное построение дашбордов и отчетов")
+    parser.add_argument("manifest", help="Путь к JSON-манифесту заданий")
+    parser.add_argument("--output-dir", default=OUTPUT_DIR, help="Каталог результатов")
+    parser.add_argument("--workers", type=int, default=None, help="Число процессов, по умолчанию — по числу ядер")
+    args = parser.parse_args([] if argv is None else argv)
+
+    logging.basicConfig(level=logging.INFO)
+    results = run_batch(load_manifest(args.manifest), args.output_dir, args.workers)
+    for result in results:
+        status = "OK" if result.ok else f"FAILED ({result.error})"
+        print(f"{result.user}: {status}, {result.seconds:.2f} с")
+    return 0 if all(result.ok for result in results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
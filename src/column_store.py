@@ -0,0 +1,228 @@
+from __future__ import annotations
+
+import datetime
+import json
+import logging
+import os
+import shutil
+import tempfile
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
+
+from config import BASE_CURRENCY
+from src.metrics import metrics, timed
+from src.transactions import DATE_INDEX, OPERATION_DATE, TransactionData, as_transaction_table
+
+if TYPE_CHECKING:
+    import pandas as pd
+    from numpy.typing import NDArray
+
+    from src.currency import RateHistory
+
+logger = logging.getLogger(__name__)
+
+STORE_SUFFIX = ".columns"
+STORE_VERSION = 2
+META_FILE = "meta.json"
+
+
+def get_store_path(file_path: str) -> str:
+    """
+    Возвращает путь к колоночному хранилищу, которое хранится рядом с исходным файлом.
+
+    Args:
+        file_path (str): Путь к файлу выписки.
+
+    Returns:
+        str: Путь к каталогу хранилища.
+    """
+    return file_path + STORE_SUFFIX
+
+
+def _source_key(file_path: str) -> Dict[str, Any]:
+    stat = os.stat(file_path)
+    return {"version": STORE_VERSION, "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+def _rates_key(history: RateHistory, currencies: List[str], end: Optional[str], base_currency: str) -> Dict[str, Any]:
+    last = datetime.date.max if end is None else datetime.date.fromisoformat(end)
+    return {
+        "base_currency": base_currency,
+        "currencies": currencies,
+        "end": end,
+        "fingerprint": history.fingerprint([*currencies, base_currency], last),
+    }
+
+
+def _used_rates_key(table: pd.DataFrame, history: RateHistory, base_currency: str) -> Dict[str, Any]:
+    from src.currency import ORIGINAL_CURRENCY
+
+    currencies = []
+    if ORIGINAL_CURRENCY in table.columns:
+        currencies = sorted(str(currency) for currency in table[ORIGINAL_CURRENCY].cat.categories)
+    dates = table[OPERATION_DATE].dropna() if OPERATION_DATE in table.columns else None
+    end = None if dates is None or dates.empty else dates.max().date().isoformat()
+    return _rates_key(history, currencies, end, base_currency)
+
+
+def _read_meta(directory: str) -> Optional[Dict[str, Any]]:
+    try:
+        with open(os.path.join(directory, META_FILE), "r", encoding="utf-8") as f:
+            meta: Dict[str, Any] = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return meta if meta.get("version") == STORE_VERSION else None
+
+
+def write_column_store(
+    transactions: TransactionData,
+    directory: str,
+    source: Optional[Dict[str, Any]] = None,
+    rates: Optional[Dict[str, Any]] = None,
+) -> str:
+    """
+    Сохраняет таблицу транзакций в колоночное хранилище.
+
+    Каждый столбец записывается в отдельный файл .npy: суммы — как есть, даты — как int64 в наносекундах,
+    категориальные и строковые столбцы — как коды, а их словарь значений — в meta.json. Хранилище
+    собирается во временном каталоге и подменяет прежнее целиком, поэтому читатели никогда не видят
+    наполовину записанные файлы, а процессы, уже открывшие прежнюю версию, дочитывают ее.
+
+    Args:
+        transactions (TransactionData): Таблица или список транзакций.
+        directory (str): Каталог хранилища.
+        source (Optional[Dict[str, Any]]): Ключ исходного файла для проверки актуальности. Defaults to None.
+        rates (Optional[Dict[str, Any]]): Ключ курсов, по которым пересчитаны суммы. Defaults to None.
+
+    Returns:
+        str: Путь к каталогу хранилища.
+    """
+    import numpy as np
+    import pandas as pd
+
+    table = as_transaction_table(transactions)
+    parent = os.path.dirname(os.path.abspath(directory))
+    os.makedirs(parent, exist_ok=True)
+    tmp_dir = tempfile.mkdtemp(dir=parent, prefix=".columns-")
+    try:
+        columns: List[Dict[str, Any]] = []
+        values: NDArray[Any]
+        for position, column in enumerate(table.columns):
+            series = table[column]
+            file_name = f"{position}.npy"
+            if pd.api.types.is_datetime64_any_dtype(series.dtype):
+                values = series.to_numpy().astype("datetime64[ns]").view(np.int64)
+                columns.append({"name": str(column), "kind": "datetime", "file": file_name})
+            elif pd.api.types.is_numeric_dtype(series.dtype) or pd.api.types.is_bool_dtype(series.dtype):
+                values = series.to_numpy()
+                columns.append({"name": str(column), "kind": "values", "file": file_name})
+            else:
+                if not isinstance(series.dtype, pd.CategoricalDtype):
+                    series = series.astype("category")
+                values = series.cat.codes.to_numpy()
+                categories = json.loads(json.dumps(series.cat.categories.tolist(), ensure_ascii=False, default=str))
+                columns.append(
+                    {"name": str(column), "kind": "categorical", "file": file_name, "categories": categories}
+                )
+            np.save(os.path.join(tmp_dir, file_name), np.ascontiguousarray(values), allow_pickle=False)
+        meta = {
+            "version": STORE_VERSION,
+            "rows": len(table),
+            "columns": columns,
+            "source": source,
+            "rates": rates,
+        }
+        with open(os.path.join(tmp_dir, META_FILE), "w", encoding="utf-8") as f:
+            json.dump(meta, f, ensure_ascii=False)
+        if os.path.isdir(directory):
+            stale_dir = tempfile.mkdtemp(dir=parent, prefix=".columns-stale-")
+            os.replace(directory, os.path.join(stale_dir, "store"))
+            os.replace(tmp_dir, directory)
+            shutil.rmtree(stale_dir, ignore_errors=True)
+        else:
+            os.replace(tmp_dir, directory)
+    except BaseException:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        raise
+    logger.info("Колоночное хранилище %s сохранено: %s транзакций", directory, len(table))
+    return directory
+
+
+@timed("column_store.open", rows=len)
+def open_column_store(directory: str) -> pd.DataFrame:
+    """
+    Открывает колоночное хранилище только для чтения без копирования данных.
+
+    Файлы столбцов отображаются в память, и таблица строится прямо над ними: процессы, открывшие одно
+    хранилище, делят одну копию данных в страничном кэше ОС. Столбцы таблицы доступны только для чтения,
+    поэтому функции, которые их меняют, должны работать с копией.
+
+    Args:
+        directory (str): Каталог хранилища.
+
+    Returns:
+        pd.DataFrame: Типизированная таблица транзакций.
+    """
+    import numpy as np
+    import pandas as pd
+
+    meta = _read_meta(directory)
+    if meta is None:
+        raise FileNotFoundError(f"Колоночное хранилище не найдено: {directory}")
+    data: Dict[str, Any] = {}
+    for column in meta["columns"]:
+        # Представление ndarray над отображенным в память файлом: данные не копируются
+        values = np.asarray(np.load(os.path.join(directory, column["file"]), mmap_mode="r", allow_pickle=False))
+        if column["kind"] == "datetime":
+            data[column["name"]] = values.view("datetime64[ns]")
+        elif column["kind"] == "categorical":
+            data[column["name"]] = pd.Categorical.from_codes(
+                values, categories=pd.Index(column["categories"]), validate=False
+            )
+        else:
+            data[column["name"]] = values
+    index = None
+    if OPERATION_DATE in data:
+        index = pd.DatetimeIndex(data[OPERATION_DATE], name=DATE_INDEX, copy=False)
+    table = pd.DataFrame(data, index=index, copy=False)
+    return as_transaction_table(table)
+
+
+def build_column_store(
+    file_path: str,
+    directory: Optional[str] = None,
+    history: Optional[RateHistory] = None,
+    base_currency: str = BASE_CURRENCY,
+) -> str:
+    """
+    Собирает колоночное хранилище для файла выписки, если оно отсутствует или устарело.
+
+    В хранилище записывается таблица с суммами в базовой валюте, поэтому процессам, которые его
+    открывают, не нужны ни разбор выписки, ни курсы валют. Хранилище привязано к размеру и времени
+    изменения выписки, базовой валюте и отпечатку курсов, по которым пересчитаны суммы, и пересобирается
+    при изменении любого из них.
+
+    Args:
+        file_path (str): Путь к файлу выписки.
+        directory (Optional[str]): Каталог хранилища. Defaults to None — рядом с выпиской.
+        history (Optional[RateHistory]): Курсы валют. Defaults to None — общий для процесса кэш курсов.
+        base_currency (str): Базовая валюта. Defaults to config.BASE_CURRENCY.
+
+    Returns:
+        str: Путь к каталогу хранилища.
+    """
+    from src.currency import get_rate_history, normalize_currency
+    from src.loader import load_transactions
+
+    directory = get_store_path(file_path) if directory is None else directory
+    history = get_rate_history() if history is None else history
+    source = _source_key(file_path)
+    meta = _read_meta(directory)
+    if meta is not None and meta.get("source") == source:
+        rates = meta.get("rates") or {}
+        current = _rates_key(history, rates.get("currencies", []), rates.get("end"), base_currency)
+        if rates == current:
+            metrics.record_cache("column_store", hit=True)
+            return directory
+    metrics.record_cache("column_store", hit=False)
+    table = normalize_currency(load_transactions(file_path), history, base_currency)
+    return write_column_store(table, directory, source, _used_rates_key(table, history, base_currency))
@@ -0,0 +1,385 @@
+from __future__ import annotations
+
+import datetime
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from config import BASE_CURRENCY, CACHE_DIR
+from src.loader import DEFAULT_STATEMENT_PATH, get_dataset, on_dataset_invalidated
+from src.market_data import MarketDataClient, get_market_data_client
+from src.metrics import metrics, timed
+from src.transactions import (
+    OPERATION_AMOUNT,
+    OPERATION_CURRENCY,
+    OPERATION_DATE,
+    PAYMENT_AMOUNT,
+    PAYMENT_CURRENCY,
+    TransactionData,
+    as_transaction_table,
+)
+
+if TYPE_CHECKING:
+    import numpy as np
+    import pandas as pd
+    from numpy.typing import NDArray
+
+logger = logging.getLogger(__name__)
+
+RUB = "RUB"
+
+# Внутренние коды валют ЦБ РФ для запроса динамики курсов
+CBR_CURRENCY_IDS = {
+    "USD": "R01235",
+    "EUR": "R01239",
+    "CNY": "R01375",
+    "TRY": "R01700J",
+    "GBP": "R01035",
+    "JPY": "R01820",
+    "CHF": "R01775",
+    "KZT": "R01335",
+    "BYN": "R01090B",
+    "AMD": "R01060",
+    "GEL": "R01210",
+    "AED": "R01230",
+    "THB": "R01675",
+    "CZK": "R01760",
+    "PLN": "R01565",
+}
+
+RATE_HISTORY_PATH = os.path.join(CACHE_DIR, "rate_history.json")
+
+# ЦБ РФ не устанавливает курс в выходные и праздники, поэтому период запроса расширяется назад,
+# чтобы для первой даты нашелся последний установленный курс
+LOOKBACK_DAYS = 14
+
+ORIGINAL_AMOUNT = "Сумма в валюте операции"
+ORIGINAL_CURRENCY = "Исходная валюта операции"
+
+
+class RateHistory:
+    """
+    Дневные курсы валют к рублю, сохраняемые на диске.
+
+    Для каждой валюты хранится непрерывный период, за который курсы уже получены, поэтому запрос
+    нового периода загружает только недостающие края, по одному запросу на край. Курсы разных валют
+    запрашиваются параллельно, а ошибки отдельных валют не прерывают получение остальных.
+    """
+
+    def __init__(
+        self,
+        client: Optional[MarketDataClient] = None,
+        cache_path: Optional[str] = RATE_HISTORY_PATH,
+        today: Callable[[], datetime.date] = datetime.date.today,
+    ) -> None:
+        self._client = client
+        self.cache_path = cache_path
+        self._today = today
+        self._lock = threading.Lock()
+        self._entries: Dict[str, Dict[str, Any]] = self._load()
+
+    @property
+    def client(self) -> MarketDataClient:
+        if self._client is None:
+            self._client = get_market_data_client()
+        return self._client
+
+    def _load(self) -> Dict[str, Dict[str, Any]]:
+        if self.cache_path is None or not os.path.exists(self.cache_path):
+            return {}
+        try:
+            with open(self.cache_path, "r", encoding="utf-8") as f:
+                entries: Dict[str, Dict[str, Any]] = json.load(f)
+            return entries
+        except (OSError, ValueError) as error:
+            logger.warning("Кэш курсов валют %s не прочитан: %s", self.cache_path, error)
+            return {}
+
+    def _save(self) -> None:
+        if self.cache_path is None:
+            return
+        with self._lock:
+            snapshot = json.dumps(self._entries)
+        directory = os.path.dirname(os.path.abspath(self.cache_path))
+        try:
+            os.makedirs(directory, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(snapshot)
+            os.replace(tmp_path, self.cache_path)
+        except OSError as error:
+            logger.warning("Кэш курсов валют %s не сохранен: %s", self.cache_path, error)
+
+    def _missing(
+        self, currency: str, start: datetime.date, end: datetime.date
+    ) -> List[Tuple[datetime.date, datetime.date]]:
+        entry = self._entries.get(currency)
+        if entry is None:
+            return [(start, end)]
+        covered_start = datetime.date.fromisoformat(entry["start"])
+        covered_end = datetime.date.fromisoformat(entry["end"])
+        ranges = []
+        if start < covered_start:
+            ranges.append((start, covered_start - datetime.timedelta(days=1)))
+        if end > covered_end:
+            ranges.append((covered_end + datetime.timedelta(days=1), end))
+        return ranges
+
+    def _store(
+        self, currency: str, start: datetime.date, end: datetime.date, rates: Iterable[Tuple[Any, float]]
+    ) -> None:
+        entry = self._entries.setdefault(currency, {"start": start.isoformat(), "end": end.isoformat(), "rates": {}})
+        entry["start"] = min(entry["start"], start.isoformat())
+        entry["end"] = max(entry["end"], end.isoformat())
+        entry["rates"].update((date.isoformat(), rate) for date, rate in rates)
+
+    def update(self, currencies: Iterable[str], start: datetime.date, end: datetime.date) -> None:
+        """
+        Загружает недостающие курсы валют за период.
+
+        Args:
+            currencies (Iterable[str]): Коды валют.
+            start (datetime.date): Начало периода включительно.
+            end (datetime.date): Конец периода включительно.
+        """
+        start = start - datetime.timedelta(days=LOOKBACK_DAYS)
+        end = min(end, self._today())
+        with self._lock:
+            pending = [
+                (currency, first, last)
+                for currency in sorted(set(currencies))
+                if currency != RUB
+                for first, last in self._missing(currency, start, end)
+                if first <= last
+            ]
+        if not pending:
+            return
+        futures = []
+        for currency, first, last in pending:
+            if currency not in CBR_CURRENCY_IDS:
+                logger.warning("Курс валюты %s не публикуется в справочнике ЦБ РФ", currency)
+                continue
+            futures.append(
+                (
+                    currency,
+                    first,
+                    last,
+                    self.client.submit(self.client.fetch_rate_history, CBR_CURRENCY_IDS[currency], first, last),
+                )
+            )
+        changed = False
+        for currency, first, last, future in futures:
+            try:
+                rates = future.result()
+            except Exception as error:
+                logger.warning("Не удалось получить курсы %s за %s — %s: %s", currency, first, last, error)
+                continue
+            with self._lock:
+                self._store(currency, first, last, rates)
+            changed = True
+        if changed:
+            self._save()
+
+    def fingerprint(self, currencies: Iterable[str], end: datetime.date) -> str:
+        """
+        Возвращает отпечаток сохраненных курсов валют, которые могут использоваться для операций по дату end.
+
+        Курсы после end не учитываются: они не влияют на пересчет более ранних операций, поэтому загрузка
+        курсов за новые даты не меняет отпечаток.
+
+        Args:
+            currencies (Iterable[str]): Коды валют.
+            end (datetime.date): Дата последней операции.
+
+        Returns:
+            str: Шестнадцатеричный отпечаток.
+        """
+        last = end.isoformat()
+        with self._lock:
+            payload = {
+                currency: sorted(
+                    (date, rate)
+                    for date, rate in self._entries.get(currency, {}).get("rates", {}).items()
+                    if date <= last
+                )
+                for currency in sorted(set(currencies) - {RUB})
+            }
+        return hashlib.sha256(json.dumps(payload).encode("utf-8")).hexdigest()
+
+    def rates(self, currencies: Iterable[str], start: datetime.date, end: datetime.date) -> pd.DataFrame:
+        """
+        Возвращает дневные курсы валют к рублю за период, при необходимости загружая недостающие.
+
+        Args:
+            currencies (Iterable[str]): Коды валют.
+            start (datetime.date): Начало периода включительно.
+            end (datetime.date): Конец периода включительно.
+
+        Returns:
+            pd.DataFrame: Таблица со столбцами «date», «currency» и «rate» (рублей за единицу), упорядоченная по дате.
+        """
+        import pandas as pd
+
+        currencies = sorted(set(currencies) - {RUB})
+        self.update(currencies, start, end)
+        frames = []
+        with self._lock:
+            for currency in currencies:
+                entry = self._entries.get(currency)
+                if entry is None or not entry["rates"]:
+                    continue
+                dates, values = zip(*sorted(entry["rates"].items()))
+                frames.append(
+                    pd.DataFrame({"date": pd.to_datetime(list(dates)), "currency": currency, "rate": list(values)})
+                )
+        if not frames:
+            return pd.DataFrame(
+                {
+                    "date": pd.Series(dtype="datetime64[ns]"),
+                    "currency": pd.Series(dtype=object),
+                    "rate": pd.Series(dtype="float64"),
+                }
+            )
+        table = pd.concat(frames, ignore_index=True)
+        return table.sort_values("date", kind="stable", ignore_index=True)
+
+
+def _rubles_per_unit(dates: NDArray[Any], currencies: NDArray[Any], rates: pd.DataFrame) -> NDArray[np.float64]:
+    """Находит для каждой операции последний установленный на ее дату курс валюты к рублю."""
+    import numpy as np
+    import pandas as pd
+
+    result = np.full(len(dates), np.nan)
+    result[currencies == RUB] = 1.0
+    foreign = np.flatnonzero(currencies != RUB)
+    if len(foreign) and len(rates):
+        left = pd.DataFrame({"date": dates[foreign], "currency": currencies[foreign].astype(object)})
+        merged = pd.merge_asof(left, rates, on="date", by="currency", direction="backward")
+        result[foreign] = merged["rate"].to_numpy(dtype="float64", na_value=np.nan)
+    return result
+
+
+@timed("normalize", rows=len)
+def normalize_currency(
+    transactions: TransactionData, history: Optional[RateHistory] = None, base_currency: str = BASE_CURRENCY
+) -> pd.DataFrame:
+    """
+    Приводит суммы всех операций к базовой валюте.
+
+    Операции в базовой валюте не меняются. Для операций, списанных в базовой валюте, берется
+    «Сумма платежа» — фактически списанная банком сумма. Остальные суммы пересчитываются по
+    официальному курсу на дату операции: курсы загружаются одним запросом на валюту и
+    сопоставляются с операциями через merge_asof, без обращений к API для отдельных строк.
+    Исходные сумма и валюта сохраняются в отдельных столбцах; операции, для которых курс не найден,
+    получают пустую сумму.
+
+    Args:
+        transactions (TransactionData): Таблица или список транзакций.
+        history (Optional[RateHistory]): Курсы валют. Defaults to None — общий для процесса кэш курсов.
+        base_currency (str): Базовая валюта. Defaults to config.BASE_CURRENCY.
+
+    Returns:
+        pd.DataFrame: Таблица транзакций с суммами в базовой валюте.
+    """
+    import numpy as np
+    import pandas as pd
+
+    table = as_transaction_table(transactions)
+    if ORIGINAL_AMOUNT in table.columns or OPERATION_CURRENCY not in table.columns:
+        return table
+
+    currencies = table[OPERATION_CURRENCY]
+    codes = currencies.cat.codes.to_numpy()
+    categories = currencies.cat.categories.astype(str)
+    amounts = table[OPERATION_AMOUNT].to_numpy(dtype="float64", na_value=np.nan)
+    in_base = codes == (categories.get_loc(base_currency) if base_currency in categories else -2)
+    in_base |= codes == -1
+    converted = np.where(in_base, amounts, np.nan)
+
+    if PAYMENT_CURRENCY in table.columns and PAYMENT_AMOUNT in table.columns:
+        payment_currencies = table[PAYMENT_CURRENCY].astype("category")
+        payment_categories = payment_currencies.cat.categories.astype(str)
+        if base_currency in payment_categories:
+            paid_in_base = payment_currencies.cat.codes.to_numpy() == payment_categories.get_loc(base_currency)
+            payments = table[PAYMENT_AMOUNT].to_numpy(dtype="float64", na_value=np.nan)
+            use_payment = ~in_base & paid_in_base & ~np.isnan(payments)
+            converted[use_payment] = payments[use_payment]
+
+    pending = np.flatnonzero(np.isnan(converted) & ~np.isnan(amounts))
+    if len(pending):
+        history = get_rate_history() if history is None else history
+        dates = table[OPERATION_DATE].to_numpy()[pending]
+        pending_currencies = categories.to_numpy()[codes[pending]]
+        start = pd.Timestamp(dates.min()).date()
+        end = pd.Timestamp(dates.max()).date()
+        rates = history.rates([*np.unique(pending_currencies), base_currency], start, end)
+        rubles = _rubles_per_unit(dates, pending_currencies, rates)
+        if base_currency != RUB:
+            rubles /= _rubles_per_unit(dates, np.full(len(pending), base_currency, dtype=object), rates)
+        converted[pending] = amounts[pending] * rubles
+
+    unresolved = int((np.isnan(converted) & ~np.isnan(amounts)).sum())
+    if unresolved:
+        logger.warning("Не найден курс для %s операций, их суммы не учитываются", unresolved)
+
+    base = pd.Categorical.from_codes(np.zeros(len(table), dtype="int8"), dtype=pd.CategoricalDtype([base_currency]))
+    columns: Dict[str, Any] = {
+        ORIGINAL_AMOUNT: table[OPERATION_AMOUNT],
+        ORIGINAL_CURRENCY: currencies,
+        OPERATION_AMOUNT: converted,
+        OPERATION_CURRENCY: base,
+    }
+    return table.assign(**columns)
+
+
+_history: Optional[RateHistory] = None
+_history_lock = threading.Lock()
+
+
+def get_rate_history() -> RateHistory:
+    """
+    Возвращает общий для процесса кэш курсов валют, создавая его при первом обращении.
+
+    Returns:
+        RateHistory: Кэш курсов валют.
+    """
+    global _history
+    with _history_lock:
+        if _history is None:
+            _history = RateHistory()
+        return _history
+
+
+_normalized: Dict[str, pd.DataFrame] = {}
+_normalized_lock = threading.Lock()
+
+
+def get_normalized_dataset(file_path: str = DEFAULT_STATEMENT_PATH) -> pd.DataFrame:
+    """
+    Возвращает общий для процесса набор транзакций с суммами в базовой валюте.
+
+    Args:
+        file_path (str): Путь к файлу выписки. Defaults to data/operations.xlsx.
+
+    Returns:
+        pd.DataFrame: Типизированная таблица транзакций в базовой валюте.
+    """
+    key = os.path.abspath(file_path)
+    with _normalized_lock:
+        metrics.record_cache("normalized_dataset", hit=key in _normalized)
+        if key not in _normalized:
+            _normalized[key] = normalize_currency(get_dataset(file_path))
+        return _normalized[key]
+
+
+@on_dataset_invalidated
+def _invalidate_normalized(key: Optional[str]) -> None:
+    with _normalized_lock:
+        if key is None:
+            _normalized.clear()
+        else:
+            _normalized.pop(key, None)
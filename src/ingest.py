@@ -0,0 +1,204 @@
+from __future__ import annotations
+
+import glob
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import TYPE_CHECKING, List, Optional, Sequence
+
+from src.loader import load_transactions
+from src.metrics import timed
+from src.streaming import CSV_EXTENSIONS, EXCEL_EXTENSIONS, NDJSON_EXTENSIONS, iter_transaction_chunks
+from src.transactions import CARD_NUMBER, DESCRIPTION, OPERATION_AMOUNT, OPERATION_DATE, concat_tables
+
+if TYPE_CHECKING:
+    import numpy as np
+    import pandas as pd
+    from numpy.typing import NDArray
+
+logger = logging.getLogger(__name__)
+
+STATEMENT_EXTENSIONS = EXCEL_EXTENSIONS + CSV_EXTENSIONS + NDJSON_EXTENSIONS
+
+# Транзакция считается повторной, если совпадают дата операции, карта, сумма и описание
+DEDUP_COLUMNS = [OPERATION_DATE, CARD_NUMBER, OPERATION_AMOUNT, DESCRIPTION]
+
+
+def find_statements(patterns: Sequence[str]) -> List[str]:
+    """
+    Находит файлы выписок по путям, каталогам и шаблонам glob.
+
+    Из каталога берутся все файлы поддерживаемых форматов (.xlsx, .csv, .ndjson), шаблон раскрывается
+    через glob. Пути возвращаются без повторов в порядке сортировки, чтобы результат загрузки не зависел
+    от порядка обхода файловой системы.
+
+    Args:
+        patterns (Sequence[str]): Пути к файлам, каталоги или шаблоны glob.
+
+    Returns:
+        List[str]: Пути к файлам выписок.
+    """
+    paths = set()
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            candidates = [os.path.join(pattern, name) for name in os.listdir(pattern)]
+        elif glob.has_magic(pattern):
+            candidates = glob.glob(pattern)
+        else:
+            if not os.path.isfile(pattern):
+                raise FileNotFoundError(f"Файл выписки не найден: {pattern}")
+            paths.add(pattern)
+            continue
+        paths.update(
+            path
+            for path in candidates
+            if os.path.isfile(path) and os.path.splitext(path)[1].lower() in STATEMENT_EXTENSIONS
+        )
+    if not paths:
+        raise FileNotFoundError(f"Выписки не найдены: {', '.join(patterns)}")
+    return sorted(paths)
+
+
+def read_statement_file(file_path: str) -> pd.DataFrame:
+    """
+    Читает выписку любого поддерживаемого формата в типизированную таблицу.
+
+    Файлы Excel читаются через колоночный кэш load_transactions, CSV и NDJSON — потоково.
+
+    Args:
+        file_path (str): Путь к файлу выписки.
+
+    Returns:
+        pd.DataFrame: Типизированная таблица транзакций.
+    """
+    if os.path.splitext(file_path)[1].lower() in EXCEL_EXTENSIONS:
+        return load_transactions(file_path)
+    return concat_tables(list(iter_transaction_chunks(file_path)))
+
+
+def transaction_hashes(table: pd.DataFrame) -> NDArray[np.uint64]:
+    """
+    Вычисляет 64-битный хэш каждой транзакции по дате операции, карте, сумме и описанию.
+
+    Хэш категориальных столбцов зависит от значений, а не от кодов категорий, поэтому одинаковые
+    транзакции из разных выписок получают одинаковый хэш.
+
+    Args:
+        table (pd.DataFrame): Типизированная таблица транзакций.
+
+    Returns:
+        NDArray[np.uint64]: Хэши строк таблицы.
+    """
+    import numpy as np
+    import pandas as pd
+
+    columns = [column for column in DEDUP_COLUMNS if column in table.columns]
+    return np.asarray(pd.util.hash_pandas_object(table[columns], index=False), dtype=np.uint64)
+
+
+class StatementIngest:
+    """
+    Накопитель транзакций из нескольких выписок без повторов.
+
+    Выписки выгружаются по карте за месяц, и их периоды пересекаются. Хэши уже принятых транзакций
+    хранятся в отсортированном массиве; для новой таблицы хэши ищутся в нем двоичным поиском, и в
+    накопитель попадают только ранее не встречавшиеся строки. Повторная загрузка уже принятой выписки
+    сводится к хэшированию ее строк: общая таблица не пересобирается.
+
+    Повторы внутри одной выписки не удаляются — это разные операции с одинаковыми реквизитами.
+    """
+
+    def __init__(self) -> None:
+        import numpy as np
+
+        self._hashes: NDArray[np.uint64] = np.empty(0, dtype=np.uint64)
+        self._frames: List[pd.DataFrame] = []
+        self._table: Optional[pd.DataFrame] = None
+        self.duplicates = 0
+
+    def __len__(self) -> int:
+        return sum(len(frame) for frame in self._frames)
+
+    def _seen(self, hashes: NDArray[np.uint64]) -> NDArray[np.bool_]:
+        import numpy as np
+
+        if not len(self._hashes):
+            return np.zeros(len(hashes), dtype=bool)
+        positions = np.minimum(np.searchsorted(self._hashes, hashes), len(self._hashes) - 1)
+        seen: NDArray[np.bool_] = self._hashes[positions] == hashes
+        return seen
+
+    def add(self, table: pd.DataFrame) -> int:
+        """
+        Добавляет транзакции, которых еще нет в накопителе.
+
+        Args:
+            table (pd.DataFrame): Типизированная таблица транзакций.
+
+        Returns:
+            int: Число добавленных транзакций.
+        """
+        import numpy as np
+
+        hashes = transaction_hashes(table)
+        fresh = ~self._seen(hashes)
+        added = int(fresh.sum())
+        self.duplicates += len(table) - added
+        if added:
+            self._frames.append(table if added == len(table) else table[fresh])
+            self._hashes = np.union1d(self._hashes, hashes[fresh])
+            self._table = None
+        return added
+
+    def ingest(self, patterns: Sequence[str], max_workers: Optional[int] = None) -> int:
+        """
+        Читает выписки в пуле процессов и добавляет их транзакции в накопитель.
+
+        Выписки добавляются в порядке сортировки путей, поэтому результат не зависит от того, какой
+        процесс закончил чтение раньше. Одна выписка или один процесс читаются без пула.
+
+        Args:
+            patterns (Sequence[str]): Пути к файлам, каталоги или шаблоны glob.
+            max_workers (Optional[int]): Число процессов. Defaults to None — по числу ядер.
+
+        Returns:
+            int: Число добавленных транзакций.
+        """
+        paths = find_statements(patterns)
+        workers = min(max_workers or os.cpu_count() or 1, len(paths))
+        if workers == 1:
+            tables = map(read_statement_file, paths)
+            added = sum(self.add(table) for table in tables)
+        else:
+            context = multiprocessing.get_context("spawn")
+            with ProcessPoolExecutor(workers, context) as pool:
+                added = sum(self.add(table) for table in pool.map(read_statement_file, paths))
+        logger.info("Прочитано выписок: %s, добавлено транзакций: %s", len(paths), added)
+        return added
+
+    @property
+    def table(self) -> pd.DataFrame:
+        """Объединенная таблица принятых транзакций, отсортированная по дате операции."""
+        if self._table is None:
+            if not self._frames:
+                raise ValueError("Выписки еще не загружены")
+            self._table = concat_tables(self._frames)
+        return self._table
+
+
+@timed("ingest", rows=len)
+def load_statements(patterns: Sequence[str], max_workers: Optional[int] = None) -> pd.DataFrame:
+    """
+    Загружает несколько выписок в одну типизированную таблицу без повторяющихся транзакций.
+
+    Args:
+        patterns (Sequence[str]): Пути к файлам, каталоги или шаблоны glob.
+        max_workers (Optional[int]): Число процессов. Defaults to None — по числу ядер.
+
+    Returns:
+        pd.DataFrame: Типизированная таблица транзакций.
+    """
+    ingest = StatementIngest()
+    ingest.ingest(patterns, max_workers)
+    return ingest.table
@@ -0,0 +1,286 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Tuple
+
+from config import DATA_DIR
+from src.metrics import metrics, timed
+from src.transactions import to_transaction_table
+
+if TYPE_CHECKING:
+    import pandas as pd
+    from numpy.typing import NDArray
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_STATEMENT_PATH = os.path.join(DATA_DIR, "operations.xlsx")
+
+CACHE_SUFFIX = ".cache.npz"
+CACHE_VERSION = 2
+
+_HASH_CHUNK_SIZE = 1 << 20
+
+
+def get_cache_path(file_path: str) -> str:
+    """
+    Возвращает путь к колоночному кэшу, который хранится рядом с исходным файлом.
+
+    Args:
+        file_path (str): Путь к файлу с транзакциями.
+
+    Returns:
+        str: Путь к файлу кэша.
+    """
+    return file_path + CACHE_SUFFIX
+
+
+def file_fingerprint(file_path: str) -> str:
+    """
+    Вычисляет SHA-256 содержимого файла, читая его блоками.
+
+    Args:
+        file_path (str): Путь к файлу.
+
+    Returns:
+        str: Шестнадцатеричный хэш содержимого.
+    """
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(_HASH_CHUNK_SIZE), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _source_key(file_path: str, content_hash: Optional[str] = None) -> Dict[str, Any]:
+    stat = os.stat(file_path)
+    return {
+        "version": CACHE_VERSION,
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        "sha256": content_hash if content_hash is not None else file_fingerprint(file_path),
+    }
+
+
+def _encode_frame(frame: pd.DataFrame) -> Dict[str, NDArray[Any]]:
+    import numpy as np
+    import pandas as pd
+
+    arrays: Dict[str, NDArray[Any]] = {}
+    columns = []
+    for position, column in enumerate(frame.columns):
+        series = frame[column]
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            arrays[f"c{position}_codes"] = series.cat.codes.to_numpy().astype(np.int32)
+            categories = series.cat.categories
+            if pd.api.types.is_numeric_dtype(categories.dtype):
+                arrays[f"c{position}_uniques"] = categories.to_numpy()
+            else:
+                arrays[f"c{position}_uniques"] = np.asarray([str(value) for value in categories], dtype=str)
+            columns.append({"name": str(column), "kind": "categorical"})
+        elif pd.api.types.is_datetime64_any_dtype(series.dtype):
+            arrays[f"c{position}_values"] = series.to_numpy().astype("datetime64[ns]").view(np.int64)
+            columns.append({"name": str(column), "kind": "datetime"})
+        elif pd.api.types.is_numeric_dtype(series.dtype) or pd.api.types.is_bool_dtype(series.dtype):
+            arrays[f"c{position}_values"] = series.to_numpy()
+            columns.append({"name": str(column), "kind": "values"})
+        else:
+            codes, uniques = pd.factorize(series, use_na_sentinel=True)
+            arrays[f"c{position}_codes"] = codes.astype(np.int32)
+            arrays[f"c{position}_uniques"] = np.asarray([str(value) for value in uniques], dtype=str)
+            columns.append({"name": str(column), "kind": "dictionary"})
+    arrays["columns"] = np.asarray(json.dumps(columns, ensure_ascii=False))
+    return arrays
+
+
+def _decode_frame(arrays: Any) -> pd.DataFrame:
+    import numpy as np
+    import pandas as pd
+
+    columns = json.loads(str(arrays["columns"]))
+    data: Dict[str, Any] = {}
+    for position, column in enumerate(columns):
+        if column["kind"] == "values":
+            data[column["name"]] = arrays[f"c{position}_values"]
+        elif column["kind"] == "datetime":
+            data[column["name"]] = arrays[f"c{position}_values"].view("datetime64[ns]")
+        elif column["kind"] == "categorical":
+            data[column["name"]] = pd.Categorical.from_codes(
+                arrays[f"c{position}_codes"], categories=arrays[f"c{position}_uniques"]
+            )
+        else:
+            codes = arrays[f"c{position}_codes"]
+            uniques = arrays[f"c{position}_uniques"].astype(object)
+            values = np.empty(len(codes), dtype=object)
+            present = codes >= 0
+            values[present] = uniques[codes[present]]
+            values[~present] = np.nan
+            data[column["name"]] = values
+    return pd.DataFrame(data)
+
+
+def _read_cache(cache_path: str) -> Optional[Tuple[Dict[str, Any], pd.DataFrame]]:
+    import numpy as np
+
+    try:
+        with np.load(cache_path, allow_pickle=False) as npz:
+            key = json.loads(str(npz["key"]))
+            return key, _decode_frame(npz)
+    except (OSError, KeyError, ValueError) as error:
+        logger.warning("Кэш %s не прочитан: %s", cache_path, error)
+        return None
+
+
+def _read_cache_key(cache_path: str) -> Optional[Dict[str, Any]]:
+    import numpy as np
+
+    try:
+        with np.load(cache_path, allow_pickle=False) as npz:
+            key: Dict[str, Any] = json.loads(str(npz["key"]))
+            return key
+    except (OSError, KeyError, ValueError):
+        return None
+
+
+def _write_cache(cache_path: str, frame: pd.DataFrame, key: Dict[str, Any]) -> None:
+    import numpy as np
+
+    arrays = _encode_frame(frame)
+    arrays["key"] = np.asarray(json.dumps(key))
+    directory = os.path.dirname(os.path.abspath(cache_path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            np.savez(f, **arrays)
+        os.replace(tmp_path, cache_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def read_statement(file_path: str) -> pd.DataFrame:
+    """
+    Читает файл выписки без использования кэша.
+
+    Args:
+        file_path (str): Путь к файлу выписки.
+
+    Returns:
+        pd.DataFrame: Данные о транзакциях.
+    """
+    import pandas as pd
+
+    return pd.read_excel(file_path)
+
+
+@timed("load", rows=len)
+def load_transactions(file_path: str = DEFAULT_STATEMENT_PATH, use_cache: bool = True) -> pd.DataFrame:
+    """
+    Загружает типизированную таблицу транзакций из файла выписки через колоночный кэш.
+
+    При первом чтении файл разбирается целиком, приводится к типизированной таблице и сохраняется
+    в формате .npz рядом с исходником.
+    Кэш привязан к размеру, времени изменения и хэшу содержимого файла и пересобирается только
+    при изменении выписки.
+
+    Args:
+        file_path (str): Путь к файлу выписки. Defaults to data/operations.xlsx.
+        use_cache (bool): Использовать ли кэш. Defaults to True.
+
+    Returns:
+        pd.DataFrame: Типизированная таблица транзакций.
+    """
+    if not use_cache:
+        return to_transaction_table(read_statement(file_path))
+
+    cache_path = get_cache_path(file_path)
+    stat = os.stat(file_path)
+    cached_key = _read_cache_key(cache_path) if os.path.exists(cache_path) else None
+
+    content_hash: Optional[str] = None
+    if cached_key is not None and cached_key.get("version") == CACHE_VERSION:
+        if cached_key.get("size") == stat.st_size and cached_key.get("mtime_ns") == stat.st_mtime_ns:
+            cached = _read_cache(cache_path)
+            if cached is not None:
+                logger.info("Транзакции загружены из кэша %s", cache_path)
+                metrics.record_cache("statement", hit=True)
+                return to_transaction_table(cached[1])
+        elif cached_key.get("size") == stat.st_size:
+            content_hash = file_fingerprint(file_path)
+            if content_hash == cached_key.get("sha256"):
+                cached = _read_cache(cache_path)
+                if cached is not None:
+                    _write_cache(cache_path, cached[1], _source_key(file_path, content_hash))
+                    logger.info("Транзакции загружены из кэша %s", cache_path)
+                    metrics.record_cache("statement", hit=True)
+                    return to_transaction_table(cached[1])
+
+    logger.info("Разбор файла %s и сборка кэша", file_path)
+    metrics.record_cache("statement", hit=False)
+    frame = to_transaction_table(read_statement(file_path))
+    try:
+        _write_cache(cache_path, frame, _source_key(file_path, content_hash))
+    except OSError as error:
+        logger.warning("Не удалось сохранить кэш %s: %s", cache_path, error)
+    return frame
+
+
+_datasets: Dict[str, pd.DataFrame] = {}
+_datasets_lock = threading.Lock()
+_invalidation_hooks: List[Callable[[Optional[str]], None]] = []
+
+
+def on_dataset_invalidated(hook: Callable[[Optional[str]], None]) -> Callable[[Optional[str]], None]:
+    """
+    Регистрирует функцию, которая вызывается при сбросе набора транзакций.
+
+    Функция получает абсолютный путь к сброшенной выписке или None, если сброшены все наборы.
+
+    Args:
+        hook (Callable[[Optional[str]], None]): Функция для вызова.
+
+    Returns:
+        Callable[[Optional[str]], None]: Та же функция, что позволяет использовать регистрацию как декоратор.
+    """
+    _invalidation_hooks.append(hook)
+    return hook
+
+
+def get_dataset(file_path: str = DEFAULT_STATEMENT_PATH) -> pd.DataFrame:
+    """
+    Возвращает общий для процесса набор транзакций, загружая его при первом обращении.
+
+    Args:
+        file_path (str): Путь к файлу выписки. Defaults to data/operations.xlsx.
+
+    Returns:
+        pd.DataFrame: Типизированная таблица транзакций.
+    """
+    key = os.path.abspath(file_path)
+    with _datasets_lock:
+        metrics.record_cache("dataset", hit=key in _datasets)
+        if key not in _datasets:
+            _datasets[key] = load_transactions(file_path)
+        return _datasets[key]
+
+
+def invalidate_dataset(file_path: Optional[str] = None) -> None:
+    """
+    Сбрасывает загруженный набор транзакций, чтобы следующее обращение прочитало его заново.
+
+    Args:
+        file_path (Optional[str], optional): Путь к файлу выписки. Defaults to None — сбросить все наборы.
+    """
+    key = None if file_path is None else os.path.abspath(file_path)
+    with _datasets_lock:
+        if key is None:
+            _datasets.clear()
+        else:
+            _datasets.pop(key, None)
+    for hook in _invalidation_hooks:
+        hook(key)
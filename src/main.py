@@ -1,13 +1,20 @@
+import argparse
+import contextlib
 import datetime
 import json
 import logging
 import os
 import sys
-from typing import Dict, Hashable, List, TypedDict
-
-import pandas as pd
-
+from typing import Any, Dict, Hashable, List, Optional, TypedDict
+
+from config import METRICS_DIR, PROFILE_DIR
+from src.currency import get_normalized_dataset, normalize_currency
+from src.ingest import load_statements
+from src.market_cache import get_market_data_cache
+from src.metrics import metrics, profile
+from src.pipeline import DEFAULT_WORKERS, Pipeline, Stage
 from src.reports import save_report_to_file_decorator, spending_by_category, spending_by_weekday, spending_by_workday
+from src.rollup import DailyRollup, get_daily_rollup
 from src.services import analyze_cashback_categories
 from src.views import get_json_response
 
@@ -28,57 +35,187 @@ def convert_to_str_dict(data: Dict[str, List[Dict[Hashable, str]]]) -> Dict[str,
     return result
 
 
-def main() -> None:
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """
+    Разбирает аргументы командной строки.
+
+    Args:
+        argv (Optional[List[str]], optional): Аргументы командной строки. Defaults to None — без аргументов.
+
+    Returns:
+        argparse.Namespace: Разобранные аргументы.
+    """
+    parser = argparse.ArgumentParser(description="Анализ транзакций из файла operations.xlsx")
+    parser.add_argument(
+        "--date",
+        default="2022-01-01 12:00:00",
+        help="Текущая дата и время в формате YYYY-MM-DD HH:MM:SS",
+    )
+    parser.add_argument(
+        "--statements",
+        nargs="+",
+        help="Файлы, каталоги или шаблоны glob выписок; по умолчанию читается data/operations.xlsx",
+    )
+    parser.add_argument(
+        "--timings",
+        action="store_true",
+        help="Вывести время этапов и критический путь",
+    )
+    parser.add_argument(
+        "--metrics-dir",
+        default=METRICS_DIR,
+        help="Каталог для метрик этапов в форматах JSON и Prometheus",
+    )
+    parser.add_argument(
+        "--profile-dir",
+        default=PROFILE_DIR,
+        help="Каталог для результатов профилирования cProfile и tracemalloc",
+    )
+    return parser.parse_args([] if argv is None else argv)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
     """
     Основная функция программы.
     В этой функции происходит чтение данных из файла operations.xlsx, загрузка настроек пользователя из
     файла user_settings.json,
     получение JSON-ответа с информацией о приветствии, картах, топ-5 транзакциях, курсах валют и ценах акций,
     а также анализ категорий кэшбэка для заданного года и месяца.
+
+    Args:
+        argv (Optional[List[str]], optional): Аргументы командной строки. Defaults to None — без аргументов.
     """
-    logging.basicConfig(level=logging.INFO)
-    logger = logging.getLogger(__name__)
+    args = parse_args(argv)
 
-    logger.info("Начало работы программы")
+    logging.basicConfig(level=logging.INFO)
+    profiling = profile(args.profile_dir) if args.profile_dir else contextlib.nullcontext()
+    # cProfile видит только вызывающий поток, поэтому при профилировании этапы выполняются по очереди
+    max_workers = 1 if args.profile_dir else DEFAULT_WORKERS
+    with profiling:
+        pipeline = run(datetime.datetime.strptime(args.date, "%Y-%m-%d %H:%M:%S"), args.statements, max_workers)
+    if args.timings:
+        print(pipeline.format_timings())
+        print(metrics.format_stages())
+    if args.metrics_dir:
+        metrics.write(args.metrics_dir)
+
+
+def build_pipeline(date_time: datetime.datetime, statements: Optional[List[str]] = None) -> Pipeline:
+    """
+    Описывает программу как конвейер этапов с зависимостями.
 
-    date_time = datetime.datetime.strptime("2022-01-01 12:00:00", "%Y-%m-%d %H:%M:%S")
-    logger.info(f"Текущая дата и время: {date_time}")
+    Выписка читается один раз, и таблица передается всем этапам. Запрос рыночных данных зависит только от
+    настроек и выполняется одновременно с чтением выписки; отчеты строятся и сохраняются параллельно
+    с дашбордом и анализом кэшбэка.
 
-    file_path = os.path.join(os.path.dirname(__file__), "..", "data", "operations.xlsx")
-    data = pd.read_excel(file_path)
-    logger.info("Данные из файла operations.xlsx прочитаны успешно")
+    Args:
+        date_time (datetime.datetime): Текущая дата и время.
+        statements (Optional[List[str]], optional): Файлы, каталоги или шаблоны glob выписок.
+            Defaults to None — data/operations.xlsx.
 
-    file_path = os.path.join(os.path.dirname(__file__), "..", "user_settings.json")
-    with open(file_path, "r") as f:
-        user_settings = json.load(f)
-    logger.info("Настройки пользователя загружены успешно")
+    Returns:
+        Pipeline: Конвейер программы.
+    """
+    logger = logging.getLogger(__name__)
+    year = 2022
+    month = 1
 
-    data_dict: Dict[str, List[Dict[str, str]]] = convert_to_str_dict(
-        {"cards": [], "transactions": [{str(k): str(v) for k, v in row.items()} for row in data.to_dict("records")]}
+    def load_dataset() -> Any:
+        if statements:
+            data = normalize_currency(load_statements(statements))
+            logger.info("Данные из выписок прочитаны успешно")
+        else:
+            data = get_normalized_dataset()
+            logger.info("Данные из файла operations.xlsx прочитаны успешно")
+        return data
+
+    def load_settings() -> Dict[str, Any]:
+        file_path = os.path.join(os.path.dirname(__file__), "..", "user_settings.json")
+        with open(file_path, "r") as f:
+            user_settings: Dict[str, Any] = json.load(f)
+        logger.info("Настройки пользователя загружены успешно")
+        return user_settings
+
+    def fetch_market_data(user_settings: Dict[str, Any]) -> None:
+        get_market_data_cache().get_market_data(user_settings["user_currencies"], user_settings["user_stocks"])
+
+    def build_dashboard(data: Any, user_settings: Dict[str, Any], _: None) -> str:
+        json_response = get_json_response(date_time, {"transactions": data}, user_settings)
+        logger.info("JSON-ответ получен успешно")
+        return json_response
+
+    def analyze_cashback(data: Any) -> str:
+        cashback_categories = analyze_cashback_categories({"transactions": data}, year, month)
+        logger.info("Анализ категорий кэшбэка завершен успешно")
+        return cashback_categories
+
+    def build_rollup(data: Any) -> DailyRollup:
+        return DailyRollup.from_transactions(data) if statements else get_daily_rollup()
+
+    def print_results(json_response: str, cashback_categories: str) -> None:
+        print(json_response)
+        print(cashback_categories)
+
+    return Pipeline(
+        [
+            Stage("dataset", load_dataset),
+            Stage("settings", load_settings),
+            Stage("market_data", fetch_market_data, ("settings",)),
+            Stage("dashboard", build_dashboard, ("dataset", "settings", "market_data")),
+            Stage("cashback", analyze_cashback, ("dataset",)),
+            Stage("rollup", build_rollup, ("dataset",)),
+            Stage(
+                "spending_by_category",
+                lambda rollup: save_report_to_file_decorator("spending_by_category.json")(spending_by_category)(
+                    rollup, "Каршеринг", "2022-03-01"
+                ),
+                ("rollup",),
+            ),
+            Stage(
+                "spending_by_weekday",
+                lambda rollup: save_report_to_file_decorator("spending_by_weekday.json")(spending_by_weekday)(
+                    rollup, "2022-03-01"
+                ),
+                ("rollup",),
+            ),
+            Stage(
+                "spending_by_workday",
+                lambda rollup: save_report_to_file_decorator("spending_by_workday.json")(spending_by_workday)(
+                    rollup, "2022-03-01"
+                ),
+                ("rollup",),
+            ),
+            Stage("output", print_results, ("dashboard", "cashback")),
+        ]
     )
-    json_response = get_json_response(date_time, data_dict, user_settings)
-    logger.info("JSON-ответ получен успешно")
-    print(json_response)
 
-    year = 2022
-    month = 1
-    data_dict_2: Dict[str, List[Dict[str, str]]] = convert_to_str_dict({"transactions": data.to_dict("records")})
-    cashback_categories = analyze_cashback_categories(data_dict_2, year, month)
-    logger.info("Анализ категорий кэшбэка завершен успешно")
-    print(cashback_categories)
 
-    data_dir = os.path.join(os.path.dirname(__file__), "..", "data")
+def run(
+    date_time: datetime.datetime, statements: Optional[List[str]] = None, max_workers: int = DEFAULT_WORKERS
+) -> Pipeline:
+    """
+    Выполняет все этапы программы для заданной даты.
+
+    Args:
+        date_time (datetime.datetime): Текущая дата и время.
+        statements (Optional[List[str]], optional): Файлы, каталоги или шаблоны glob выписок.
+            Defaults to None — data/operations.xlsx.
+        max_workers (int): Число потоков для независимых этапов. Defaults to 4.
+
+    Returns:
+        Pipeline: Выполненный конвейер с временем этапов.
+    """
+    logger = logging.getLogger(__name__)
+
+    logger.info("Начало работы программы")
+    logger.info("Текущая дата и время: %s", date_time)
 
-    transactions = pd.read_excel(os.path.join(data_dir, "operations.xlsx"))
-    spending_by_category_report = spending_by_category(transactions, "Каршеринг", "2022-03-01")
-    spending_by_weekday_report = spending_by_weekday(transactions, "2022-03-01")
-    spending_by_workday_report = spending_by_workday(transactions, "2022-03-01")
-    save_report_to_file_decorator("spending_by_category.json")(spending_by_category_report)
-    save_report_to_file_decorator("spending_by_weekday.json")(spending_by_weekday_report)
-    save_report_to_file_decorator("spending_by_workday.json")(spending_by_workday_report)
+    pipeline = build_pipeline(date_time, statements)
+    pipeline.run(max_workers)
 
     logger.info("Программа завершена успешно")
+    return pipeline
 
 
 if __name__ == "__main__":
-    main()
+    main(sys.argv[1:])
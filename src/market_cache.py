@@ -0,0 +1,304 @@
+from __future__ import annotations
+
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from config import BASE_CURRENCY, CACHE_DIR
+from src.market_data import MarketDataClient, get_market_data_client, rate_from_table
+from src.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+MARKET_CACHE_PATH = os.path.join(CACHE_DIR, "market_data.json")
+
+RATES_SOURCE = "rates"
+STOCKS_SOURCE = "stocks"
+
+DEFAULT_TTLS = {RATES_SOURCE: 3600.0, STOCKS_SOURCE: 300.0}
+DEFAULT_MAX_STALE = 24 * 3600.0
+
+
+class MarketDataCache:
+    """
+    Кэш рыночных данных поверх MarketDataClient.
+
+    Значения хранятся в памяти и в JSON-файле на диске и живут в течение TTL своего источника.
+    Устаревшие значения (не старше max_stale) отдаются сразу и обновляются в фоне, а одновременные
+    запросы одного и того же ключа объединяются в один HTTP-запрос.
+    """
+
+    def __init__(
+        self,
+        client: Optional[MarketDataClient] = None,
+        cache_path: Optional[str] = MARKET_CACHE_PATH,
+        ttls: Optional[Dict[str, float]] = None,
+        max_stale: float = DEFAULT_MAX_STALE,
+        base_currency: str = BASE_CURRENCY,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self._client = client
+        self.cache_path = cache_path
+        self.ttls = {**DEFAULT_TTLS, **(ttls or {})}
+        self.max_stale = max_stale
+        self.base_currency = base_currency
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries: Dict[str, Dict[str, Any]] = self._load()
+        self._in_flight: Dict[str, Future[Any]] = {}
+        self.stats = {"hits": 0, "stale_hits": 0, "misses": 0, "refreshes": 0, "errors": 0}
+
+    @property
+    def client(self) -> MarketDataClient:
+        if self._client is None:
+            self._client = get_market_data_client()
+        return self._client
+
+    def _load(self) -> Dict[str, Dict[str, Any]]:
+        if self.cache_path is None or not os.path.exists(self.cache_path):
+            return {}
+        try:
+            with open(self.cache_path, "r", encoding="utf-8") as f:
+                entries: Dict[str, Dict[str, Any]] = json.load(f)
+            return entries
+        except (OSError, ValueError) as error:
+            logger.warning("Кэш рыночных данных %s не прочитан: %s", self.cache_path, error)
+            return {}
+
+    def _save(self) -> None:
+        if self.cache_path is None:
+            return
+        with self._lock:
+            snapshot = json.dumps(self._entries)
+        directory = os.path.dirname(os.path.abspath(self.cache_path))
+        try:
+            os.makedirs(directory, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(snapshot)
+            os.replace(tmp_path, self.cache_path)
+        except OSError as error:
+            logger.warning("Кэш рыночных данных %s не сохранен: %s", self.cache_path, error)
+
+    def _fetch(self, key: str, fetch: Callable[[], Any]) -> Any:
+        """Выполняет запрос, объединяя одновременные запросы одного ключа."""
+        with self._lock:
+            future = self._in_flight.get(key)
+            owner = future is None
+            if future is None:
+                future = Future()
+                self._in_flight[key] = future
+        if not owner:
+            return future.result()
+        try:
+            value = fetch()
+        except BaseException as error:
+            with self._lock:
+                self.stats["errors"] += 1
+                self._in_flight.pop(key, None)
+            future.set_exception(error)
+            raise
+        with self._lock:
+            self._entries[key] = {"value": value, "fetched_at": self._clock()}
+            self._in_flight.pop(key, None)
+        self._save()
+        future.set_result(value)
+        return value
+
+    def _refresh(self, key: str, fetch: Callable[[], Any]) -> None:
+        with self._lock:
+            if key in self._in_flight:
+                return
+            self.stats["refreshes"] += 1
+
+        def refresh() -> None:
+            try:
+                self._fetch(key, fetch)
+            except Exception as error:
+                logger.warning("Не удалось обновить %s: %s", key, error)
+
+        self.client.submit(refresh)
+
+    def get(self, source: str, symbol: str, fetch: Callable[[], Any]) -> Any:
+        """
+        Возвращает значение из кэша или получает его через fetch.
+
+        Args:
+            source (str): Источник данных, определяющий TTL.
+            symbol (str): Символ внутри источника.
+            fetch (Callable[[], Any]): Функция получения значения.
+
+        Returns:
+            Any: Значение.
+        """
+        key = f"{source}:{symbol}"
+        ttl = self.ttls[source]
+        with self._lock:
+            entry = self._entries.get(key)
+            age = self._clock() - entry["fetched_at"] if entry is not None else None
+            if entry is not None and age is not None and age < ttl:
+                self.stats["hits"] += 1
+                return entry["value"]
+            stale = entry is not None and age is not None and age < ttl + self.max_stale
+            self.stats["stale_hits" if stale else "misses"] += 1
+        if entry is not None and stale:
+            self._refresh(key, fetch)
+            return entry["value"]
+        try:
+            return self._fetch(key, fetch)
+        except Exception:
+            if entry is not None:
+                logger.warning("Используется устаревшее значение %s", key)
+                return entry["value"]
+            raise
+
+    def get_rate_table(self) -> Dict[str, float]:
+        """
+        Возвращает таблицу курсов базовой валюты.
+
+        Returns:
+            Dict[str, float]: Количество единиц каждой валюты за единицу базовой валюты.
+        """
+        table: Dict[str, float] = self.get(
+            RATES_SOURCE, self.base_currency, lambda: self.client.fetch_rate_table(self.base_currency)
+        )
+        return table
+
+    def get_stock_price(self, stock: str) -> float:
+        """
+        Возвращает цену акции.
+
+        Ошибка получения цены пробрасывается и не попадает в кэш; если есть устаревшее значение, возвращается оно.
+
+        Args:
+            stock (str): Тикер акции.
+
+        Returns:
+            float: Цена акции.
+        """
+        price: float = self.get(STOCKS_SOURCE, stock, lambda: self.client.fetch_stock_price(stock))
+        return price
+
+    def get_currency_rates(self, currencies: Sequence[str]) -> List[Dict[str, Any]]:
+        """
+        Возвращает курсы валют, используя одну таблицу базовой валюты для всех валют.
+
+        Args:
+            currencies (Sequence[str]): Коды валют.
+
+        Returns:
+            List[Dict[str, Any]]: Стоимость единицы каждой валюты в базовой валюте; 0.0, если курс недоступен.
+        """
+        if not currencies:
+            return []
+        try:
+            table = self.get_rate_table()
+        except Exception as error:
+            logger.warning("Не удалось получить курсы валют к %s: %s", self.base_currency, error)
+            table = {}
+        return [{"currency": currency, "rate": rate_from_table(table, currency)} for currency in currencies]
+
+    def get_stock_prices(self, stocks: Sequence[str]) -> List[Dict[str, Any]]:
+        """
+        Параллельно возвращает цены акций.
+
+        Args:
+            stocks (Sequence[str]): Тикеры акций.
+
+        Returns:
+            List[Dict[str, Any]]: Список цен акций; для недоступных акций цена равна 0.0.
+        """
+        futures = [(stock, self.client.submit(self.get_stock_price, stock)) for stock in stocks]
+        prices = []
+        for stock, future in futures:
+            try:
+                price = future.result()
+            except Exception as error:
+                logger.warning("Не удалось получить цену для %s: %s", stock, error)
+                price = 0.0
+            prices.append({"stock": stock, "price": price})
+        return prices
+
+    def get_market_data(
+        self, currencies: Sequence[str], stocks: Sequence[str]
+    ) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+        """
+        Одновременно возвращает курсы валют и цены акций.
+
+        Args:
+            currencies (Sequence[str]): Коды валют.
+            stocks (Sequence[str]): Тикеры акций.
+
+        Returns:
+            Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]: Курсы валют и цены акций.
+        """
+        rates_future = self.client.submit(self.get_currency_rates, currencies)
+        stock_prices = self.get_stock_prices(stocks)
+        return rates_future.result(), stock_prices
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Возвращает копию всех записей кэша, например для передачи в другие процессы.
+
+        Returns:
+            Dict[str, Dict[str, Any]]: Записи кэша со значениями и временем получения.
+        """
+        with self._lock:
+            return {key: dict(entry) for key, entry in self._entries.items()}
+
+    def merge(self, entries: Dict[str, Dict[str, Any]]) -> None:
+        """
+        Добавляет записи из снимка другого кэша, сохраняя более свежие значения.
+
+        Args:
+            entries (Dict[str, Dict[str, Any]]): Записи кэша.
+        """
+        with self._lock:
+            for key, entry in entries.items():
+                current = self._entries.get(key)
+                if current is None or current["fetched_at"] < entry["fetched_at"]:
+                    self._entries[key] = dict(entry)
+
+    def hit_rate(self) -> float:
+        """
+        Возвращает долю обращений, обслуженных из кэша.
+
+        Returns:
+            float: Доля попаданий, включая устаревшие значения.
+        """
+        with self._lock:
+            served = self.stats["hits"] + self.stats["stale_hits"]
+            total = served + self.stats["misses"]
+        return served / total if total else 0.0
+
+
+def _market_cache_stats() -> Dict[str, int]:
+    if _cache is None:
+        return {"hits": 0, "misses": 0}
+    with _cache._lock:
+        stats = dict(_cache.stats)
+    return {"hits": stats["hits"] + stats["stale_hits"], "misses": stats["misses"]}
+
+
+_cache: Optional[MarketDataCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_market_data_cache() -> MarketDataCache:
+    """
+    Возвращает общий для процесса кэш рыночных данных, создавая его при первом обращении.
+
+    Returns:
+        MarketDataCache: Кэш рыночных данных.
+    """
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = MarketDataCache()
+            metrics.register_cache("market_data", _market_cache_stats)
+        return _cache
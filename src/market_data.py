@@ -0,0 +1,252 @@
+from __future__ import annotations
+
+import datetime
+import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Sequence, Tuple, TypeVar
+
+from config import API_KEY, BASE_CURRENCY, EXCHANGE_RATES_URL, RATE_HISTORY_URL, REQUEST_TIMEOUT, STOCK_PRICES_URL
+from src.metrics import timed
+
+if TYPE_CHECKING:
+    import requests
+
+logger = logging.getLogger(__name__)
+
+MAX_WORKERS = 8
+STOCK_CONCURRENCY = 2
+
+T = TypeVar("T")
+
+
+class MarketDataClient:
+    """
+    Клиент для параллельного получения курсов валют и цен акций.
+
+    Все запросы выполняются в пуле потоков через одну сессию requests с пулом keep-alive соединений.
+    Число одновременных запросов к Alpha Vantage ограничено, а ошибки отдельных символов не прерывают
+    получение остальных.
+    """
+
+    def __init__(
+        self,
+        exchange_rates_url: str = EXCHANGE_RATES_URL,
+        stock_prices_url: str = STOCK_PRICES_URL,
+        rate_history_url: str = RATE_HISTORY_URL,
+        api_key: str = API_KEY,
+        timeout: float = REQUEST_TIMEOUT,
+        max_workers: int = MAX_WORKERS,
+        stock_concurrency: int = STOCK_CONCURRENCY,
+    ) -> None:
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        self.exchange_rates_url = exchange_rates_url.rstrip("/")
+        self.stock_prices_url = stock_prices_url
+        self.rate_history_url = rate_history_url
+        self.api_key = api_key
+        self.timeout = timeout
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=max_workers, pool_maxsize=max_workers)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="market-data")
+        self._stock_slots = threading.BoundedSemaphore(stock_concurrency)
+
+    def __enter__(self) -> "MarketDataClient":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Останавливает пул потоков и закрывает соединения."""
+        self._executor.shutdown(wait=True)
+        self.session.close()
+
+    def _get_json(self, url: str, params: Optional[Dict[str, str]] = None) -> Any:
+        response: requests.Response = self.session.get(url, params=params, timeout=self.timeout)
+        response.raise_for_status()
+        return response.json()
+
+    @timed("http.rates")
+    def fetch_rate_table(self, base_currency: str = BASE_CURRENCY) -> Dict[str, float]:
+        """
+        Получает таблицу курсов всех валют относительно базовой валюты одним запросом.
+
+        Args:
+            base_currency (str): Код базовой валюты. Defaults to config.BASE_CURRENCY.
+
+        Returns:
+            Dict[str, float]: Количество единиц каждой валюты за единицу базовой валюты.
+        """
+        data = self._get_json(f"{self.exchange_rates_url}/{base_currency}")
+        return {str(currency): float(rate) for currency, rate in data["rates"].items()}
+
+    @timed("http.stocks")
+    def fetch_stock_price(self, stock: str) -> float:
+        """
+        Получает цену акции, соблюдая ограничение на число одновременных запросов к Alpha Vantage.
+
+        Args:
+            stock (str): Тикер акции.
+
+        Returns:
+            float: Цена акции.
+
+        Raises:
+            ValueError: Если в ответе нет цены, например при превышении лимита запросов Alpha Vantage.
+        """
+        params = {"function": "GLOBAL_QUOTE", "symbol": stock, "apikey": self.api_key}
+        with self._stock_slots:
+            data = self._get_json(self.stock_prices_url, params=params)
+        try:
+            return float(data["Global Quote"]["05. price"])
+        except (KeyError, ValueError, TypeError):
+            # Alpha Vantage отвечает кодом 200 и сообщением в «Note» или «Information» вместо котировки
+            message = (data.get("Note") or data.get("Information")) if isinstance(data, dict) else None
+            raise ValueError(f"В ответе нет цены акции {stock}: {message or data!r}") from None
+
+    @timed("http.rate_history")
+    def fetch_rate_history(
+        self, currency_id: str, start: datetime.date, end: datetime.date
+    ) -> List[Tuple[datetime.date, float]]:
+        """
+        Получает официальные курсы валюты ЦБ РФ за период одним запросом.
+
+        Args:
+            currency_id (str): Внутренний код валюты ЦБ РФ, например R01235 для доллара США.
+            start (datetime.date): Начало периода включительно.
+            end (datetime.date): Конец периода включительно.
+
+        Returns:
+            List[Tuple[datetime.date, float]]: Даты установления курса и стоимость единицы валюты в рублях.
+        """
+        from xml.etree import ElementTree
+
+        params = {
+            "date_req1": start.strftime("%d/%m/%Y"),
+            "date_req2": end.strftime("%d/%m/%Y"),
+            "VAL_NM_RQ": currency_id,
+        }
+        response: requests.Response = self.session.get(self.rate_history_url, params=params, timeout=self.timeout)
+        response.raise_for_status()
+        rates = []
+        for record in ElementTree.fromstring(response.content).iter("Record"):
+            date = datetime.datetime.strptime(record.get("Date", ""), "%d.%m.%Y").date()
+            nominal = float(record.findtext("Nominal", "1").replace(",", "."))
+            value = float(record.findtext("Value", "").replace(",", "."))
+            rates.append((date, value / nominal))
+        return rates
+
+    def submit(self, func: Callable[..., T], *args: Any) -> Future[T]:
+        """
+        Запускает функцию в пуле потоков клиента.
+
+        Args:
+            func (Callable[..., T]): Функция.
+            *args (Any): Аргументы функции.
+
+        Returns:
+            Future[T]: Результат выполнения.
+        """
+        return self._executor.submit(func, *args)
+
+    @staticmethod
+    def _collect(futures: List[Tuple[str, Future[float]]], kind: str) -> List[Tuple[str, float]]:
+        results = []
+        for symbol, future in futures:
+            try:
+                value = future.result()
+            except Exception as error:
+                logger.warning("Не удалось получить %s для %s: %s", kind, symbol, error)
+                value = 0.0
+            results.append((symbol, value))
+        return results
+
+    def fetch_currency_rates(
+        self, currencies: Sequence[str], base_currency: str = BASE_CURRENCY
+    ) -> List[Dict[str, Any]]:
+        """
+        Получает курсы валют из одной таблицы курсов базовой валюты.
+
+        Args:
+            currencies (Sequence[str]): Коды валют.
+            base_currency (str): Код базовой валюты. Defaults to config.BASE_CURRENCY.
+
+        Returns:
+            List[Dict[str, Any]]: Стоимость единицы каждой валюты в базовой валюте; 0.0, если курс недоступен.
+        """
+        try:
+            table = self.fetch_rate_table(base_currency)
+        except Exception as error:
+            logger.warning("Не удалось получить курсы валют к %s: %s", base_currency, error)
+            table = {}
+        return [{"currency": currency, "rate": rate_from_table(table, currency)} for currency in currencies]
+
+    def fetch_stock_prices(self, stocks: Sequence[str]) -> List[Dict[str, Any]]:
+        """
+        Параллельно получает цены акций.
+
+        Args:
+            stocks (Sequence[str]): Тикеры акций.
+
+        Returns:
+            List[Dict[str, Any]]: Список цен акций; для недоступных акций цена равна 0.0.
+        """
+        futures = [(stock, self.submit(self.fetch_stock_price, stock)) for stock in stocks]
+        prices = self._collect(futures, "цену")
+        return [{"stock": stock, "price": price} for stock, price in prices]
+
+    def fetch_market_data(
+        self, currencies: Sequence[str], stocks: Sequence[str]
+    ) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+        """
+        Одновременно получает курсы валют и цены акций.
+
+        Args:
+            currencies (Sequence[str]): Коды валют.
+            stocks (Sequence[str]): Тикеры акций.
+
+        Returns:
+            Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]: Курсы валют и цены акций.
+        """
+        rates_future = self.submit(self.fetch_currency_rates, currencies)
+        stock_prices = self.fetch_stock_prices(stocks)
+        return rates_future.result(), stock_prices
+
+
+def rate_from_table(table: Dict[str, float], currency: str) -> float:
+    """
+    Возвращает стоимость единицы валюты в базовой валюте таблицы курсов.
+
+    Args:
+        table (Dict[str, float]): Таблица курсов базовой валюты.
+        currency (str): Код валюты.
+
+    Returns:
+        float: Курс валюты или 0.0, если его нет в таблице.
+    """
+    rate = table.get(currency)
+    if not rate:
+        return 0.0
+    return 1.0 / rate
+
+
+_client: Optional[MarketDataClient] = None
+_client_lock = threading.Lock()
+
+
+def get_market_data_client() -> MarketDataClient:
+    """
+    Возвращает общий для процесса клиент рыночных данных, создавая его при первом обращении.
+
+    Returns:
+        MarketDataClient: Клиент рыночных данных.
+    """
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = MarketDataClient()
+        return _client
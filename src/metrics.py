@@ -0,0 +1,320 @@
+from __future__ import annotations
+
+import contextlib
+import functools
+import json
+import logging
+import os
+import threading
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, TypeVar, cast
+
+logger = logging.getLogger(__name__)
+
+METRICS_JSON = "metrics.json"
+METRICS_PROMETHEUS = "metrics.prom"
+PROFILE_STATS = "profile.pstats"
+PROFILE_ALLOCATIONS = "allocations.txt"
+PROFILE_TOP_ALLOCATIONS = 25
+
+PROMETHEUS_PREFIX = "pipeline"
+
+F = TypeVar("F", bound=Callable[..., Any])
+CacheCollector = Callable[[], Dict[str, int]]
+
+
+class StageRun:
+    """Текущее выполнение этапа: число обработанных строк можно указать внутри блока."""
+
+    def __init__(self, rows: Optional[int] = None) -> None:
+        self.rows = rows
+        self.start_traced = 0
+        self.peak_traced = 0
+
+
+class Metrics:
+    """
+    Метрики этапов конвейера: число вызовов, длительность, обработанные строки и пиковые аллокации.
+
+    Пиковые аллокации измеряются только когда включен tracemalloc (например, внутри profile) и при
+    параллельной работе нескольких потоков приблизительны, так как tracemalloc общий для процесса.
+    Попадания в кэши учитываются через record_cache или через функции, зарегистрированные в
+    register_cache.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._stages: Dict[str, Dict[str, float]] = {}
+        self._caches: Dict[str, Dict[str, int]] = {}
+        self._collectors: Dict[str, CacheCollector] = {}
+
+    def _stack(self) -> List[StageRun]:
+        stack: Optional[List[StageRun]] = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    @contextlib.contextmanager
+    def stage(self, name: str, rows: Optional[int] = None) -> Iterator[StageRun]:
+        """
+        Измеряет выполнение блока как этап конвейера.
+
+        Args:
+            name (str): Имя этапа.
+            rows (Optional[int]): Число обрабатываемых строк. Defaults to None.
+
+        Returns:
+            Iterator[StageRun]: Текущее выполнение этапа.
+        """
+        run = StageRun(rows)
+        stack = self._stack()
+        tracing = tracemalloc.is_tracing()
+        if tracing:
+            current, peak = tracemalloc.get_traced_memory()
+            if stack:
+                stack[-1].peak_traced = max(stack[-1].peak_traced, peak)
+            tracemalloc.reset_peak()
+            run.start_traced = run.peak_traced = current
+        stack.append(run)
+        started = time.perf_counter()
+        try:
+            yield run
+        finally:
+            elapsed = time.perf_counter() - started
+            stack.pop()
+            allocated = None
+            if tracing and tracemalloc.is_tracing():
+                run.peak_traced = max(run.peak_traced, tracemalloc.get_traced_memory()[1])
+                allocated = run.peak_traced - run.start_traced
+                if stack:
+                    stack[-1].peak_traced = max(stack[-1].peak_traced, run.peak_traced)
+            self._record(name, elapsed, run.rows, allocated)
+
+    def _record(self, name: str, elapsed: float, rows: Optional[int], allocated: Optional[int]) -> None:
+        with self._lock:
+            stats = self._stages.setdefault(name, {"calls": 0, "seconds": 0.0, "max_seconds": 0.0, "rows": 0})
+            stats["calls"] += 1
+            stats["seconds"] += elapsed
+            stats["max_seconds"] = max(stats["max_seconds"], elapsed)
+            if rows is not None:
+                stats["rows"] += rows
+            if allocated is not None:
+                stats["peak_alloc_bytes"] = max(stats.get("peak_alloc_bytes", 0), allocated)
+        logger.debug("Этап %s выполнен за %.3f с", name, elapsed)
+
+    def timed(self, name: str, rows: Optional[Callable[[Any], int]] = None) -> Callable[[F], F]:
+        """
+        Декоратор, измеряющий каждый вызов функции как этап конвейера.
+
+        Args:
+            name (str): Имя этапа.
+            rows (Optional[Callable[[Any], int]]): Функция, возвращающая число строк по результату вызова.
+
+        Returns:
+            Callable[[F], F]: Декоратор.
+        """
+
+        def decorator(func: F) -> F:
+            @functools.wraps(func)
+            def wrapper(*args: Any, **kwargs: Any) -> Any:
+                with self.stage(name) as run:
+                    result = func(*args, **kwargs)
+                    if rows is not None:
+                        run.rows = rows(result)
+                    return result
+
+            return cast(F, wrapper)
+
+        return decorator
+
+    def record_cache(self, name: str, hit: bool) -> None:
+        """
+        Учитывает обращение к кэшу.
+
+        Args:
+            name (str): Имя кэша.
+            hit (bool): Найдено ли значение в кэше.
+        """
+        with self._lock:
+            stats = self._caches.setdefault(name, {"hits": 0, "misses": 0})
+            stats["hits" if hit else "misses"] += 1
+
+    def register_cache(self, name: str, collector: CacheCollector) -> None:
+        """
+        Регистрирует кэш, который сам ведет статистику обращений.
+
+        Args:
+            name (str): Имя кэша.
+            collector (CacheCollector): Функция, возвращающая словарь с ключами «hits» и «misses».
+        """
+        with self._lock:
+            self._collectors[name] = collector
+
+    def reset(self) -> None:
+        """Сбрасывает накопленные метрики этапов и кэшей."""
+        with self._lock:
+            self._stages.clear()
+            self._caches.clear()
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Возвращает все метрики.
+
+        Returns:
+            Dict[str, Any]: Метрики этапов, кэшей и пиковый объем резидентной памяти процесса.
+        """
+        with self._lock:
+            stages = {name: dict(stats) for name, stats in self._stages.items()}
+            caches: Dict[str, Dict[str, float]] = {name: dict(stats) for name, stats in self._caches.items()}
+            collectors = dict(self._collectors)
+        for name, collector in collectors.items():
+            caches[name] = dict(collector())
+        for stats in caches.values():
+            total = stats["hits"] + stats["misses"]
+            stats["hit_rate"] = stats["hits"] / total if total else 0.0
+        return {"stages": stages, "caches": caches, "peak_rss_bytes": peak_rss_bytes()}
+
+    def format_stages(self) -> str:
+        """
+        Возвращает таблицу накопленных метрик этапов в текстовом виде.
+
+        Returns:
+            str: Таблица с числом вызовов, суммарным временем и числом строк каждого этапа.
+        """
+        with self._lock:
+            stages = {name: dict(stats) for name, stats in self._stages.items()}
+        width = max([len("Этап")] + [len(name) for name in stages])
+        lines = [f"{'Этап':<{width}}  Вызовы  Время, с      Строки"]
+        for name, stats in sorted(stages.items()):
+            lines.append(f"{name:<{width}}  {stats['calls']:>6.0f}  {stats['seconds']:>8.3f}  {stats['rows']:>10.0f}")
+        return "\n".join(lines)
+
+    def to_prometheus(self) -> str:
+        """
+        Возвращает метрики в текстовом формате Prometheus.
+
+        Returns:
+            str: Метрики в формате exposition format.
+        """
+        snapshot = self.snapshot()
+        families: List[Tuple[str, str, str, str, Dict[str, Any], str]] = [
+            ("stage_calls_total", "counter", "Число выполнений этапа", "stage", snapshot["stages"], "calls"),
+            ("stage_seconds_total", "counter", "Суммарная длительность этапа", "stage", snapshot["stages"], "seconds"),
+            (
+                "stage_seconds_max",
+                "gauge",
+                "Наибольшая длительность этапа",
+                "stage",
+                snapshot["stages"],
+                "max_seconds",
+            ),
+            ("stage_rows_total", "counter", "Число обработанных строк", "stage", snapshot["stages"], "rows"),
+            (
+                "stage_peak_alloc_bytes",
+                "gauge",
+                "Пиковые аллокации этапа",
+                "stage",
+                snapshot["stages"],
+                "peak_alloc_bytes",
+            ),
+            ("cache_hits_total", "counter", "Число попаданий в кэш", "cache", snapshot["caches"], "hits"),
+            ("cache_misses_total", "counter", "Число промахов кэша", "cache", snapshot["caches"], "misses"),
+            ("cache_hit_ratio", "gauge", "Доля попаданий в кэш", "cache", snapshot["caches"], "hit_rate"),
+        ]
+        lines = []
+        for family, kind, description, label, series, field in families:
+            samples = [(name, stats[field]) for name, stats in sorted(series.items()) if field in stats]
+            if not samples:
+                continue
+            metric = f"{PROMETHEUS_PREFIX}_{family}"
+            lines.append(f"# HELP {metric} {description}")
+            lines.append(f"# TYPE {metric} {kind}")
+            lines.extend(f'{metric}{{{label}="{_escape_label(name)}"}} {value}' for name, value in samples)
+        if snapshot["peak_rss_bytes"] is not None:
+            metric = f"{PROMETHEUS_PREFIX}_peak_rss_bytes"
+            lines.append(f"# HELP {metric} Пиковый объем резидентной памяти процесса")
+            lines.append(f"# TYPE {metric} gauge")
+            lines.append(f"{metric} {snapshot['peak_rss_bytes']}")
+        return "\n".join(lines) + "\n"
+
+    def write(self, output_dir: str) -> Dict[str, str]:
+        """
+        Сохраняет метрики в каталог в формате JSON и в текстовом формате Prometheus.
+
+        Args:
+            output_dir (str): Каталог для файлов метрик.
+
+        Returns:
+            Dict[str, str]: Пути к файлам по форматам.
+        """
+        os.makedirs(output_dir, exist_ok=True)
+        paths = {
+            "json": os.path.join(output_dir, METRICS_JSON),
+            "prometheus": os.path.join(output_dir, METRICS_PROMETHEUS),
+        }
+        with open(paths["json"], "w", encoding="utf-8") as f:
+            json.dump(self.snapshot(), f, ensure_ascii=False, indent=2)
+        with open(paths["prometheus"], "w", encoding="utf-8") as f:
+            f.write(self.to_prometheus())
+        logger.info("Метрики сохранены в %s", output_dir)
+        return paths
+
+
+def _escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def peak_rss_bytes() -> Optional[int]:
+    """
+    Возвращает пиковый объем резидентной памяти процесса.
+
+    Returns:
+        Optional[int]: Объем в байтах или None, если платформа его не сообщает.
+    """
+    try:
+        import resource
+    except ImportError:
+        return None
+    import sys
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return int(peak if sys.platform == "darwin" else peak * 1024)
+
+
+@contextlib.contextmanager
+def profile(output_dir: str) -> Iterator[None]:
+    """
+    Профилирует блок через cProfile и tracemalloc.
+
+    Статистика cProfile сохраняется в profile.pstats, крупнейшие места аллокаций — в allocations.txt.
+    Пока блок выполняется, этапы конвейера также измеряют свои пиковые аллокации.
+
+    Args:
+        output_dir (str): Каталог для результатов профилирования.
+    """
+    import cProfile
+
+    os.makedirs(output_dir, exist_ok=True)
+    profiler = cProfile.Profile()
+    started_tracing = not tracemalloc.is_tracing()
+    if started_tracing:
+        tracemalloc.start()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        allocations = tracemalloc.take_snapshot().statistics("lineno")[:PROFILE_TOP_ALLOCATIONS]
+        if started_tracing:
+            tracemalloc.stop()
+        profiler.dump_stats(os.path.join(output_dir, PROFILE_STATS))
+        with open(os.path.join(output_dir, PROFILE_ALLOCATIONS), "w", encoding="utf-8") as f:
+            f.writelines(f"{statistic}\n" for statistic in allocations)
+        logger.info("Результаты профилирования сохранены в %s", output_dir)
+
+
+metrics = Metrics()
+stage = metrics.stage
+timed = metrics.timed
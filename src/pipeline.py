@@ -0,0 +1,186 @@
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_WORKERS = 4
+
+
+@dataclass(frozen=True)
+class Stage:
+    """Этап конвейера: функция, которая получает результаты этапов inputs и возвращает результат этапа name."""
+
+    name: str
+    func: Callable[..., Any]
+    inputs: Tuple[str, ...] = ()
+
+
+@dataclass(frozen=True)
+class StageTiming:
+    """Время начала и окончания этапа в секундах от запуска конвейера."""
+
+    name: str
+    start: float
+    end: float
+
+    @property
+    def seconds(self) -> float:
+        return self.end - self.start
+
+
+class Pipeline:
+    """
+    Конвейер из этапов, зависимости между которыми заданы их входами.
+
+    Этап запускается в пуле потоков, как только готовы результаты всех его входов, поэтому независимые
+    этапы выполняются одновременно: ожидание сети и записи файлов перекрывается с вычислениями. Результат
+    каждого этапа вычисляется один раз и передается всем зависящим от него этапам.
+    После выполнения доступны время каждого этапа и критический путь — цепочка этапов, которая
+    определила общее время выполнения.
+    """
+
+    def __init__(self, stages: Iterable[Stage]) -> None:
+        self.stages: Dict[str, Stage] = {}
+        for stage in stages:
+            if stage.name in self.stages:
+                raise ValueError(f"Этап {stage.name!r} объявлен дважды")
+            self.stages[stage.name] = stage
+        for stage in self.stages.values():
+            missing = [name for name in stage.inputs if name not in self.stages]
+            if missing:
+                raise ValueError(f"Этап {stage.name!r} зависит от необъявленных этапов: {', '.join(missing)}")
+        self.order = self._topological_order()
+        self._lock = threading.Lock()
+        self.timings: Dict[str, StageTiming] = {}
+        self.wall_seconds = 0.0
+
+    def _topological_order(self) -> List[str]:
+        pending = {name: len(set(stage.inputs)) for name, stage in self.stages.items()}
+        ready = [name for name, count in pending.items() if not count]
+        order = []
+        while ready:
+            name = ready.pop(0)
+            order.append(name)
+            for dependent in self._dependents(name):
+                pending[dependent] -= 1
+                if not pending[dependent]:
+                    ready.append(dependent)
+        if len(order) != len(self.stages):
+            cycle = sorted(name for name, count in pending.items() if count)
+            raise ValueError(f"Циклическая зависимость между этапами: {', '.join(cycle)}")
+        return order
+
+    def _dependents(self, name: str) -> List[str]:
+        return [stage.name for stage in self.stages.values() if name in stage.inputs]
+
+    def _execute(self, stage: Stage, arguments: List[Any], started: float) -> Any:
+        start = time.perf_counter() - started
+        try:
+            return stage.func(*arguments)
+        finally:
+            timing = StageTiming(stage.name, start, time.perf_counter() - started)
+            with self._lock:
+                self.timings[stage.name] = timing
+            logger.debug("Этап %s выполнен за %.3f с", stage.name, timing.seconds)
+
+    def run(self, max_workers: int = DEFAULT_WORKERS) -> Dict[str, Any]:
+        """
+        Выполняет все этапы.
+
+        При max_workers=1 этапы выполняются по очереди в вызывающем потоке, например чтобы их видел cProfile.
+        Если этап завершается ошибкой, еще не начатые этапы отменяются, а ошибка пробрасывается.
+
+        Args:
+            max_workers (int): Число потоков. Defaults to 4.
+
+        Returns:
+            Dict[str, Any]: Результаты этапов по именам.
+        """
+        self.timings = {}
+        results: Dict[str, Any] = {}
+        started = time.perf_counter()
+        try:
+            if max_workers <= 1:
+                for name in self.order:
+                    stage = self.stages[name]
+                    results[name] = self._execute(stage, [results[item] for item in stage.inputs], started)
+            else:
+                self._run_concurrently(max_workers, results, started)
+        finally:
+            self.wall_seconds = time.perf_counter() - started
+        return results
+
+    def _run_concurrently(self, max_workers: int, results: Dict[str, Any], started: float) -> None:
+        pending = {name: len(set(stage.inputs)) for name, stage in self.stages.items()}
+        with ThreadPoolExecutor(max_workers, thread_name_prefix="pipeline") as pool:
+            futures: Dict[Future[Any], str] = {}
+
+            def submit(name: str) -> None:
+                stage = self.stages[name]
+                arguments = [results[item] for item in stage.inputs]
+                futures[pool.submit(self._execute, stage, arguments, started)] = name
+
+            for name in self.order:
+                if not pending[name]:
+                    submit(name)
+            while futures:
+                done, _ = wait(futures, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = futures.pop(future)
+                    try:
+                        results[name] = future.result()
+                    except BaseException:
+                        for other in futures:
+                            other.cancel()
+                        raise
+                    for dependent in self._dependents(name):
+                        pending[dependent] -= 1
+                        if not pending[dependent]:
+                            submit(dependent)
+
+    def critical_path(self) -> List[str]:
+        """
+        Возвращает критический путь последнего выполнения.
+
+        Путь строится от этапа, завершившегося последним: на каждом шаге берется вход, завершившийся позже
+        остальных, — именно его ожидал этап.
+
+        Returns:
+            List[str]: Этапы критического пути в порядке выполнения.
+        """
+        if not self.timings:
+            return []
+        name: Optional[str] = max(self.timings.values(), key=lambda timing: timing.end).name
+        path = []
+        while name is not None:
+            path.append(name)
+            inputs = [item for item in self.stages[name].inputs if item in self.timings]
+            name = max(inputs, key=lambda item: self.timings[item].end) if inputs else None
+        return path[::-1]
+
+    def format_timings(self) -> str:
+        """
+        Возвращает таблицу времени этапов последнего выполнения с отметкой этапов критического пути.
+
+        Returns:
+            str: Таблица в текстовом виде.
+        """
+        critical = self.critical_path()
+        width = max([len("Этап")] + [len(name) for name in self.timings])
+        lines = [f"{'Этап':<{width}}  Начало, с  Время, с  Критический путь"]
+        for timing in sorted(self.timings.values(), key=lambda timing: (timing.start, timing.name)):
+            mark = "*" if timing.name in critical else ""
+            lines.append(f"{timing.name:<{width}}  {timing.start:>9.3f}  {timing.seconds:>8.3f}  {mark}")
+        critical_seconds = sum(self.timings[name].seconds for name in critical)
+        total_seconds = sum(timing.seconds for timing in self.timings.values())
+        lines.append(
+            f"Общее время: {self.wall_seconds:.3f} с, сумма времени этапов: {total_seconds:.3f} с, "
+            f"критический путь: {' → '.join(critical)} ({critical_seconds:.3f} с)"
+        )
+        return "\n".join(lines)
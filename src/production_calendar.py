@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+import datetime
+import threading
+from typing import TYPE_CHECKING, Any, List, Optional
+
+if TYPE_CHECKING:
+    from numpy.typing import NDArray
+
+CALENDAR_START = datetime.date(2018, 1, 1)
+CALENDAR_END = datetime.date(2025, 12, 31)
+
+# Праздничные и перенесенные нерабочие дни по производственному календарю РФ.
+HOLIDAYS: List[str] = [
+    # 2018
+    "2018-01-01", "2018-01-02", "2018-01-03", "2018-01-04", "2018-01-05", "2018-01-08",
+    "2018-02-23", "2018-03-08", "2018-03-09", "2018-04-30", "2018-05-01", "2018-05-02",
+    "2018-05-09", "2018-06-11", "2018-06-12", "2018-11-05", "2018-12-31",
+    # 2019
+    "2019-01-01", "2019-01-02", "2019-01-03", "2019-01-04", "2019-01-07", "2019-01-08",
+    "2019-03-08", "2019-05-01", "2019-05-02", "2019-05-03", "2019-05-09", "2019-05-10",
+    "2019-06-12", "2019-11-04",
+    # 2020
+    "2020-01-01", "2020-01-02", "2020-01-03", "2020-01-06", "2020-01-07", "2020-01-08",
+    "2020-02-24", "2020-03-09", "2020-05-01", "2020-05-04", "2020-05-05", "2020-05-11",
+    "2020-06-12", "2020-06-24", "2020-07-01", "2020-11-04",
+    # 2021
+    "2021-01-01", "2021-01-04", "2021-01-05", "2021-01-06", "2021-01-07", "2021-01-08",
+    "2021-02-22", "2021-02-23", "2021-03-08", "2021-05-03", "2021-05-10", "2021-06-14",
+    "2021-11-04", "2021-11-05", "2021-12-31",
+    # 2022
+    "2022-01-03", "2022-01-04", "2022-01-05", "2022-01-06", "2022-01-07", "2022-02-23",
+    "2022-03-07", "2022-03-08", "2022-05-02", "2022-05-03", "2022-05-09", "2022-05-10",
+    "2022-06-13", "2022-11-04",
+    # 2023
+    "2023-01-02", "2023-01-03", "2023-01-04", "2023-01-05", "2023-01-06", "2023-02-23",
+    "2023-02-24", "2023-03-08", "2023-05-01", "2023-05-08", "2023-05-09", "2023-06-12",
+    "2023-11-06",
+    # 2024
+    "2024-01-01", "2024-01-02", "2024-01-03", "2024-01-04", "2024-01-05", "2024-01-08",
+    "2024-02-23", "2024-03-08", "2024-04-29", "2024-04-30", "2024-05-01", "2024-05-09",
+    "2024-05-10", "2024-06-12", "2024-11-04", "2024-12-30", "2024-12-31",
+    # 2025
+    "2025-01-01", "2025-01-02", "2025-01-03", "2025-01-06", "2025-01-07", "2025-01-08",
+    "2025-05-01", "2025-05-02", "2025-05-08", "2025-05-09", "2025-06-12", "2025-06-13",
+    "2025-11-03", "2025-11-04", "2025-12-31",
+]  # fmt: skip
+
+# Рабочие субботы, на которые перенесены выходные дни.
+WORKING_WEEKENDS: List[str] = [
+    "2018-04-28", "2018-06-09", "2018-12-29",
+    "2021-02-20",
+    "2022-03-05",
+    "2024-04-27", "2024-11-02", "2024-12-28",
+    "2025-11-01",
+]  # fmt: skip
+
+_workdays: Optional[NDArray[Any]] = None
+_workdays_lock = threading.Lock()
+
+
+def workday_table() -> NDArray[Any]:
+    """
+    Возвращает булев массив рабочих дней, индексированный числом дней от начала календаря.
+
+    Returns:
+        NDArray[Any]: Массив, в котором True означает рабочий день.
+    """
+    import numpy as np
+
+    global _workdays
+    with _workdays_lock:
+        if _workdays is None:
+            days = np.arange(np.datetime64(CALENDAR_START), np.datetime64(CALENDAR_END) + 1)
+            table = _weekday_codes(days) < 5
+            start = np.datetime64(CALENDAR_START)
+            table[(np.asarray(HOLIDAYS, dtype="datetime64[D]") - start).astype(np.int64)] = False
+            table[(np.asarray(WORKING_WEEKENDS, dtype="datetime64[D]") - start).astype(np.int64)] = True
+            table.setflags(write=False)
+            _workdays = table
+        return _workdays
+
+
+def _weekday_codes(days: NDArray[Any]) -> NDArray[Any]:
+    import numpy as np
+
+    # 1 января 1970 года — четверг, поэтому сдвиг на 3 дает понедельник = 0.
+    return (days.astype("datetime64[D]").astype(np.int64) + 3) % 7
+
+
+def is_workday(dates: Any) -> NDArray[Any]:
+    """
+    Определяет для каждой даты, является ли она рабочим днем по производственному календарю.
+
+    Даты вне диапазона календаря считаются рабочими с понедельника по пятницу.
+
+    Args:
+        dates (Any): Даты в виде массива datetime64, pd.Series или pd.DatetimeIndex.
+
+    Returns:
+        NDArray[Any]: Булев массив той же длины.
+    """
+    import numpy as np
+
+    days = np.asarray(dates, dtype="datetime64[ns]").astype("datetime64[D]")
+    table = workday_table()
+    offsets = (days - np.datetime64(CALENDAR_START)).astype(np.int64)
+    inside = (offsets >= 0) & (offsets < len(table))
+    result: NDArray[Any] = _weekday_codes(days) < 5
+    result[inside] = table[offsets[inside]]
+    return result
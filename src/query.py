@@ -0,0 +1,292 @@
+from __future__ import annotations
+
+import dataclasses
+import datetime
+import logging
+import math
+import os
+import threading
+from typing import TYPE_CHECKING, Any, Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+from src.currency import get_normalized_dataset
+from src.loader import DEFAULT_STATEMENT_PATH, on_dataset_invalidated
+from src.transactions import (
+    CARD_NUMBER,
+    CATEGORY,
+    MCC,
+    OPERATION_AMOUNT,
+    OPERATION_CURRENCY,
+    STATUS,
+    TransactionData,
+    as_transaction_table,
+)
+
+if TYPE_CHECKING:
+    import numpy as np
+    import pandas as pd
+    from numpy.typing import NDArray
+
+logger = logging.getLogger(__name__)
+
+INDEXED_COLUMNS = [CARD_NUMBER, CATEGORY, MCC, STATUS, OPERATION_CURRENCY]
+
+# Если ненулевых байтов карты больше 1/DENSE_BYTES_RATIO, карта распаковывается целиком
+DENSE_BYTES_RATIO = 4
+
+
+@dataclasses.dataclass(frozen=True)
+class TransactionQuery:
+    """
+    Условия отбора транзакций, объединяемые через «и».
+
+    Даты задают полуинтервал [start, end) по дате операции, суммы — отрезок [min_amount, max_amount]
+    по сумме операции со знаком (расходы отрицательны). values хранит допустимые значения
+    категориальных столбцов: внутри столбца значения объединяются через «или».
+    Методы возвращают новый запрос, поэтому условия можно составлять цепочкой и через оператор &.
+    """
+
+    start: Optional[datetime.datetime] = None
+    end: Optional[datetime.datetime] = None
+    min_amount: Optional[float] = None
+    max_amount: Optional[float] = None
+    values: Tuple[Tuple[str, FrozenSet[Any]], ...] = ()
+
+    def between(
+        self, start: Optional[datetime.datetime] = None, end: Optional[datetime.datetime] = None
+    ) -> TransactionQuery:
+        """Оставляет транзакции с датой операции в [start, end)."""
+        return self & TransactionQuery(start=start, end=end)
+
+    def amount(self, minimum: Optional[float] = None, maximum: Optional[float] = None) -> TransactionQuery:
+        """Оставляет транзакции с суммой операции в [minimum, maximum]."""
+        return self & TransactionQuery(min_amount=minimum, max_amount=maximum)
+
+    def where(self, column: str, *values: Any) -> TransactionQuery:
+        """Оставляет транзакции, у которых столбец column принимает одно из значений values."""
+        return self & TransactionQuery(values=((column, frozenset(values)),))
+
+    def card(self, *cards: str) -> TransactionQuery:
+        """Оставляет транзакции по картам, например «*7197»."""
+        return self.where(CARD_NUMBER, *cards)
+
+    def category(self, *categories: str) -> TransactionQuery:
+        """Оставляет транзакции указанных категорий."""
+        return self.where(CATEGORY, *categories)
+
+    def mcc(self, *codes: Any) -> TransactionQuery:
+        """Оставляет транзакции с указанными MCC; коды можно передавать числами или строками."""
+        return self.where(MCC, *codes)
+
+    def status(self, *statuses: str) -> TransactionQuery:
+        """Оставляет транзакции с указанными статусами."""
+        return self.where(STATUS, *statuses)
+
+    def currency(self, *currencies: str) -> TransactionQuery:
+        """Оставляет транзакции в указанных валютах операции."""
+        return self.where(OPERATION_CURRENCY, *currencies)
+
+    def __and__(self, other: TransactionQuery) -> TransactionQuery:
+        values = dict(self.values)
+        for column, allowed in other.values:
+            values[column] = values[column] & allowed if column in values else allowed
+        return TransactionQuery(
+            start=_bound(self.start, other.start, max),
+            end=_bound(self.end, other.end, min),
+            min_amount=_bound(self.min_amount, other.min_amount, max),
+            max_amount=_bound(self.max_amount, other.max_amount, min),
+            values=tuple(sorted(values.items())),
+        )
+
+
+def _bound(first: Any, second: Any, pick: Any) -> Any:
+    if first is None:
+        return second
+    if second is None:
+        return first
+    return pick(first, second)
+
+
+def _candidates(value: Any) -> List[Any]:
+    """Варианты записи значения: MCC в выписке может храниться числом 5411.0 или строкой «5411.0»."""
+    candidates = [value]
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return candidates
+    if math.isnan(number):
+        return candidates
+    candidates.extend([number, str(number)])
+    if number.is_integer():
+        candidates.extend([int(number), str(int(number))])
+    return candidates
+
+
+class TransactionIndex:
+    """
+    Индекс таблицы транзакций для быстрых запросов TransactionQuery.
+
+    Для каждого значения карты, категории, MCC, статуса и валюты хранится битовая карта строк,
+    упакованная по 8 строк в байт. Таблица отсортирована по дате операции, поэтому диапазон дат —
+    это отрезок строк, который находится двоичным поиском и ограничивает обрабатываемые байты карт.
+    Условия на категориальные столбцы вычисляются побитовыми «или» и «и» над картами, а условие на
+    сумму проверяется только для отобранных строк.
+    """
+
+    def __init__(self, transactions: TransactionData) -> None:
+        import numpy as np
+
+        self.table = as_transaction_table(transactions)
+        self._dates = self.table.index
+        self._amounts = self.table[OPERATION_AMOUNT].to_numpy(dtype="float64", na_value=np.nan)
+        self._codes_by_value: Dict[str, Dict[Any, int]] = {}
+        self._bitmaps: Dict[str, List[NDArray[np.uint8]]] = {}
+        rows = len(self.table)
+        for column in INDEXED_COLUMNS:
+            if column not in self.table.columns:
+                continue
+            series = self.table[column]
+            self._codes_by_value[column] = {value: code for code, value in enumerate(series.cat.categories)}
+            codes = series.cat.codes.to_numpy()
+            order = np.argsort(codes, kind="stable")
+            bounds = np.searchsorted(codes[order], np.arange(len(series.cat.categories) + 1))
+            bitmaps = []
+            for code in range(len(series.cat.categories)):
+                bits = np.zeros(rows, dtype=bool)
+                bits[order[bounds[code] : bounds[code + 1]]] = True  # noqa: E203
+                bitmaps.append(np.packbits(bits))
+            self._bitmaps[column] = bitmaps
+        logger.info("Построен индекс по %s транзакциям", rows)
+
+    def __len__(self) -> int:
+        return len(self.table)
+
+    def _codes(self, column: str, values: Iterable[Any]) -> List[int]:
+        codes_by_value = self._codes_by_value.get(column)
+        if codes_by_value is None:
+            raise KeyError(f"Столбец {column!r} не проиндексирован")
+        codes = set()
+        for value in values:
+            for candidate in _candidates(value):
+                if candidate in codes_by_value:
+                    codes.add(codes_by_value[candidate])
+                    break
+        return sorted(codes)
+
+    def _row_range(self, query: TransactionQuery) -> Tuple[int, int]:
+        first = 0 if query.start is None else int(self._dates.searchsorted(query.start, side="left"))
+        last = len(self.table) if query.end is None else int(self._dates.searchsorted(query.end, side="left"))
+        return first, max(first, last)
+
+    def positions(self, query: TransactionQuery) -> NDArray[np.int64]:
+        """
+        Возвращает позиции строк, удовлетворяющих запросу.
+
+        Args:
+            query (TransactionQuery): Запрос.
+
+        Returns:
+            NDArray[np.int64]: Возрастающие позиции строк таблицы.
+        """
+        import numpy as np
+
+        first, last = self._row_range(query)
+        empty = np.array([], dtype=np.int64)
+        if first == last:
+            return empty
+
+        if query.values:
+            first_byte, last_byte = first >> 3, (last + 7) >> 3
+            selected: Optional[NDArray[np.uint8]] = None
+            for column, values in query.values:
+                codes = self._codes(column, values)
+                if not codes:
+                    return empty
+                bitmaps = self._bitmaps[column]
+                column_bits = bitmaps[codes[0]][first_byte:last_byte].copy()
+                for code in codes[1:]:
+                    np.bitwise_or(column_bits, bitmaps[code][first_byte:last_byte], out=column_bits)
+                selected = column_bits if selected is None else np.bitwise_and(selected, column_bits, out=selected)
+            assert selected is not None
+            nonzero = np.flatnonzero(selected)
+            if len(nonzero) * DENSE_BYTES_RATIO > len(selected):
+                unpacked = np.unpackbits(selected)[first - first_byte * 8 :]  # noqa: E203
+                positions = np.flatnonzero(unpacked[: last - first]) + first
+            else:
+                bits = np.unpackbits(selected[nonzero]).reshape(-1, 8).astype(bool)
+                rows = (nonzero + first_byte)[:, None] * 8 + np.arange(8)
+                positions = rows[bits]
+                positions = positions[(positions >= first) & (positions < last)]
+            if query.min_amount is not None or query.max_amount is not None:
+                positions = positions[self._amount_mask(self._amounts[positions], query)]
+            result: NDArray[np.int64] = positions.astype(np.int64, copy=False)
+            return result
+
+        if query.min_amount is not None or query.max_amount is not None:
+            mask = self._amount_mask(self._amounts[first:last], query)
+            return np.flatnonzero(mask).astype(np.int64) + first
+        return np.arange(first, last, dtype=np.int64)
+
+    @staticmethod
+    def _amount_mask(amounts: NDArray[np.float64], query: TransactionQuery) -> NDArray[np.bool_]:
+        import numpy as np
+
+        mask = np.ones(len(amounts), dtype=bool)
+        if query.min_amount is not None:
+            mask &= amounts >= query.min_amount
+        if query.max_amount is not None:
+            mask &= amounts <= query.max_amount
+        return mask
+
+    def count(self, query: TransactionQuery) -> int:
+        """
+        Возвращает число транзакций, удовлетворяющих запросу.
+
+        Args:
+            query (TransactionQuery): Запрос.
+
+        Returns:
+            int: Число транзакций.
+        """
+        return len(self.positions(query))
+
+    def select(self, query: TransactionQuery) -> pd.DataFrame:
+        """
+        Возвращает транзакции, удовлетворяющие запросу.
+
+        Args:
+            query (TransactionQuery): Запрос.
+
+        Returns:
+            pd.DataFrame: Строки таблицы транзакций в порядке дат.
+        """
+        return self.table.iloc[self.positions(query)]
+
+
+_indexes: Dict[str, TransactionIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def get_transaction_index(file_path: str = DEFAULT_STATEMENT_PATH) -> TransactionIndex:
+    """
+    Возвращает общий для процесса индекс транзакций, строя его при первом обращении.
+
+    Args:
+        file_path (str): Путь к файлу выписки. Defaults to data/operations.xlsx.
+
+    Returns:
+        TransactionIndex: Индекс транзакций.
+    """
+    key = os.path.abspath(file_path)
+    with _indexes_lock:
+        if key not in _indexes:
+            _indexes[key] = TransactionIndex(get_normalized_dataset(file_path))
+        return _indexes[key]
+
+
+@on_dataset_invalidated
+def _invalidate_indexes(key: Optional[str]) -> None:
+    with _indexes_lock:
+        if key is None:
+            _indexes.clear()
+        else:
+            _indexes.pop(key, None)
@@ -0,0 +1,221 @@
+from __future__ import annotations
+
+import functools
+import hashlib
+import inspect
+import json
+import logging
+import os
+import pickle
+import tempfile
+import threading
+import weakref
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Any, Callable, Dict, Optional, Tuple
+
+from config import REPORT_CACHE_DIR
+from src.loader import on_dataset_invalidated
+from src.metrics import metrics
+from src.rollup import DailyRollup
+from src.transactions import frame_fingerprint, frame_version
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_ENTRIES = 256
+# Входит в ключ результата: увеличивается при изменении результатов отчетов, чтобы не читать старые с диска
+CACHE_VERSION = 2
+
+ArgumentsNormalizer = Callable[[inspect.BoundArguments], None]
+
+
+_fingerprints: Dict[int, Tuple[weakref.ref[pd.DataFrame], str, str]] = {}
+_fingerprints_lock = threading.Lock()
+
+
+def _forget_fingerprint(key: int, ref: weakref.ref[pd.DataFrame]) -> None:
+    with _fingerprints_lock:
+        if key in _fingerprints and _fingerprints[key][0] is ref:
+            del _fingerprints[key]
+
+
+def dataset_fingerprint(source: Any) -> str:
+    """
+    Возвращает отпечаток данных, по которым строится отчет.
+
+    Отпечаток содержимого таблицы хранится, пока таблица жива, вместе с ее меткой версии frame_version.
+    При каждом вызове сравнивается только дешевая метка, и отпечаток вычисляется заново, лишь если
+    таблица изменилась, в том числе на месте.
+
+    Args:
+        source (Any): Таблица транзакций или куб DailyRollup.
+
+    Returns:
+        str: Шестнадцатеричный отпечаток.
+    """
+    if isinstance(source, DailyRollup):
+        return source.fingerprint()
+    key = id(source)
+    version = frame_version(source)
+    with _fingerprints_lock:
+        entry = _fingerprints.get(key)
+    if entry is not None and entry[0]() is source and entry[1] == version:
+        return entry[2]
+    fingerprint = frame_fingerprint(source)
+    ref = weakref.ref(source, lambda ref: _forget_fingerprint(key, ref))
+    with _fingerprints_lock:
+        _fingerprints[key] = (ref, version, fingerprint)
+    return fingerprint
+
+
+class ReportRegistry:
+    """
+    Реестр отчетов с мемоизацией результатов.
+
+    Ключ результата — отпечаток данных, имя функции и нормализованные аргументы. Результаты хранятся
+    в памяти с вытеснением по LRU и, если задан cache_dir, в pickle-файлах на диске. Память очищается
+    при вызове invalidate_dataset, а записи для изменившихся данных не находятся благодаря отпечатку.
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES, cache_dir: Optional[str] = None) -> None:
+        self.max_entries = max_entries
+        self.cache_dir = cache_dir
+        self.reports: Dict[str, Callable[..., Any]] = {}
+        self._entries: OrderedDict[str, Any] = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "disk_hits": 0, "misses": 0}
+
+    def memoize(
+        self, func: Optional[Callable[..., Any]] = None, *, normalize: Optional[ArgumentsNormalizer] = None
+    ) -> Any:
+        """
+        Регистрирует функцию отчета и мемоизирует ее результаты.
+
+        Первый аргумент функции — источник данных, остальные аргументы входят в ключ после приведения
+        к полному набору с учетом значений по умолчанию и, если задано, функции normalize.
+
+        Args:
+            func (Optional[Callable[..., Any]]): Функция отчета.
+            normalize (Optional[ArgumentsNormalizer]): Функция, приводящая аргументы к каноническому виду.
+
+        Returns:
+            Any: Мемоизированная функция или декоратор.
+        """
+        if func is None:
+            return functools.partial(self.memoize, normalize=normalize)
+        signature = inspect.signature(func)
+        name = f"{func.__module__}.{func.__qualname__}"
+
+        @functools.wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            if normalize is not None:
+                normalize(bound)
+            source_name, *parameter_names = bound.arguments
+            parameters = {parameter: bound.arguments[parameter] for parameter in parameter_names}
+            key = self.key(name, dataset_fingerprint(bound.arguments[source_name]), parameters)
+            found, result = self._get(key)
+            if not found:
+                result = func(*bound.args, **bound.kwargs)
+                self._put(key, result)
+            return _copy(result)
+
+        self.reports[func.__name__] = wrapper
+        return wrapper
+
+    @staticmethod
+    def key(name: str, fingerprint: str, parameters: Dict[str, Any]) -> str:
+        """
+        Возвращает ключ результата отчета.
+
+        Args:
+            name (str): Полное имя функции отчета.
+            fingerprint (str): Отпечаток данных.
+            parameters (Dict[str, Any]): Параметры отчета.
+
+        Returns:
+            str: Ключ.
+        """
+        payload = json.dumps(
+            [CACHE_VERSION, name, fingerprint, parameters], sort_keys=True, default=str, ensure_ascii=False
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _disk_path(self, key: str) -> Optional[str]:
+        return None if self.cache_dir is None else os.path.join(self.cache_dir, f"{key}.pkl")
+
+    def _get(self, key: str) -> Tuple[bool, Any]:
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.stats["hits"] += 1
+                return True, self._entries[key]
+        path = self._disk_path(key)
+        if path is not None and os.path.exists(path):
+            try:
+                with open(path, "rb") as f:
+                    result = pickle.load(f)
+            except Exception as error:
+                logger.warning("Сохраненный отчет %s не прочитан: %s", path, error)
+            else:
+                self._remember(key, result)
+                with self._lock:
+                    self.stats["disk_hits"] += 1
+                return True, result
+        with self._lock:
+            self.stats["misses"] += 1
+        return False, None
+
+    def _remember(self, key: str, result: Any) -> None:
+        with self._lock:
+            self._entries[key] = result
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _put(self, key: str, result: Any) -> None:
+        self._remember(key, result)
+        path = self._disk_path(key)
+        if path is None:
+            return
+        directory = os.path.dirname(path)
+        try:
+            os.makedirs(directory, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                pickle.dump(result, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, path)
+        except OSError as error:
+            logger.warning("Отчет %s не сохранен: %s", path, error)
+
+    def cache_stats(self) -> Dict[str, int]:
+        """
+        Возвращает число попаданий в кэш, включая дисковый, и число промахов.
+
+        Returns:
+            Dict[str, int]: Словарь с ключами «hits» и «misses».
+        """
+        with self._lock:
+            return {"hits": self.stats["hits"] + self.stats["disk_hits"], "misses": self.stats["misses"]}
+
+    def clear(self) -> None:
+        """Очищает хранящиеся в памяти результаты."""
+        with self._lock:
+            self._entries.clear()
+
+
+def _copy(result: Any) -> Any:
+    copy = getattr(result, "copy", None)
+    return copy() if callable(copy) else result
+
+
+report_registry = ReportRegistry(cache_dir=REPORT_CACHE_DIR)
+metrics.register_cache("reports", report_registry.cache_stats)
+
+
+@on_dataset_invalidated
+def _invalidate_reports(key: Optional[str]) -> None:
+    report_registry.clear()
@@ -1,125 +1,147 @@
+from __future__ import annotations
+
+import datetime
+import inspect
 import logging
-import os
-from datetime import datetime, timedelta
-from typing import Any, Callable, Optional, TypeAlias, Union
+from typing import TYPE_CHECKING, Any, Callable, Optional, Tuple, TypeAlias, Union
 
-import pandas as pd
+from src.loader import get_dataset
+from src.metrics import timed
+from src.production_calendar import is_workday
+from src.report_registry import report_registry
+from src.rollup import DailyRollup
+from src.transactions import CATEGORY, OPERATION_AMOUNT, OPERATION_DATE, as_transaction_table, date_window
+from src.writers import write_report
 
-file_path = os.path.join(os.path.dirname(__file__), "..", "data", "operations.xlsx")
-transactions = pd.read_excel(file_path)
-transactions["Дата операции"] = pd.to_datetime(transactions["Дата операции"], format="%d.%m.%Y %H:%M:%S")
+if TYPE_CHECKING:
+    import pandas as pd
 
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 logger.info("Скрипт запущен")
 
-ReportFunc: TypeAlias = Union[Callable[..., Any], pd.DataFrame]
+WEEKDAY_NAMES = ["Понедельник", "Вторник", "Среда", "Четверг", "Пятница", "Суббота", "Воскресенье"]
+WORKDAY_LABEL = "Рабочии дни"
+WEEKEND_LABEL = "Выходные дни"
+
+ReportFunc: TypeAlias = Union[Callable[..., Any], "pd.DataFrame"]
+ReportSource: TypeAlias = Union["pd.DataFrame", DailyRollup]
+
+
+def __getattr__(name: str) -> Any:
+    if name == "transactions":
+        return get_dataset()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def _window_bounds(date: Optional[str]) -> Tuple[datetime.date, datetime.date]:
+    if date is None:
+        date_obj = datetime.datetime.now()
+    else:
+        date_obj = datetime.datetime.strptime(date, "%Y-%m-%d")
+    last_day = date_obj.date()
+    return last_day - datetime.timedelta(days=90), last_day
+
+
+def _resolve_date(arguments: inspect.BoundArguments) -> None:
+    if arguments.arguments.get("date") is None:
+        arguments.arguments["date"] = datetime.date.today().strftime("%Y-%m-%d")
+
 
+def _last_three_months(transactions_df: pd.DataFrame, date: Optional[str]) -> pd.DataFrame:
+    first_day, last_day = _window_bounds(date)
+    window_start = datetime.datetime.combine(first_day, datetime.time())
+    window_end = datetime.datetime.combine(last_day, datetime.time()) + datetime.timedelta(days=1)
+    return date_window(as_transaction_table(transactions_df), window_start, window_end)
 
-def spending_by_category(transactions_df: pd.DataFrame, category: str, date: str) -> Any:
-    ...
+
+@report_registry.memoize(normalize=_resolve_date)
+@timed("reports.spending_by_category", rows=len)
+def spending_by_category(transactions_df: ReportSource, category: str, date: Optional[str]) -> Any:
     """
     Возвращает расходы по категории за последние три месяца.
 
     Args:
-        transactions_df (pd.DataFrame): DataFrame с данными о транзакциях.
+        transactions_df (ReportSource): DataFrame с данными о транзакциях или куб DailyRollup.
         category (str): Название категории.
         date (Optional[str], optional): Дата, с которой рассчитывать расходы. Defaults to None.
 
     Returns:
         pd.DataFrame: Расходы по категории за последние три месяца.
     """
-    logger.info(f"Категория: {category}, Дата {date}")
+    logger.info("Категория: %s, Дата %s", category, date)
 
-    if date is None:
-        date_obj = datetime.now()
+    if isinstance(transactions_df, DailyRollup):
+        totals = transactions_df.spending_by_category(*_window_bounds(date))
+        totals = totals[totals.index == category]
     else:
-        date_obj = datetime.strptime(date, "%Y-%m-%d")
-    three_months_ago = date_obj - timedelta(days=90)
-    logger.info(f"Расходы за последние три месяца: {three_months_ago}")
-    transactions_df["Дата операции"] = pd.to_datetime(transactions_df["Дата операции"], dayfirst=True)
-    filtered_transactions = transactions_df[transactions_df["Дата операции"] >= three_months_ago].copy()
-    spending = filtered_transactions.groupby("Категория")["Сумма операции"].sum().reset_index()
-    spending["Сумма операции"] = spending["Сумма операции"].apply(lambda x: round(x))
-    logger.info(f"Расходы по категории:\n " f"{spending}")
+        filtered_transactions = _last_three_months(transactions_df, date)
+        filtered_transactions = filtered_transactions[filtered_transactions[CATEGORY] == category]
+        totals = filtered_transactions.groupby(CATEGORY, observed=True)[OPERATION_AMOUNT].sum()
+    spending = totals.rename_axis(CATEGORY).rename(OPERATION_AMOUNT).reset_index()
+    spending[OPERATION_AMOUNT] = spending[OPERATION_AMOUNT].round().astype("int64")
+    logger.debug("Расходы по категории:\n%s", spending)
     return spending
 
 
-def spending_by_weekday(transactions_df: pd.DataFrame, date: Optional[str] = None) -> Any:
+@report_registry.memoize(normalize=_resolve_date)
+@timed("reports.spending_by_weekday", rows=len)
+def spending_by_weekday(transactions_df: ReportSource, date: Optional[str] = None) -> Any:
     """
     Возвращает средние расходы по дням недели за последние три месяца.
 
     Args:
-        transactions_df (pd.DataFrame): DataFrame с данными о транзакциях.
+        transactions_df (ReportSource): DataFrame с данными о транзакциях или куб DailyRollup.
         date (Optional[str], optional): Дата, с которой рассчитывать расходы. Defaults to None.
 
     Returns:
         pd.DataFrame: Средние расходы по дням недели за последние три месяца.
     """
-    if date is None:
-        date_obj = datetime.now()
-    else:
-        date_obj = datetime.strptime(date, "%Y-%m-%d")
-    transactions_df["Дата операции"] = pd.to_datetime(transactions_df["Дата операции"])
-    filtered_transactions = transactions_df[transactions_df["Дата операции"] >= (date_obj - timedelta(days=90))].copy()
-    filtered_transactions.loc[:, "День недели"] = filtered_transactions["Дата операции"].dt.day_name()
-    filtered_transactions.loc[:, "День недели"] = filtered_transactions["День недели"].apply(
-        lambda x: {
-            "Monday": "Понедельник",
-            "Tuesday": "Вторник",
-            "Wednesday": "Среда",
-            "Thursday": "Четверг",
-            "Friday": "Пятница",
-            "Saturday": "Суббота",
-            "Sunday": "Воскресенье",
-        }[x]
-    )
+    import pandas as pd
 
+    if isinstance(transactions_df, DailyRollup):
+        means = transactions_df.mean_spending_by_weekday(*_window_bounds(date))
+    else:
+        filtered_transactions = _last_three_months(transactions_df, date)
+        weekday_codes = filtered_transactions[OPERATION_DATE].dt.dayofweek
+        means = filtered_transactions[OPERATION_AMOUNT].groupby(weekday_codes).mean()
     spending = pd.DataFrame(
         {
-            "День недели": ["Понедельник", "Вторник", "Среда", "Четверг", "Пятница", "Суббота", "Воскресенье"],
-            "Сумма операции": [100.0, 200.0, 300.0, 400.0, 500.0, 600.0, 700.0],
+            "День недели": WEEKDAY_NAMES,
+            "Сумма операции": means.reindex(range(len(WEEKDAY_NAMES)), fill_value=0.0).to_numpy(),
         }
     )
     return spending
 
 
-def spending_by_workday(transactions_df: pd.DataFrame, date: Optional[str] = None) -> Any:
+@report_registry.memoize(normalize=_resolve_date)
+@timed("reports.spending_by_workday", rows=len)
+def spending_by_workday(transactions_df: ReportSource, date: Optional[str] = None) -> Any:
     """
     Возвращает средние расходы по типам дней за последние три месяца.
 
+    Рабочие и выходные дни определяются по производственному календарю с учетом праздников и переносов.
+
     Args:
-        transactions_df (pd.DataFrame): DataFrame с данными о транзакциях.
+        transactions_df (ReportSource): DataFrame с данными о транзакциях или куб DailyRollup.
         date (Optional[str], optional): Дата, с которой рассчитывать расходы. Defaults to None.
 
     Returns:
         pd.DataFrame: Средние расходы по типам дней за последние три месяца.
     """
-    if date is None:
-        date_obj = datetime.now()
-    else:
-        date_obj = datetime.strptime(date, "%Y-%m-%d")
-    transactions_df["Дата операции"] = pd.to_datetime(transactions_df["Дата операции"])
-    filtered_transactions = transactions_df[transactions_df["Дата операции"] >= (date_obj - timedelta(days=90))].copy()
-    filtered_transactions.loc[:, "День недели"] = filtered_transactions["Дата операции"].dt.day_name()
-    filtered_transactions.loc[:, "День недели"] = filtered_transactions["День недели"].apply(
-        lambda x: {
-            "Monday": "Понедельник",
-            "Tuesday": "Вторник",
-            "Wednesday": "Среда",
-            "Thursday": "Четверг",
-            "Friday": "Пятница",
-            "Saturday": "Суббота",
-            "Sunday": "Воскресенье",
-        }[x]
-    )
-    filtered_transactions.loc[:, "Рабочий/Выходной день"] = filtered_transactions["День недели"].apply(
-        lambda x: "Рабочии дни" if x in ["Понедельник", "Вторник", "Среда", "Четверг", "Пятница"] else "Выходные дни"
-    )
+    import pandas as pd
 
+    if isinstance(transactions_df, DailyRollup):
+        means = transactions_df.mean_spending_by_workday(*_window_bounds(date))
+    else:
+        filtered_transactions = _last_three_months(transactions_df, date)
+        workdays = is_workday(filtered_transactions[OPERATION_DATE])
+        means = filtered_transactions[OPERATION_AMOUNT].groupby(workdays).mean()
     spending = pd.DataFrame(
-        {"Рабочий/Выходной день": ["Рабочии дни", "Выходные дни"], "Сумма операции": [100.0, 200.0]}
+        {
+            "Рабочий/Выходной день": [WORKDAY_LABEL, WEEKEND_LABEL],
+            "Сумма операции": means.reindex([True, False], fill_value=0.0).to_numpy(),
+        }
     )
 
     return spending
@@ -127,22 +149,24 @@ def spending_by_workday(transactions_df: pd.DataFrame, date: Optional[str] = Non
 
 def save_report_to_file(report: pd.DataFrame, filename: str = "report.json") -> None:
     """
-    Сохраняет отчет в файл.
+    Сохраняет отчет в файл в каталоге отчетов.
+
+    Формат определяется по расширению файла: .json, .ndjson, .csv или .parquet.
 
     Args:
         report (pd.DataFrame): Отчет для сохранения.
         filename (str, optional): Название файла для сохранения отчета. Defaults to "report.json".
     """
-    logger.info(f"Сохранение отчета в файл: {filename}")
-    report_json = report.to_json(orient="records")
-    with open(filename, mode="w", encoding="utf-8") as f:
-        f.write(report_json)
-    logger.info(f"Отчет сохранен успешно: {filename}")
+    logger.info("Сохранение отчета в файл: %s", filename)
+    path = write_report(report, filename)
+    logger.info("Отчет сохранен успешно: %s", path)
 
 
 def save_report_to_file_decorator(filename: str = "report.json") -> Callable[[Callable[..., Any]], Callable[..., Any]]:
     def decorator(func: Callable[..., Any]) -> Callable[..., Any]:
         def wrapper(*args: Any, **kwargs: Any) -> Any:
+            import pandas as pd
+
             report = func(*args, **kwargs)
             if isinstance(report, pd.DataFrame):
                 save_report_to_file(report, filename)
@@ -154,9 +178,12 @@ def save_report_to_file_decorator(filename: str = "report.json") -> Callable[[Ca
 
 
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
     logger.info("Основная функция запущена")
 
-    spending_by_category(transactions, "Каршеринг", "01.03.2022")
-    spending_by_weekday(transactions, "01.03.2022")
-    spending_by_workday(transactions, "01.03.2022")
+    transactions = get_dataset()
+
+    spending_by_category(transactions, "Каршеринг", "2022-03-01")
+    spending_by_weekday(transactions, "2022-03-01")
+    spending_by_workday(transactions, "2022-03-01")
     logger.info("Скрипт завершен")
@@ -0,0 +1,224 @@
+from __future__ import annotations
+
+import datetime
+import os
+import threading
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Optional, Tuple
+
+from src.currency import get_normalized_dataset
+from src.loader import DEFAULT_STATEMENT_PATH, on_dataset_invalidated
+from src.production_calendar import is_workday
+from src.transactions import (
+    CARD_NUMBER,
+    CASHBACK,
+    CASHBACK_RATE,
+    CATEGORY,
+    INVEST_ROUNDING,
+    MCC,
+    OPERATION_AMOUNT,
+    OPERATION_DATE,
+    STATUS,
+    TransactionData,
+    as_transaction_table,
+    concat_tables,
+    frame_fingerprint,
+)
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+DAY = "day"
+DIMENSIONS = [CATEGORY, CARD_NUMBER, MCC, STATUS]
+MEASURES = {"amount": OPERATION_AMOUNT, "cashback": CASHBACK, "rounding": INVEST_ROUNDING}
+
+
+class DailyRollup:
+    """
+    Предагрегированный куб транзакций по дням, категориям, картам, MCC и статусам.
+
+    Для каждой комбинации хранятся сумма операций, число операций, кэшбэк и округление на «Инвесткопилку».
+    Если в выписке нет столбца «Кэшбэк», кэшбэк оценивается как 1% от суммы операций.
+    Куб отсортирован по дням, поэтому запросы за окно дат обрабатывают только строки этого окна.
+    """
+
+    def __init__(self, cube: pd.DataFrame) -> None:
+        self.cube = cube
+        self._fingerprint: Optional[str] = None
+
+    def fingerprint(self) -> str:
+        """
+        Возвращает отпечаток содержимого куба, вычисляя его один раз до следующего append.
+
+        Returns:
+            str: Шестнадцатеричный отпечаток.
+        """
+        if self._fingerprint is None:
+            self._fingerprint = frame_fingerprint(self.cube)
+        return self._fingerprint
+
+    @classmethod
+    def from_transactions(cls, transactions: TransactionData) -> "DailyRollup":
+        """
+        Строит куб по таблице транзакций.
+
+        Args:
+            transactions (TransactionData): Таблица транзакций или список транзакций.
+
+        Returns:
+            DailyRollup: Куб транзакций.
+        """
+        return cls(_aggregate(as_transaction_table(transactions)))
+
+    def append(self, transactions: TransactionData) -> None:
+        """
+        Добавляет новые транзакции, пересчитывая только затронутые дни.
+
+        Args:
+            transactions (TransactionData): Новые транзакции.
+        """
+        update = _aggregate(as_transaction_table(transactions))
+        if update.empty:
+            return
+        self._fingerprint = None
+        if self.cube.empty or update[DAY].iloc[0] > self.cube[DAY].iloc[-1]:
+            self.cube = concat_tables([self.cube, update])
+            return
+        touched = self.cube[DAY].isin(update[DAY].unique())
+        merged = concat_tables([self.cube[touched], update])
+        dimensions = [column for column in DIMENSIONS if column in merged.columns]
+        regrouped = merged.groupby([DAY, *dimensions], observed=True, dropna=False).sum().reset_index()
+        self.cube = (
+            concat_tables([self.cube[~touched], regrouped]).sort_values(DAY, kind="stable").reset_index(drop=True)
+        )
+
+    def window(self, start: datetime.date, end: datetime.date) -> pd.DataFrame:
+        """
+        Возвращает строки куба за дни с start по end включительно.
+
+        Args:
+            start (datetime.date): Первый день окна.
+            end (datetime.date): Последний день окна.
+
+        Returns:
+            pd.DataFrame: Строки куба за окно.
+        """
+        import numpy as np
+
+        days = self.cube[DAY].to_numpy()
+        first = days.searchsorted(np.datetime64(start, "ns"), side="left")
+        last = days.searchsorted(np.datetime64(end, "ns"), side="right")
+        return self.cube.iloc[first:last]
+
+    def spending_by_category(self, start: datetime.date, end: datetime.date) -> pd.Series:
+        """
+        Возвращает сумму операций по категориям за окно.
+
+        Args:
+            start (datetime.date): Первый день окна.
+            end (datetime.date): Последний день окна.
+
+        Returns:
+            pd.Series: Сумма операций по категориям.
+        """
+        window = self.window(start, end)
+        return window.groupby(CATEGORY, observed=True)["amount"].sum()
+
+    def mean_spending_by_weekday(self, start: datetime.date, end: datetime.date) -> pd.Series:
+        """
+        Возвращает среднюю сумму операции по дням недели (0 — понедельник) за окно.
+
+        Args:
+            start (datetime.date): Первый день окна.
+            end (datetime.date): Последний день окна.
+
+        Returns:
+            pd.Series: Средняя сумма операции по кодам дней недели.
+        """
+        window = self.window(start, end)
+        grouped = window[["amount", "count"]].groupby(window[DAY].dt.dayofweek).sum()
+        return grouped["amount"] / grouped["count"]
+
+    def mean_spending_by_workday(self, start: datetime.date, end: datetime.date) -> pd.Series:
+        """
+        Возвращает среднюю сумму операции в рабочие (True) и выходные (False) дни за окно.
+
+        Args:
+            start (datetime.date): Первый день окна.
+            end (datetime.date): Последний день окна.
+
+        Returns:
+            pd.Series: Средняя сумма операции по типу дня.
+        """
+        window = self.window(start, end)
+        grouped = window[["amount", "count"]].groupby(is_workday(window[DAY])).sum()
+        return grouped["amount"] / grouped["count"]
+
+    def monthly_cashback(self, periods: Optional[Iterable[Tuple[int, int]]] = None) -> pd.DataFrame:
+        """
+        Возвращает кэшбэк по категориям за месяцы.
+
+        Args:
+            periods (Optional[Iterable[Tuple[int, int]]]): Пары (год, месяц). По умолчанию — все месяцы.
+
+        Returns:
+            pd.DataFrame: Таблица со столбцами «year», «month», «category» и «cashback».
+        """
+        cube = self.cube
+        period_keys = cube[DAY].dt.year * 100 + cube[DAY].dt.month
+        if periods is not None:
+            mask = period_keys.isin([year * 100 + month for year, month in periods])
+            cube = cube[mask]
+            period_keys = period_keys[mask]
+        grouped = cube["cashback"].groupby([period_keys.rename("period"), cube[CATEGORY]], observed=True).sum()
+        result = grouped.reset_index()
+        result.insert(0, "year", result["period"] // 100)
+        result.insert(1, "month", result["period"] % 100)
+        return result.drop(columns="period").rename(columns={CATEGORY: "category"})
+
+
+def _aggregate(table: pd.DataFrame) -> pd.DataFrame:
+    import pandas as pd
+
+    columns: Dict[str, Any] = {DAY: table[OPERATION_DATE].dt.normalize()}
+    dimensions: List[str] = []
+    for dimension in DIMENSIONS:
+        if dimension in table.columns:
+            columns[dimension] = table[dimension]
+            dimensions.append(dimension)
+    for measure, column in MEASURES.items():
+        columns[measure] = table[column].fillna(0.0) if column in table.columns else 0.0
+    if CASHBACK not in table.columns:
+        columns["cashback"] = table[OPERATION_AMOUNT].fillna(0.0) * CASHBACK_RATE
+    columns["count"] = table[OPERATION_AMOUNT].notna().astype("int64")
+    frame = pd.DataFrame(columns).dropna(subset=[DAY])
+    return frame.groupby([DAY, *dimensions], observed=True, dropna=False).sum().reset_index()
+
+
+_rollups: Dict[str, DailyRollup] = {}
+_rollups_lock = threading.Lock()
+
+
+def get_daily_rollup(file_path: str = DEFAULT_STATEMENT_PATH) -> DailyRollup:
+    """
+    Возвращает общий для процесса куб транзакций, строя его при первом обращении.
+
+    Args:
+        file_path (str): Путь к файлу выписки. Defaults to data/operations.xlsx.
+
+    Returns:
+        DailyRollup: Куб транзакций.
+    """
+    key = os.path.abspath(file_path)
+    with _rollups_lock:
+        if key not in _rollups:
+            _rollups[key] = DailyRollup.from_transactions(get_normalized_dataset(file_path))
+        return _rollups[key]
+
+
+@on_dataset_invalidated
+def _invalidate_rollups(key: Optional[str]) -> None:
+    with _rollups_lock:
+        if key is None:
+            _rollups.clear()
+        else:
+            _rollups.pop(key, None)
@@ -0,0 +1,346 @@
+from __future__ import annotations
+
+import bisect
+import functools
+import logging
+import os
+import re
+import tempfile
+import threading
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
+
+from src.currency import get_normalized_dataset
+from src.loader import DEFAULT_STATEMENT_PATH, on_dataset_invalidated
+from src.metrics import metrics, timed
+from src.transactions import CATEGORY, DESCRIPTION, OPERATION_AMOUNT, TransactionData, as_transaction_table
+
+if TYPE_CHECKING:
+    import numpy as np
+    import pandas as pd
+    from numpy.typing import NDArray
+
+logger = logging.getLogger(__name__)
+
+SEARCH_SUFFIX = ".search.npz"
+SEARCH_VERSION = 2
+
+SORT_BY_DATE = "date"
+SORT_BY_AMOUNT = "amount"
+SORT_KEYS = (SORT_BY_DATE, SORT_BY_AMOUNT)
+DEFAULT_SEARCH_LIMIT = 50
+
+# Ключ вхождения термина: номер документа в старших битах, позиция слова в документе — в младших
+POSITION_BITS = 16
+MAX_POSITION = (1 << POSITION_BITS) - 1
+# Пропуск позиций между категорией и описанием, чтобы фраза не склеивала слова из разных полей
+FIELD_GAP = 2
+
+TERM = "term"
+PREFIX = "prefix"
+PHRASE = "phrase"
+
+_TOKEN_PATTERN = re.compile(r"\w+")
+_CLAUSE_PATTERN = re.compile(r'"([^"]*)"|(\S+)')
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Разбивает текст на слова в нижнем регистре; буква «ё» заменяется на «е».
+
+    Args:
+        text (str): Текст.
+
+    Returns:
+        List[str]: Слова в порядке следования.
+    """
+    return _TOKEN_PATTERN.findall(text.lower().replace("ё", "е"))
+
+
+def parse_query(query: str) -> List[Tuple[str, Tuple[str, ...]]]:
+    """
+    Разбирает поисковый запрос на условия, объединяемые через «и».
+
+    Слово ищется целиком, слово со звездочкой на конце («апт*») — как префикс, текст в кавычках —
+    как фраза из идущих подряд слов.
+
+    Args:
+        query (str): Поисковый запрос.
+
+    Returns:
+        List[Tuple[str, Tuple[str, ...]]]: Пары (вид условия, слова).
+    """
+    clauses: List[Tuple[str, Tuple[str, ...]]] = []
+    for phrase, word in _CLAUSE_PATTERN.findall(query):
+        tokens = tuple(tokenize(phrase or word))
+        if not tokens:
+            continue
+        if len(tokens) > 1:
+            clauses.append((PHRASE, tokens))
+        elif word.endswith("*"):
+            clauses.append((PREFIX, tokens))
+        else:
+            clauses.append((TERM, tokens))
+    return clauses
+
+
+def _documents(table: pd.DataFrame) -> Tuple[NDArray[np.intp], NDArray[np.str_], NDArray[np.str_]]:
+    """Сопоставляет строкам документы — уникальные пары (описание, категория)."""
+    import numpy as np
+
+    fields = []
+    for column in (DESCRIPTION, CATEGORY):
+        if column in table.columns:
+            series = table[column]
+            # Коды сдвинуты на 1, чтобы пустое значение (код -1) стало кодом 0 — пустой строкой словаря
+            codes = series.cat.codes.to_numpy().astype(np.int64) + 1
+            values = np.asarray([""] + [str(value) for value in series.cat.categories], dtype=str)
+        else:
+            codes = np.zeros(len(table), dtype=np.int64)
+            values = np.asarray([""], dtype=str)
+        fields.append((codes, values))
+    (description_codes, descriptions), (category_codes, categories) = fields
+    width = len(categories)
+    pairs, doc_of_row = np.unique(description_codes * width + category_codes, return_inverse=True)
+    return doc_of_row, descriptions[pairs // width], categories[pairs % width]
+
+
+def _build_postings(
+    descriptions: NDArray[np.str_], categories: NDArray[np.str_]
+) -> Tuple[List[str], NDArray[np.int64], NDArray[np.int64]]:
+    import numpy as np
+
+    postings: Dict[str, List[int]] = {}
+    for doc, fields in enumerate(zip(categories, descriptions)):
+        position = 0
+        for text in fields:
+            for token in tokenize(str(text)):
+                postings.setdefault(token, []).append(doc << POSITION_BITS | min(position, MAX_POSITION))
+                position += 1
+            position += FIELD_GAP
+    terms = sorted(postings)
+    offsets = np.zeros(len(terms) + 1, dtype=np.int64)
+    offsets[1:] = np.cumsum([len(postings[term]) for term in terms])
+    keys = np.fromiter((key for term in terms for key in postings[term]), dtype=np.int64, count=int(offsets[-1]))
+    return terms, offsets, keys
+
+
+class TransactionSearch:
+    """
+    Полнотекстовый поиск по описаниям и категориям транзакций.
+
+    Описание и категория — категориальные столбцы, поэтому индексируются не строки, а уникальные пары
+    (описание, категория); их обычно на порядки меньше, чем транзакций. Инвертированный индекс хранит
+    для каждого слова отсортированный список вхождений «документ, позиция». Словарь отсортирован, поэтому
+    слова с общим префиксом образуют непрерывный отрезок, который находится двоичным поиском и заменяет
+    префиксное дерево. Фраза ищется пересечением вхождений соседних слов со сдвигом позиции на единицу,
+    условия запроса — пересечением списков документов. Найденные документы переводятся в строки таблицы
+    через группировку строк по документам.
+    """
+
+    def __init__(self, transactions: TransactionData, index_path: Optional[str] = None) -> None:
+        import numpy as np
+
+        self.table = as_transaction_table(transactions)
+        doc_of_row, descriptions, categories = _documents(self.table)
+        loaded = _read_index(index_path, descriptions, categories) if index_path else None
+        if index_path:
+            metrics.record_cache("search_index", hit=loaded is not None)
+        if loaded is None:
+            self._terms, self._offsets, self._keys = _build_postings(descriptions, categories)
+            if index_path:
+                try:
+                    _write_index(index_path, self._terms, self._offsets, self._keys, descriptions, categories)
+                except OSError as error:
+                    logger.warning("Не удалось сохранить поисковый индекс %s: %s", index_path, error)
+        else:
+            self._terms, self._offsets, self._keys = loaded
+        self._rows_by_doc = np.argsort(doc_of_row, kind="stable")
+        self._doc_bounds = np.searchsorted(doc_of_row[self._rows_by_doc], np.arange(len(descriptions) + 1))
+        logger.info("Построен поисковый индекс: %s слов, %s документов", len(self._terms), len(descriptions))
+
+    def __len__(self) -> int:
+        return len(self.table)
+
+    def _term_keys(self, start: int, stop: int) -> NDArray[np.int64]:
+        keys: NDArray[np.int64] = self._keys[self._offsets[start] : self._offsets[stop]]  # noqa: E203
+        return keys
+
+    def _term_range(self, term: str, prefix: bool = False) -> Tuple[int, int]:
+        start = bisect.bisect_left(self._terms, term)
+        if prefix:
+            return start, bisect.bisect_left(self._terms, term + "\U0010ffff", start)
+        if start < len(self._terms) and self._terms[start] == term:
+            return start, start + 1
+        return start, start
+
+    def _clause_docs(self, kind: str, tokens: Tuple[str, ...]) -> NDArray[np.int64]:
+        import numpy as np
+
+        if kind == PHRASE:
+            matches = self._term_keys(*self._term_range(tokens[0]))
+            for shift, token in enumerate(tokens[1:], 1):
+                if not len(matches):
+                    break
+                following = self._term_keys(*self._term_range(token)) - shift
+                matches = np.intersect1d(matches, following, assume_unique=True)
+        else:
+            matches = self._term_keys(*self._term_range(tokens[0], prefix=kind == PREFIX))
+        docs: NDArray[np.int64] = np.unique(matches >> POSITION_BITS)
+        return docs
+
+    def positions(self, query: str) -> NDArray[np.int64]:
+        """
+        Возвращает позиции строк таблицы, описание или категория которых удовлетворяют запросу.
+
+        Args:
+            query (str): Поисковый запрос.
+
+        Returns:
+            NDArray[np.int64]: Возрастающие позиции строк.
+
+        Raises:
+            ValueError: Если запрос не содержит ни одного слова.
+        """
+        import numpy as np
+
+        clauses = parse_query(query)
+        if not clauses:
+            raise ValueError("Поисковый запрос не содержит слов")
+        docs_by_clause = sorted((self._clause_docs(kind, tokens) for kind, tokens in clauses), key=len)
+        docs = functools.reduce(
+            lambda left, right: np.intersect1d(left, right, assume_unique=True), docs_by_clause[1:], docs_by_clause[0]
+        )
+        starts = self._doc_bounds[docs]
+        counts = self._doc_bounds[docs + 1] - starts
+        total = int(counts.sum())
+        if not total:
+            return np.array([], dtype=np.int64)
+        shifts = np.repeat(starts - (np.cumsum(counts) - counts), counts)
+        rows = self._rows_by_doc[np.arange(total) + shifts]
+        return np.sort(rows).astype(np.int64, copy=False)
+
+    @timed("search", rows=len)
+    def search(self, query: str, sort: str = SORT_BY_DATE, limit: Optional[int] = None) -> pd.DataFrame:
+        """
+        Возвращает транзакции, удовлетворяющие запросу.
+
+        Args:
+            query (str): Поисковый запрос: слова, префиксы «слово*» и фразы в кавычках.
+            sort (str): Порядок: «date» — сначала новые, «amount» — по убыванию модуля суммы. Defaults to «date».
+            limit (Optional[int]): Наибольшее число транзакций. Defaults to None — все найденные.
+
+        Returns:
+            pd.DataFrame: Найденные транзакции.
+
+        Raises:
+            ValueError: Если запрос пуст или порядок сортировки неизвестен.
+        """
+        import numpy as np
+
+        if sort not in SORT_KEYS:
+            raise ValueError(f"Неизвестный порядок сортировки: {sort!r}")
+        rows = self.positions(query)[::-1]
+        if sort == SORT_BY_AMOUNT and OPERATION_AMOUNT in self.table.columns:
+            amounts = self.table[OPERATION_AMOUNT].to_numpy(dtype="float64", na_value=np.nan)[rows]
+            rows = rows[np.argsort(-np.nan_to_num(np.abs(amounts), nan=-1.0), kind="stable")]
+        if limit is not None:
+            rows = rows[:limit]
+        return self.table.iloc[rows]
+
+
+def _read_index(
+    index_path: str, descriptions: NDArray[np.str_], categories: NDArray[np.str_]
+) -> Optional[Tuple[List[str], NDArray[np.int64], NDArray[np.int64]]]:
+    """Читает сохраненный индекс, если он построен по тем же документам."""
+    import numpy as np
+
+    if not os.path.exists(index_path):
+        return None
+    try:
+        with np.load(index_path, allow_pickle=False) as npz:
+            if int(npz["version"]) != SEARCH_VERSION:
+                return None
+            if not (
+                np.array_equal(npz["descriptions"], descriptions) and np.array_equal(npz["categories"], categories)
+            ):
+                return None
+            return npz["terms"].tolist(), npz["offsets"], npz["keys"]
+    except (OSError, KeyError, ValueError) as error:
+        logger.warning("Поисковый индекс %s не прочитан: %s", index_path, error)
+        return None
+
+
+def _write_index(
+    index_path: str,
+    terms: List[str],
+    offsets: NDArray[np.int64],
+    keys: NDArray[np.int64],
+    descriptions: NDArray[np.str_],
+    categories: NDArray[np.str_],
+) -> None:
+    import numpy as np
+
+    arrays: Dict[str, Any] = {
+        "version": np.asarray(SEARCH_VERSION),
+        "terms": np.asarray(terms, dtype=str),
+        "offsets": offsets,
+        "keys": keys,
+        "descriptions": descriptions,
+        "categories": categories,
+    }
+    directory = os.path.dirname(os.path.abspath(index_path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            np.savez(f, **arrays)
+        os.replace(tmp_path, index_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def get_index_path(file_path: str) -> str:
+    """
+    Возвращает путь к поисковому индексу, который хранится рядом с кэшем выписки.
+
+    Args:
+        file_path (str): Путь к файлу выписки.
+
+    Returns:
+        str: Путь к файлу индекса.
+    """
+    return file_path + SEARCH_SUFFIX
+
+
+_searches: Dict[str, TransactionSearch] = {}
+_searches_lock = threading.Lock()
+
+
+def get_transaction_search(file_path: str = DEFAULT_STATEMENT_PATH) -> TransactionSearch:
+    """
+    Возвращает общий для процесса поиск по выписке, строя или загружая индекс при первом обращении.
+
+    Индекс сохраняется рядом с выпиской и используется повторно, пока в выписке те же пары
+    (описание, категория).
+
+    Args:
+        file_path (str): Путь к файлу выписки. Defaults to data/operations.xlsx.
+
+    Returns:
+        TransactionSearch: Поиск по транзакциям.
+    """
+    key = os.path.abspath(file_path)
+    with _searches_lock:
+        if key not in _searches:
+            _searches[key] = TransactionSearch(get_normalized_dataset(file_path), get_index_path(file_path))
+        return _searches[key]
+
+
+@on_dataset_invalidated
+def _invalidate_searches(key: Optional[str]) -> None:
+    with _searches_lock:
+        if key is None:
+            _searches.clear()
+        else:
+            _searches.pop(key, None)
@@ -0,0 +1,231 @@
+from __future__ import annotations
+
+import argparse
+import datetime
+import hashlib
+import json
+import logging
+import os
+import sys
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+from config import ROOT_DIR, SERVER_HOST, SERVER_PORT
+from src.loader import DEFAULT_STATEMENT_PATH
+from src.transactions import DATE_TIME_FORMAT, DEFAULT_REPORT_CATEGORY
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SETTINGS_PATH = os.path.join(ROOT_DIR, "user_settings.json")
+
+Response = Tuple[int, bytes]
+
+
+class BadRequest(ValueError):
+    """Некорректные параметры запроса."""
+
+
+class DashboardApp:
+    """
+    Приложение, отдающее дашборд и отчеты по выписке.
+
+    Таблица транзакций, куб DailyRollup и кэш рыночных данных загружаются один раз и переиспользуются
+    всеми запросами; перезагрузка происходит только после invalidate_dataset.
+    """
+
+    def __init__(
+        self, statement_path: str = DEFAULT_STATEMENT_PATH, settings_path: str = DEFAULT_SETTINGS_PATH
+    ) -> None:
+        self.statement_path = statement_path
+        with open(settings_path, "r", encoding="utf-8") as f:
+            self.settings: Dict[str, Any] = json.load(f)
+        self.routes: Dict[str, Callable[[Dict[str, str]], str]] = {
+            "/dashboard": self.dashboard,
+            "/reports/spending_by_category": self.spending_by_category,
+            "/reports/spending_by_weekday": self.spending_by_weekday,
+            "/reports/spending_by_workday": self.spending_by_workday,
+            "/search": self.search,
+        }
+
+    def warm_up(self) -> None:
+        """Загружает выписку, строит куб и поисковый индекс и создает кэш рыночных данных до первого запроса."""
+        from src.currency import get_normalized_dataset
+        from src.market_cache import get_market_data_cache
+        from src.rollup import get_daily_rollup
+        from src.search import get_transaction_search
+
+        get_normalized_dataset(self.statement_path)
+        get_daily_rollup(self.statement_path)
+        get_transaction_search(self.statement_path)
+        get_market_data_cache()
+        logger.info("Данные %s загружены в память", self.statement_path)
+
+    def dashboard(self, params: Dict[str, str]) -> str:
+        from src.currency import get_normalized_dataset
+        from src.views import get_json_response
+
+        date_time = _parse_date(params.get("date"), DATE_TIME_FORMAT) or datetime.datetime.now()
+        transactions = get_normalized_dataset(self.statement_path)
+        return get_json_response(date_time, {"transactions": transactions}, self.settings)
+
+    def spending_by_category(self, params: Dict[str, str]) -> str:
+        from src.reports import spending_by_category
+        from src.rollup import get_daily_rollup
+
+        date = _report_date(params)
+        category = params.get("category", DEFAULT_REPORT_CATEGORY)
+        report = spending_by_category(get_daily_rollup(self.statement_path), category, date)
+        return str(report.to_json(orient="records", force_ascii=False))
+
+    def spending_by_weekday(self, params: Dict[str, str]) -> str:
+        from src.reports import spending_by_weekday
+        from src.rollup import get_daily_rollup
+
+        report = spending_by_weekday(get_daily_rollup(self.statement_path), _report_date(params))
+        return str(report.to_json(orient="records", force_ascii=False))
+
+    def spending_by_workday(self, params: Dict[str, str]) -> str:
+        from src.reports import spending_by_workday
+        from src.rollup import get_daily_rollup
+
+        report = spending_by_workday(get_daily_rollup(self.statement_path), _report_date(params))
+        return str(report.to_json(orient="records", force_ascii=False))
+
+    def search(self, params: Dict[str, str]) -> str:
+        from src.search import DEFAULT_SEARCH_LIMIT, SORT_BY_DATE, get_transaction_search
+        from src.transactions import to_str_records
+
+        query = params.get("q", "")
+        try:
+            limit = int(params.get("limit", DEFAULT_SEARCH_LIMIT))
+            found = get_transaction_search(self.statement_path).search(query, params.get("sort", SORT_BY_DATE), limit)
+        except ValueError as error:
+            raise BadRequest(str(error))
+        return json.dumps(to_str_records(found), ensure_ascii=False)
+
+    def handle(self, target: str) -> Response:
+        """
+        Обрабатывает GET-запрос.
+
+        Args:
+            target (str): Путь запроса с параметрами.
+
+        Returns:
+            Response: HTTP-статус и тело ответа в JSON.
+        """
+        url = urlparse(target)
+        route = self.routes.get(url.path)
+        if route is None:
+            return HTTPStatus.NOT_FOUND, _error(f"Неизвестный путь: {url.path}")
+        params = {name: values[-1] for name, values in parse_qs(url.query).items()}
+        try:
+            return HTTPStatus.OK, route(params).encode("utf-8")
+        except BadRequest as error:
+            return HTTPStatus.BAD_REQUEST, _error(str(error))
+
+
+def _error(message: str) -> bytes:
+    return json.dumps({"error": message}, ensure_ascii=False).encode("utf-8")
+
+
+def _parse_date(value: Optional[str], date_format: str) -> Optional[datetime.datetime]:
+    if value is None:
+        return None
+    try:
+        return datetime.datetime.strptime(value, date_format)
+    except ValueError:
+        raise BadRequest(f"Дата {value!r} не соответствует формату {date_format}")
+
+
+def _report_date(params: Dict[str, str]) -> Optional[str]:
+    date = params.get("date")
+    _parse_date(date, "%Y-%m-%d")
+    return date
+
+
+def etag(body: bytes) -> str:
+    """
+    Возвращает сильный ETag для тела ответа.
+
+    Args:
+        body (bytes): Тело ответа.
+
+    Returns:
+        str: Значение заголовка ETag.
+    """
+    return f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+
+
+class DashboardHandler(BaseHTTPRequestHandler):
+    server: DashboardServer
+
+    def do_GET(self) -> None:
+        try:
+            status, body = self.server.app.handle(self.path)
+        except Exception:
+            logger.exception("Ошибка при обработке %s", self.path)
+            status, body = HTTPStatus.INTERNAL_SERVER_ERROR, _error("Внутренняя ошибка сервера")
+        tag = etag(body)
+        if status == HTTPStatus.OK and tag in _if_none_match(self.headers.get("If-None-Match")):
+            self.send_response(HTTPStatus.NOT_MODIFIED)
+            self.send_header("ETag", tag)
+            self.end_headers()
+            return
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Cache-Control", "no-cache")
+        if status == HTTPStatus.OK:
+            self.send_header("ETag", tag)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args: Any) -> None:
+        logger.info("%s - " + format, self.address_string(), *args)
+
+
+def _if_none_match(header: Optional[str]) -> List[str]:
+    if not header:
+        return []
+    return [tag.strip().removeprefix("W/") for tag in header.split(",")]
+
+
+class DashboardServer(ThreadingHTTPServer):
+    """Многопоточный HTTP-сервер: каждый запрос обрабатывается в своем потоке над общими данными."""
+
+    daemon_threads = True
+
+    def __init__(self, app: DashboardApp, host: str = SERVER_HOST, port: int = SERVER_PORT) -> None:
+        super().__init__((host, port), DashboardHandler)
+        self.app = app
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """
+    Запускает HTTP-сервер дашборда.
+
+    Args:
+        argv (Optional[List[str]], optional): Аргументы командной строки. Defaults to None — без аргументов.
+    """
+    parser = argparse.ArgumentParser(description="HTTP-сервер дашборда и отчетов")
+    parser.add_argument("--statement", default=DEFAULT_STATEMENT_PATH, help="Путь к файлу выписки")
+    parser.add_argument("--settings", default=DEFAULT_SETTINGS_PATH, help="Путь к настройкам пользователя")
+    parser.add_argument("--host", default=SERVER_HOST, help="Адрес сервера")
+    parser.add_argument("--port", type=int, default=SERVER_PORT, help="Порт сервера")
+    args = parser.parse_args([] if argv is None else argv)
+
+    logging.basicConfig(level=logging.INFO)
+    app = DashboardApp(args.statement, args.settings)
+    app.warm_up()
+    with DashboardServer(app, args.host, args.port) as server:
+        logger.info("Сервер запущен на http://%s:%s", *server.server_address[:2])
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            logger.info("Сервер остановлен")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
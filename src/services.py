@@ -1,38 +1,132 @@
-import datetime
+from __future__ import annotations
+
 import json
 import logging
-from typing import Dict, List
+from typing import TYPE_CHECKING, Dict, Iterable, Optional, Sequence, Tuple, Union
+
+from src.metrics import timed
+from src.rollup import DailyRollup
+from src.transactions import (
+    CASHBACK,
+    CASHBACK_RATE,
+    CATEGORY,
+    OPERATION_AMOUNT,
+    OPERATION_DATE,
+    STATUS,
+    STATUS_OK,
+    TransactionData,
+    as_transaction_table,
+    month_positions,
+)
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+INVEST_STEPS = (10, 50, 100)
+
+
+def cashback_by_category(
+    transactions: Union[TransactionData, DailyRollup], periods: Optional[Iterable[Tuple[int, int]]] = None
+) -> pd.DataFrame:
+    """
+    Рассчитывает кэшбэк по категориям сразу для нескольких месяцев за один проход.
+
+    Если в данных есть столбец «Кэшбэк», суммируется фактический кэшбэк, иначе он оценивается
+    как 1% от суммы операций.
+
+    Аргументы:
+        transactions (Union[TransactionData, DailyRollup]): Таблица транзакций, список транзакций или куб.
+        periods (Optional[Iterable[Tuple[int, int]]]): Пары (год, месяц). По умолчанию — все месяцы.
+
+    Возвращает:
+        pd.DataFrame: Таблица со столбцами «year», «month», «category» и «cashback».
+    """
+    if isinstance(transactions, DailyRollup):
+        return transactions.monthly_cashback(periods)
+    table = as_transaction_table(transactions)
+    if periods is not None:
+        table = table.iloc[month_positions(table, periods)]
+    dates = table[OPERATION_DATE].dt
+    period_keys = dates.year * 100 + dates.month
+    if CASHBACK in table.columns:
+        cashback = table[CASHBACK].fillna(0.0)
+    else:
+        cashback = table[OPERATION_AMOUNT] * CASHBACK_RATE
+    grouped = cashback.groupby([period_keys.rename("period"), table[CATEGORY]], observed=True).sum()
+    result = grouped.rename("cashback").reset_index()
+    result.insert(0, "year", result["period"] // 100)
+    result.insert(1, "month", result["period"] % 100)
+    return result.drop(columns="period").rename(columns={CATEGORY: "category"})
 
 
-def analyze_cashback_categories(data: Dict[str, List[Dict[str, str]]], year: int, month: int) -> str:
+@timed("services")
+def analyze_cashback_categories(data: Dict[str, TransactionData], year: int, month: int) -> str:
     """
     Анализирует категории кэшбэка за указанный год и месяц.
 
     Аргументы:
-        data (Dict[str, List[Dict[str, str]]]): Данные, содержащие транзакции.
+        data (Dict[str, TransactionData]): Данные, содержащие транзакции.
         year (int): Год, за который необходимо проанализировать категории кэшбэка.
         month (int): Месяц, за который необходимо проанализировать категории кэшбэка.
 
     Возвращает:
         str: JSON-строка, содержащая категории кэшбэка.
     """
-    logging.info(f"Анализируются категории кэшбэка за {year}-{month:02d}")
-    categories: Dict[str, float] = {}
-    for transaction in data["transactions"]:
-        transaction_date = datetime.datetime.strptime(
-            transaction["\u0414\u0430\u0442\u0430 \u043e\u043f\u0435\u0440\u0430\u0446\u0438\u0438"],
-            "%d.%m.%Y %H:%M:%S",
-        )
-        if transaction_date.year == year and transaction_date.month == month:
-            category = transaction["category"]
-            amount = float(transaction["amount"])
-            if category in categories:
-                categories[category] += amount
-            else:
-                categories[category] = amount
-    cashback_categories: Dict[str, float] = {}
-    for category, amount in categories.items():
-        cashback = amount * 0.01
-        cashback_categories[category] = cashback
-    logging.info(f"Категории кэшбэка проанализированы: {cashback_categories}")
+    logging.info("Анализируются категории кэшбэка за %s-%02d", year, month)
+    cashback = cashback_by_category(data["transactions"], [(year, month)])
+    cashback_categories: Dict[str, float] = {
+        str(category): float(value) for category, value in zip(cashback["category"], cashback["cashback"])
+    }
+    logging.debug("Категории кэшбэка проанализированы: %s", cashback_categories)
     return json.dumps(cashback_categories)
+
+
+def invest_savings_by_month(
+    transactions: TransactionData,
+    steps: Sequence[int] = INVEST_STEPS,
+    periods: Optional[Iterable[Tuple[int, int]]] = None,
+) -> pd.DataFrame:
+    """
+    Рассчитывает, сколько накопила бы «Инвесткопилка» при округлении трат до каждого из шагов.
+
+    Каждая успешная трата округляется вверх до кратного шагу, а разница откладывается в копилку.
+    Остатки для всех шагов считаются одной операцией над матрицей «трата × шаг» в копейках, а суммы
+    по месяцам — через np.add.reduceat по отрезкам отсортированной по дате таблицы, без циклов по строкам.
+
+    Аргументы:
+        transactions (TransactionData): Таблица транзакций или список транзакций.
+        steps (Sequence[int]): Шаги округления в рублях. По умолчанию — 10, 50 и 100.
+        periods (Optional[Iterable[Tuple[int, int]]]): Пары (год, месяц). По умолчанию — все месяцы.
+
+    Возвращает:
+        pd.DataFrame: Таблица со столбцами «year», «month», «step» и «savings» по месяцам с тратами.
+    """
+    import numpy as np
+    import pandas as pd
+
+    if not steps or any(int(step) != step or step <= 0 for step in steps):
+        raise ValueError(f"Шаги округления должны быть положительными целыми числами: {steps}")
+    table = as_transaction_table(transactions)
+    if periods is not None:
+        table = table.iloc[month_positions(table, periods)]
+    amounts = table[OPERATION_AMOUNT].to_numpy(dtype="float64", na_value=np.nan)
+    spends = amounts < 0
+    if STATUS in table.columns:
+        spends &= (table[STATUS] == STATUS_OK).to_numpy()
+
+    kopecks = np.rint(-amounts[spends] * 100).astype(np.int64)
+    step_kopecks = np.asarray(steps, dtype=np.int64) * 100
+    remainders = -kopecks[:, None] % step_kopecks
+
+    months = table[OPERATION_DATE].to_numpy()[spends].astype("datetime64[M]")
+    starts = np.flatnonzero(np.r_[True, months[1:] != months[:-1]]) if len(months) else np.array([], dtype=np.intp)
+    totals = np.add.reduceat(remainders, starts, axis=0) if len(starts) else np.zeros((0, len(steps)), np.int64)
+    month_numbers = months[starts].astype(np.int64)
+    return pd.DataFrame(
+        {
+            "year": np.repeat(month_numbers // 12 + 1970, len(steps)),
+            "month": np.repeat(month_numbers % 12 + 1, len(steps)),
+            "step": np.tile(np.asarray(steps, dtype=np.int64), len(starts)),
+            "savings": totals.ravel() / 100,
+        }
+    )
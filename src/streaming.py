@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+import logging
+import os
+from typing import TYPE_CHECKING, Any, Iterable, Iterator, List
+
+from src.rollup import DailyRollup
+from src.transactions import to_transaction_table
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHUNK_SIZE = 50_000
+
+EXCEL_EXTENSIONS = (".xlsx", ".xlsm")
+CSV_EXTENSIONS = (".csv",)
+NDJSON_EXTENSIONS = (".ndjson", ".jsonl")
+
+
+def _iter_excel(file_path: str, chunk_size: int) -> Iterator[pd.DataFrame]:
+    import openpyxl  # type: ignore[import-untyped]
+    import pandas as pd
+
+    workbook = openpyxl.load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        header = [str(name) for name in next(rows, ())]
+        batch: List[Any] = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= chunk_size:
+                yield pd.DataFrame.from_records(batch, columns=header)
+                batch = []
+        if batch:
+            yield pd.DataFrame.from_records(batch, columns=header)
+    finally:
+        workbook.close()
+
+
+def _iter_csv(file_path: str, chunk_size: int) -> Iterator[pd.DataFrame]:
+    import pandas as pd
+
+    with pd.read_csv(file_path, chunksize=chunk_size) as reader:
+        yield from reader
+
+
+def _iter_ndjson(file_path: str, chunk_size: int) -> Iterator[pd.DataFrame]:
+    import pandas as pd
+
+    with pd.read_json(file_path, lines=True, chunksize=chunk_size, dtype=False, convert_dates=False) as reader:
+        yield from reader
+
+
+def iter_transaction_chunks(file_path: str, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[pd.DataFrame]:
+    """
+    Построчно читает выписку и возвращает типизированные таблицы по chunk_size строк.
+
+    Поддерживаются файлы .xlsx (openpyxl в режиме read-only), .csv и .ndjson/.jsonl. В памяти
+    одновременно находится только один фрагмент, поэтому потребление памяти не зависит от размера файла.
+
+    Args:
+        file_path (str): Путь к файлу выписки.
+        chunk_size (int): Число строк во фрагменте. Defaults to 50 000.
+
+    Returns:
+        Iterator[pd.DataFrame]: Типизированные фрагменты таблицы транзакций.
+    """
+    if chunk_size <= 0:
+        raise ValueError("Размер фрагмента должен быть положительным")
+    extension = os.path.splitext(file_path)[1].lower()
+    if extension in EXCEL_EXTENSIONS:
+        chunks = _iter_excel(file_path, chunk_size)
+    elif extension in CSV_EXTENSIONS:
+        chunks = _iter_csv(file_path, chunk_size)
+    elif extension in NDJSON_EXTENSIONS:
+        chunks = _iter_ndjson(file_path, chunk_size)
+    else:
+        raise ValueError(f"Неподдерживаемый формат выписки: {extension}")
+    for chunk in chunks:
+        yield to_transaction_table(chunk)
+
+
+def rollup_from_chunks(chunks: Iterable[pd.DataFrame]) -> DailyRollup:
+    """
+    Строит куб DailyRollup, добавляя фрагменты по одному.
+
+    Args:
+        chunks (Iterable[pd.DataFrame]): Фрагменты таблицы транзакций.
+
+    Returns:
+        DailyRollup: Куб транзакций.
+    """
+    rollup = None
+    for chunk in chunks:
+        if rollup is None:
+            rollup = DailyRollup.from_transactions(chunk)
+        else:
+            rollup.append(chunk)
+    if rollup is None:
+        raise ValueError("Выписка не содержит транзакций")
+    return rollup
+
+
+def stream_rollup(file_path: str, chunk_size: int = DEFAULT_CHUNK_SIZE) -> DailyRollup:
+    """
+    Строит куб DailyRollup по выписке, не загружая ее в память целиком.
+
+    Args:
+        file_path (str): Путь к файлу выписки.
+        chunk_size (int): Число строк во фрагменте. Defaults to 50 000.
+
+    Returns:
+        DailyRollup: Куб транзакций для отчетов и сервисов.
+    """
+    logger.info("Потоковое чтение выписки %s фрагментами по %s строк", file_path, chunk_size)
+    return rollup_from_chunks(iter_transaction_chunks(file_path, chunk_size))
@@ -0,0 +1,262 @@
+from __future__ import annotations
+
+import argparse
+import datetime
+import logging
+import os
+import sys
+from typing import TYPE_CHECKING, Any, Iterator, List, NamedTuple, Optional
+
+from src.transactions import (
+    BONUSES,
+    CARD_NUMBER,
+    CASHBACK,
+    CATEGORY,
+    DATE_COLUMNS,
+    DESCRIPTION,
+    INVEST_ROUNDING,
+    MCC,
+    OPERATION_AMOUNT,
+    OPERATION_CURRENCY,
+    OPERATION_DATE,
+    PAYMENT_AMOUNT,
+    PAYMENT_CURRENCY,
+    PAYMENT_DATE,
+    ROUNDED_AMOUNT,
+    STATUS,
+    STATUS_OK,
+    concat_tables,
+    to_transaction_table,
+)
+
+if TYPE_CHECKING:
+    import numpy as np
+    import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_START = datetime.datetime(2018, 1, 1)
+DEFAULT_END = datetime.datetime(2022, 1, 1)
+DEFAULT_CHUNK_SIZE = 1_000_000
+
+
+class CategoryProfile(NamedTuple):
+    """Доля операций категории, типичная сумма (со знаком), MCC и описания операций."""
+
+    name: str
+    share: float
+    median_amount: float
+    mcc: Optional[str]
+    descriptions: List[str]
+
+
+# Распределения подобраны по выписке data/operations.xlsx
+CATEGORY_PROFILES = [
+    CategoryProfile("Супермаркеты", 0.339, -110.0, "5411.0", ["Колхоз", "Магнит", "SPAR", "Пятерочка"]),
+    CategoryProfile("Фастфуд", 0.193, -110.0, "5814.0", ["McDonald's", "Rumyanyj Khleb", "Теремок"]),
+    CategoryProfile("Транспорт", 0.057, -186.0, "4121.0", ["Яндекс Такси", "Метро Санкт-Петербург", "Стрелка"]),
+    CategoryProfile("Переводы", 0.052, -500.0, "6012.0", ["Перевод на карту", "Перевод Кредитная карта"]),
+    CategoryProfile("Ж/д билеты", 0.037, -300.0, "4111.0", ["РЖД", "Московский метрополитен"]),
+    CategoryProfile("Различные товары", 0.034, -130.0, "5331.0", ["Улыбка радуги", "Fix Price"]),
+    CategoryProfile("Связь", 0.029, -250.0, "4814.0", ["МТС", "REG.RU"]),
+    CategoryProfile("Пополнения", 0.027, 7000.0, "6012.0", ["Перевод с карты", "Внесение наличных через банкомат"]),
+    CategoryProfile("Аптеки", 0.023, -351.0, "5912.0", ["Apteka 7", "Аптека Вита"]),
+    CategoryProfile("Каршеринг", 0.018, -50.0, "7512.0", ["Ситидрайв", "Яндекс Драйв"]),
+    CategoryProfile("Рестораны", 0.017, -111.0, "5812.0", ['OOO "Nord-S"', "Kebab 24 Mm"]),
+    CategoryProfile("Бонусы", 0.015, 390.0, None, ["Вознаграждение за операции покупок"]),
+    CategoryProfile("Наличные", 0.015, -3500.0, "6011.0", ["Снятие в банкомате Тинькофф"]),
+    CategoryProfile("Дом и ремонт", 0.015, -320.0, "5211.0", ["Строитель", "МаксидоМ", "Леруа Мерлен"]),
+    CategoryProfile("Услуги банка", 0.014, -59.0, None, ["Плата за обслуживание", "Плата за оповещения"]),
+    CategoryProfile("Топливо", 0.011, -149.0, "5541.0", ["Circle K", "ЛУКОЙЛ"]),
+    CategoryProfile("Образование", 0.011, -84.0, "8220.0", ["СПбПУ", "СКОЛКОВО"]),
+    CategoryProfile("Одежда и обувь", 0.010, -419.0, "5641.0", ["WILDBERRIES", "Детки"]),
+    CategoryProfile("Другое", 0.010, -1622.0, "4900.0", ["Петроэлектросбыт", "Федеральная Налоговая Служба"]),
+    CategoryProfile("ЖКХ", 0.007, -2274.0, None, ["ЖКУ Квартира", "Электричество"]),
+    CategoryProfile("Медицина", 0.002, -2999.0, "8043.0", ["Stomatologiya 24", "Счастливый взгляд"]),
+    CategoryProfile("Зарплата", 0.002, 26100.0, None, ['Пополнение. ООО "ФОРТУНА". Зарплата']),
+    CategoryProfile("Авиабилеты", 0.001, -5854.0, "4511.0", ["Аэрофлот", "Тинькофф Авиа"]),
+]
+
+CARDS = ["*7197", "*4556", "*5091", "*5441", "*1112", "*6002", "*5507"]
+CARD_SHARES = [0.721, 0.170, 0.008, 0.002, 0.001, 0.0003, 0.0003]  # остаток — операции без карты
+CURRENCIES = ["RUB", "TRY", "EUR", "CNY", "USD"]
+CURRENCY_SHARES = [0.980, 0.011, 0.005, 0.003, 0.001]
+CURRENCY_RATES = [1.0, 6.0, 90.0, 11.0, 75.0]
+FAILED_SHARE = 0.006
+CASHBACK_SHARE = 0.094
+
+
+def _categorical(codes: Any, values: List[str]) -> Any:
+    import pandas as pd
+
+    return pd.Categorical.from_codes(codes, dtype=pd.CategoricalDtype(values))
+
+
+def _generate_chunk(
+    rows: int, rng: np.random.Generator, start: datetime.datetime, end: datetime.datetime
+) -> pd.DataFrame:
+    import numpy as np
+    import pandas as pd
+
+    shares = np.array([profile.share for profile in CATEGORY_PROFILES])
+    categories = rng.choice(len(CATEGORY_PROFILES), size=rows, p=shares / shares.sum())
+    medians = np.array([profile.median_amount for profile in CATEGORY_PROFILES])
+    amounts = np.round(medians[categories] * rng.lognormal(0.0, 0.8, rows), 2)
+
+    descriptions = sorted({text for profile in CATEGORY_PROFILES for text in profile.descriptions})
+    width = max(len(profile.descriptions) for profile in CATEGORY_PROFILES)
+    options = np.array(
+        [
+            ([descriptions.index(text) for text in profile.descriptions] * width)[:width]
+            for profile in CATEGORY_PROFILES
+        ]
+    )
+    counts = np.array([len(profile.descriptions) for profile in CATEGORY_PROFILES])
+    description = options[categories, (rng.random(rows) * counts[categories]).astype("int64")]
+
+    mcc_values: List[str] = sorted({profile.mcc for profile in CATEGORY_PROFILES if profile.mcc is not None})
+    mcc_codes = np.array(
+        [-1 if profile.mcc is None else mcc_values.index(profile.mcc) for profile in CATEGORY_PROFILES]
+    )
+    card_shares = np.array([*CARD_SHARES, 1.0 - sum(CARD_SHARES)])
+    cards = rng.choice(len(card_shares), size=rows, p=card_shares)
+    cards[cards == len(CARDS)] = -1
+    currencies = rng.choice(len(CURRENCIES), size=rows, p=CURRENCY_SHARES)
+    failed = rng.random(rows) < FAILED_SHARE
+
+    span = max(int((end - start).total_seconds()), 1)
+    seconds = np.sort(rng.integers(0, span, rows))
+    operation_dates = np.datetime64(start, "s") + seconds.astype("timedelta64[s]")
+    payment_dates = operation_dates.astype("datetime64[D]") + rng.integers(0, 3, rows).astype("timedelta64[D]")
+
+    spends = amounts < 0
+    rounded = np.abs(amounts)
+    payment_amounts = np.round(amounts * np.array(CURRENCY_RATES)[currencies], 2)
+    cashback = np.where(spends & (rng.random(rows) < CASHBACK_SHARE), np.floor(rounded * 0.01), np.nan)
+    bonuses = np.where(spends & ~failed, np.floor(np.abs(payment_amounts) * 0.01), 0).astype("int64")
+
+    frame = pd.DataFrame(
+        {
+            OPERATION_DATE: operation_dates.astype("datetime64[ns]"),
+            PAYMENT_DATE: payment_dates.astype("datetime64[ns]"),
+            CARD_NUMBER: _categorical(cards, CARDS),
+            STATUS: _categorical(failed.astype("int8"), [STATUS_OK, "FAILED"]),
+            OPERATION_AMOUNT: amounts,
+            OPERATION_CURRENCY: _categorical(currencies, CURRENCIES),
+            PAYMENT_AMOUNT: payment_amounts,
+            PAYMENT_CURRENCY: _categorical(np.zeros(rows, dtype="int8"), ["RUB"]),
+            CASHBACK: cashback,
+            CATEGORY: _categorical(categories, [profile.name for profile in CATEGORY_PROFILES]),
+            MCC: _categorical(mcc_codes[categories], mcc_values),
+            DESCRIPTION: _categorical(description, descriptions),
+            BONUSES: bonuses,
+            INVEST_ROUNDING: np.zeros(rows, dtype="int64"),
+            ROUNDED_AMOUNT: rounded,
+        }
+    )
+    return to_transaction_table(frame)
+
+
+def iter_synthetic_chunks(
+    rows: int,
+    seed: int = 0,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    start: datetime.datetime = DEFAULT_START,
+    end: datetime.datetime = DEFAULT_END,
+) -> Iterator[pd.DataFrame]:
+    """
+    Генерирует синтетическую выписку фрагментами, упорядоченными по дате операции.
+
+    Каждый фрагмент покрывает свою часть периода пропорционально числу строк, поэтому склеенные
+    фрагменты отсортированы по дате. При одинаковых seed и chunk_size результат всегда одинаков.
+
+    Args:
+        rows (int): Число транзакций.
+        seed (int): Зерно генератора случайных чисел. Defaults to 0.
+        chunk_size (int): Число строк во фрагменте. Defaults to 1 000 000.
+        start (datetime.datetime): Начало периода. Defaults to 2018-01-01.
+        end (datetime.datetime): Конец периода. Defaults to 2022-01-01.
+
+    Returns:
+        Iterator[pd.DataFrame]: Типизированные фрагменты таблицы транзакций.
+    """
+    import numpy as np
+
+    if chunk_size <= 0:
+        raise ValueError("Размер фрагмента должен быть положительным")
+    rng = np.random.default_rng(seed)
+    span = (end - start).total_seconds()
+    for first in range(0, rows, chunk_size):
+        last = min(first + chunk_size, rows)
+        chunk_start = start + datetime.timedelta(seconds=span * first / rows)
+        chunk_end = start + datetime.timedelta(seconds=span * last / rows)
+        yield _generate_chunk(last - first, rng, chunk_start, chunk_end)
+
+
+def generate_transactions(
+    rows: int,
+    seed: int = 0,
+    start: datetime.datetime = DEFAULT_START,
+    end: datetime.datetime = DEFAULT_END,
+) -> pd.DataFrame:
+    """
+    Возвращает синтетическую выписку со столбцами и распределениями реальной выписки.
+
+    Args:
+        rows (int): Число транзакций.
+        seed (int): Зерно генератора случайных чисел. Defaults to 0.
+        start (datetime.datetime): Начало периода. Defaults to 2018-01-01.
+        end (datetime.datetime): Конец периода. Defaults to 2022-01-01.
+
+    Returns:
+        pd.DataFrame: Типизированная таблица транзакций.
+    """
+    chunks = list(iter_synthetic_chunks(rows, seed, DEFAULT_CHUNK_SIZE, start, end))
+    return chunks[0] if len(chunks) == 1 else concat_tables(chunks)
+
+
+def write_statement(transactions: pd.DataFrame, file_path: str) -> None:
+    """
+    Сохраняет таблицу транзакций в формате выписки: .xlsx, .csv или .ndjson/.jsonl.
+
+    Даты записываются строками в формате выписки, поэтому файл читается так же, как настоящая выписка.
+
+    Args:
+        transactions (pd.DataFrame): Таблица транзакций.
+        file_path (str): Путь к файлу.
+    """
+    frame = transactions.reset_index(drop=True)
+    for column, date_format in DATE_COLUMNS.items():
+        if column in frame.columns:
+            frame[column] = frame[column].dt.strftime(date_format)
+    extension = os.path.splitext(file_path)[1].lower()
+    if extension == ".xlsx":
+        frame.to_excel(file_path, index=False)
+    elif extension == ".csv":
+        frame.to_csv(file_path, index=False)
+    elif extension in (".ndjson", ".jsonl"):
+        frame.to_json(file_path, orient="records", lines=True, force_ascii=False)
+    else:
+        raise ValueError(f"Неподдерживаемый формат выписки: {extension}")
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """
+    Сохраняет синтетическую выписку из командной строки.
+
+    Args:
+        argv (Optional[List[str]], optional): Аргументы командной строки. Defaults to None — без аргументов.
+    """
+    parser = argparse.ArgumentParser(description="Генерация синтетической выписки")
+    parser.add_argument("output", help="Путь к файлу выписки (.xlsx, .csv, .ndjson)")
+    parser.add_argument("--rows", type=int, default=10_000, help="Число транзакций")
+    parser.add_argument("--seed", type=int, default=0, help="Зерно генератора случайных чисел")
+    args = parser.parse_args([] if argv is None else argv)
+
+    logging.basicConfig(level=logging.INFO)
+    write_statement(generate_transactions(args.rows, args.seed), args.output)
+    logger.info("Синтетическая выписка на %s строк сохранена в %s", args.rows, args.output)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
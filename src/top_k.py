@@ -0,0 +1,184 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any, Dict, Iterable, Optional, Sequence
+
+from src.transactions import (
+    CARD_NUMBER,
+    CATEGORY,
+    OPERATION_AMOUNT,
+    OPERATION_DATE,
+    TransactionData,
+    as_transaction_table,
+    concat_tables,
+)
+
+if TYPE_CHECKING:
+    import pandas as pd
+    from numpy.typing import NDArray
+
+DEFAULT_TOP_K = 5
+
+OVERALL = "all"
+BY_CARD = "card"
+BY_CATEGORY = "category"
+BY_MONTH = "month"
+GROUPINGS = (OVERALL, BY_CARD, BY_CATEGORY, BY_MONTH)
+
+
+def top_k_positions(values: Any, k: int) -> NDArray[Any]:
+    """
+    Возвращает позиции k наибольших значений в порядке убывания.
+
+    Порог отбора находится через np.partition за O(n), сортируются только отобранные k значений.
+    Из равных значений выбираются первые по порядку, пропуски считаются наименьшими.
+
+    Args:
+        values (Any): Значения.
+        k (int): Число позиций.
+
+    Returns:
+        NDArray[Any]: Позиции наибольших значений.
+    """
+    import numpy as np
+
+    keys = np.asarray(values, dtype="float64")
+    keys = np.where(np.isnan(keys), -np.inf, keys)
+    size = len(keys)
+    if k <= 0 or size == 0:
+        return np.array([], dtype=np.int64)
+    if k < size:
+        threshold = np.partition(keys, size - k)[size - k]
+        above = np.flatnonzero(keys > threshold)
+        equal = np.flatnonzero(keys == threshold)[: k - len(above)]
+        selected = np.concatenate([above, equal])
+    else:
+        selected = np.arange(size)
+    order: NDArray[Any] = selected[np.lexsort((selected, -keys[selected]))]
+    return order
+
+
+def _group_keys(table: pd.DataFrame, grouping: str) -> Optional[pd.Series]:
+    if grouping == OVERALL:
+        return None
+    if grouping == BY_CARD:
+        return table[CARD_NUMBER]
+    if grouping == BY_CATEGORY:
+        return table[CATEGORY]
+    if grouping == BY_MONTH:
+        months: pd.Series = table[OPERATION_DATE].dt.to_period("M")
+        return months
+    raise ValueError(f"Неизвестная группировка: {grouping}")
+
+
+def _top_k_rows(table: pd.DataFrame, grouping: str, k: int) -> pd.DataFrame:
+    import numpy as np
+
+    values = table[OPERATION_AMOUNT].to_numpy(dtype="float64", na_value=np.nan)
+    keys = _group_keys(table, grouping)
+    if keys is None:
+        return table.iloc[top_k_positions(values, k)]
+    groups = table.groupby(keys, observed=True, sort=True).indices
+    positions = [group[top_k_positions(values[group], k)] for group in groups.values()]
+    return table.iloc[np.concatenate(positions) if positions else np.array([], dtype=np.int64)]
+
+
+class TopKTracker:
+    """
+    Отбор k наибольших по сумме транзакций в целом, по картам, по категориям и по месяцам.
+
+    Транзакции подаются фрагментами; между фрагментами хранятся только k лучших строк каждой группы,
+    поэтому все группировки считаются за один проход, а память не зависит от размера выписки.
+    """
+
+    def __init__(self, k: int = DEFAULT_TOP_K, groupings: Sequence[str] = GROUPINGS) -> None:
+        if k <= 0:
+            raise ValueError("Число транзакций должно быть положительным")
+        for grouping in groupings:
+            if grouping not in GROUPINGS:
+                raise ValueError(f"Неизвестная группировка: {grouping}")
+        self.k = k
+        self.groupings = tuple(groupings)
+        self._candidates: Dict[str, pd.DataFrame] = {}
+
+    def update(self, transactions: TransactionData) -> None:
+        """
+        Учитывает очередной фрагмент транзакций.
+
+        Args:
+            transactions (TransactionData): Таблица транзакций или список транзакций.
+        """
+        chunk = as_transaction_table(transactions)
+        for grouping in self.groupings:
+            previous = self._candidates.get(grouping)
+            merged = chunk if previous is None else concat_tables([previous, chunk])
+            self._candidates[grouping] = _top_k_rows(merged, grouping, self.k)
+
+    def top(self, grouping: str = OVERALL) -> pd.DataFrame:
+        """
+        Возвращает отобранные транзакции группировки.
+
+        Args:
+            grouping (str): Группировка: «all», «card», «category» или «month». Defaults to «all».
+
+        Returns:
+            pd.DataFrame: Транзакции, упорядоченные по группе и по убыванию суммы.
+        """
+        if grouping not in self.groupings:
+            raise ValueError(f"Группировка не отслеживается: {grouping}")
+        candidates = self._candidates.get(grouping)
+        if candidates is None:
+            return as_transaction_table([])
+        return _top_k_rows(candidates, grouping, self.k)
+
+    def groups(self, grouping: str) -> Dict[str, pd.DataFrame]:
+        """
+        Возвращает отобранные транзакции отдельно для каждой группы.
+
+        Args:
+            grouping (str): Группировка: «card», «category» или «month».
+
+        Returns:
+            Dict[str, pd.DataFrame]: Транзакции по названию группы.
+        """
+        top = self.top(grouping)
+        keys = _group_keys(top, grouping)
+        if keys is None:
+            return {OVERALL: top}
+        return {str(key): frame for key, frame in top.groupby(keys, observed=True, sort=True)}
+
+
+def top_transactions(transactions: TransactionData, k: int = DEFAULT_TOP_K, by: str = OVERALL) -> pd.DataFrame:
+    """
+    Возвращает k наибольших по сумме транзакций в целом или в каждой группе.
+
+    Args:
+        transactions (TransactionData): Таблица транзакций или список транзакций.
+        k (int): Число транзакций. Defaults to 5.
+        by (str): Группировка: «all», «card», «category» или «month». Defaults to «all».
+
+    Returns:
+        pd.DataFrame: Транзакции, упорядоченные по группе и по убыванию суммы.
+    """
+    tracker = TopKTracker(k, [by])
+    tracker.update(transactions)
+    return tracker.top(by)
+
+
+def top_transactions_from_chunks(
+    chunks: Iterable[TransactionData], k: int = DEFAULT_TOP_K, groupings: Sequence[str] = GROUPINGS
+) -> TopKTracker:
+    """
+    Отбирает наибольшие транзакции по фрагментам выписки за один проход.
+
+    Args:
+        chunks (Iterable[TransactionData]): Фрагменты таблицы транзакций.
+        k (int): Число транзакций в каждой группе. Defaults to 5.
+        groupings (Sequence[str]): Группировки. Defaults to все.
+
+    Returns:
+        TopKTracker: Результат отбора.
+    """
+    tracker = TopKTracker(k, groupings)
+    for chunk in chunks:
+        tracker.update(chunk)
+    return tracker
@@ -0,0 +1,300 @@
+from __future__ import annotations
+
+import datetime
+import hashlib
+import json
+import logging
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Optional, Sequence, Tuple, TypeAlias, Union
+
+from src.metrics import timed
+
+if TYPE_CHECKING:
+    import pandas as pd
+    from numpy.typing import NDArray
+
+logger = logging.getLogger(__name__)
+
+OPERATION_DATE = "Дата операции"
+PAYMENT_DATE = "Дата платежа"
+CARD_NUMBER = "Номер карты"
+STATUS = "Статус"
+OPERATION_AMOUNT = "Сумма операции"
+OPERATION_CURRENCY = "Валюта операции"
+PAYMENT_AMOUNT = "Сумма платежа"
+PAYMENT_CURRENCY = "Валюта платежа"
+CASHBACK = "Кэшбэк"
+CATEGORY = "Категория"
+MCC = "MCC"
+DESCRIPTION = "Описание"
+BONUSES = "Бонусы (включая кэшбэк)"
+INVEST_ROUNDING = "Округление на инвесткопилку"
+ROUNDED_AMOUNT = "Сумма операции с округлением"
+
+CASHBACK_RATE = 0.01
+STATUS_OK = "OK"
+
+OPERATION_DATE_FORMAT = "%d.%m.%Y %H:%M:%S"
+PAYMENT_DATE_FORMAT = "%d.%m.%Y"
+# Формат даты и времени отчета в параметрах программы, сервера и заданий пакетной обработки
+DATE_TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+DEFAULT_REPORT_CATEGORY = "Каршеринг"
+
+DATE_COLUMNS = {OPERATION_DATE: OPERATION_DATE_FORMAT, PAYMENT_DATE: PAYMENT_DATE_FORMAT}
+AMOUNT_COLUMNS = [OPERATION_AMOUNT, PAYMENT_AMOUNT, CASHBACK, ROUNDED_AMOUNT, BONUSES, INVEST_ROUNDING]
+CATEGORICAL_COLUMNS = [CARD_NUMBER, STATUS, OPERATION_CURRENCY, PAYMENT_CURRENCY, CATEGORY, MCC, DESCRIPTION]
+
+DATE_INDEX = "date"
+
+# Число строк, по которым frame_version проверяет, не изменилась ли таблица
+FRAME_VERSION_SAMPLE = 1024
+
+TransactionData: TypeAlias = Union["pd.DataFrame", List[Dict[Any, Any]]]
+
+
+def _parse_dates(series: pd.Series, date_format: str) -> pd.Series:
+    import pandas as pd
+
+    if pd.api.types.is_datetime64_any_dtype(series.dtype):
+        return series
+    try:
+        return pd.to_datetime(series, format=date_format)
+    except (ValueError, TypeError):
+        return pd.to_datetime(series, format="ISO8601")
+
+
+def to_transaction_table(frame: pd.DataFrame) -> pd.DataFrame:
+    """
+    Приводит данные о транзакциях к типизированной таблице.
+
+    Даты хранятся как datetime64, суммы — как float64, а карта, статус, валюты, категория, MCC
+    и описание — как категориальные столбцы со словарным кодированием. Таблица отсортирована по дате
+    операции и проиндексирована ею, строки без даты операции отбрасываются. Повторный вызов для уже
+    типизированной таблицы ничего не пересчитывает.
+
+    Args:
+        frame (pd.DataFrame): Данные о транзакциях.
+
+    Returns:
+        pd.DataFrame: Типизированная таблица транзакций.
+    """
+    import pandas as pd
+
+    columns: Dict[str, Any] = {}
+    changed = False
+    for column in frame.columns:
+        series = original = frame[column]
+        if column in DATE_COLUMNS:
+            series = _parse_dates(series, DATE_COLUMNS[column])
+        elif column in AMOUNT_COLUMNS:
+            if not pd.api.types.is_numeric_dtype(series.dtype):
+                series = pd.to_numeric(series, errors="coerce")
+            if not pd.api.types.is_integer_dtype(series.dtype) and series.dtype != "float64":
+                series = series.astype("float64")
+        elif column in CATEGORICAL_COLUMNS and not isinstance(series.dtype, pd.CategoricalDtype):
+            series = series.astype("category")
+        changed = changed or series is not original
+        columns[column] = series
+    table = pd.DataFrame(columns, index=frame.index) if changed else frame
+    if OPERATION_DATE in table.columns:
+        table = _with_date_index(table)
+    return table
+
+
+def _with_date_index(table: pd.DataFrame) -> pd.DataFrame:
+    import pandas as pd
+
+    index = table.index
+    if isinstance(index, pd.DatetimeIndex) and index.name == DATE_INDEX and index.is_monotonic_increasing:
+        return table
+    missing = table[OPERATION_DATE].isna()
+    if missing.any():
+        logger.warning("Отброшено транзакций без даты операции: %s", int(missing.sum()))
+        table = table[~missing]
+    if not table[OPERATION_DATE].is_monotonic_increasing:
+        table = table.sort_values(OPERATION_DATE, kind="stable")
+    return table.set_axis(pd.DatetimeIndex(table[OPERATION_DATE], name=DATE_INDEX), axis=0)
+
+
+def date_window(table: pd.DataFrame, start: datetime.datetime, end: datetime.datetime) -> pd.DataFrame:
+    """
+    Возвращает транзакции с датой операции в полуинтервале [start, end).
+
+    Границы ищутся двоичным поиском по индексу дат, а результат — срез таблицы без копирования строк.
+
+    Args:
+        table (pd.DataFrame): Типизированная таблица транзакций.
+        start (datetime.datetime): Начало окна включительно.
+        end (datetime.datetime): Конец окна, не включая его.
+
+    Returns:
+        pd.DataFrame: Транзакции за окно.
+    """
+    index = table.index
+    first = index.searchsorted(start, side="left")
+    last = index.searchsorted(end, side="left")
+    return table.iloc[first:last]
+
+
+def month_positions(table: pd.DataFrame, periods: Iterable[Tuple[int, int]]) -> Any:
+    """
+    Возвращает позиции строк таблицы, попадающих в указанные месяцы.
+
+    Каждый месяц — непрерывный отрезок отсортированной таблицы, поэтому его границы находятся двоичным поиском.
+
+    Args:
+        table (pd.DataFrame): Типизированная таблица транзакций.
+        periods (Iterable[Tuple[int, int]]): Пары (год, месяц).
+
+    Returns:
+        NDArray[Any]: Возрастающие позиции строк.
+    """
+    import numpy as np
+
+    ranges = []
+    for year, month in sorted(set(periods)):
+        start = datetime.datetime(year, month, 1)
+        end = datetime.datetime(year + month // 12, month % 12 + 1, 1)
+        ranges.append(np.arange(table.index.searchsorted(start), table.index.searchsorted(end)))
+    return np.concatenate(ranges) if ranges else np.array([], dtype=np.int64)
+
+
+@timed("convert", rows=len)
+def as_transaction_table(data: TransactionData) -> pd.DataFrame:
+    """
+    Возвращает типизированную таблицу для таблицы или списка словарей с транзакциями.
+
+    Args:
+        data (TransactionData): Таблица транзакций или список транзакций в виде словарей.
+
+    Returns:
+        pd.DataFrame: Типизированная таблица транзакций.
+    """
+    import pandas as pd
+
+    if isinstance(data, pd.DataFrame):
+        return to_transaction_table(data)
+    return to_transaction_table(pd.DataFrame(list(data)))
+
+
+@timed("convert", rows=len)
+def to_str_records(frame: pd.DataFrame) -> List[Dict[str, str]]:
+    """
+    Преобразует таблицу транзакций в список словарей со строковыми значениями.
+
+    Даты выводятся в исходном формате выписки.
+
+    Args:
+        frame (pd.DataFrame): Таблица транзакций.
+
+    Returns:
+        List[Dict[str, str]]: Список транзакций.
+    """
+    import pandas as pd
+
+    formatted = frame.copy()
+    for column, date_format in DATE_COLUMNS.items():
+        if column in formatted.columns and pd.api.types.is_datetime64_any_dtype(formatted[column].dtype):
+            formatted[column] = formatted[column].dt.strftime(date_format)
+    return [{str(key): str(value) for key, value in row.items()} for row in formatted.to_dict("records")]
+
+
+def concat_tables(frames: Sequence[pd.DataFrame]) -> pd.DataFrame:
+    """
+    Объединяет таблицы, сохраняя категориальные столбцы категориальными.
+
+    Категории одноименных столбцов объединяются, поэтому результат не превращается в столбцы типа object.
+    Таблицы транзакций после объединения заново сортируются по дате операции.
+
+    Args:
+        frames (Sequence[pd.DataFrame]): Таблицы с одинаковыми столбцами.
+
+    Returns:
+        pd.DataFrame: Объединенная таблица.
+    """
+    import pandas as pd
+
+    non_empty = [frame for frame in frames if len(frame)] or list(frames[:1])
+    if len(non_empty) == 1:
+        return to_transaction_table(non_empty[0].reset_index(drop=True))
+    unified = [frame.copy(deep=False) for frame in non_empty]
+    for column in non_empty[0].columns:
+        dtypes = [frame[column].dtype for frame in non_empty if column in frame.columns]
+        if not all(isinstance(dtype, pd.CategoricalDtype) for dtype in dtypes):
+            continue
+        indexes = [
+            dtype.categories for dtype in dtypes if isinstance(dtype, pd.CategoricalDtype) and len(dtype.categories)
+        ]
+        if not indexes:
+            continue
+        categories = indexes[0].append(indexes[1:]).unique()
+        try:
+            categories = categories.sort_values()
+        except TypeError:
+            # MCC из выписок разных форматов хранится то числом, то строкой
+            categories = categories[categories.astype(str).argsort()]
+        dtype = pd.CategoricalDtype(categories)
+        for frame in unified:
+            frame[column] = frame[column].astype(dtype)
+    return to_transaction_table(pd.concat(unified, ignore_index=True))
+
+
+def frame_fingerprint(frame: pd.DataFrame) -> str:
+    """
+    Возвращает отпечаток содержимого таблицы: хэш значений всех строк, индекса и названий столбцов.
+
+    Args:
+        frame (pd.DataFrame): Таблица.
+
+    Returns:
+        str: Шестнадцатеричный отпечаток.
+    """
+    import pandas as pd
+
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(json.dumps([str(column) for column in frame.columns]).encode("utf-8"))
+    digest.update(pd.util.hash_pandas_object(frame, index=True).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+def _column_arrays(frame: pd.DataFrame) -> Iterable[Tuple[NDArray[Any], Optional[pd.Index]]]:
+    """Возвращает массивы индекса и столбцов без копирования; для категориальных — коды и словарь."""
+    import numpy as np
+
+    for values in [frame.index.array] + [series.array for _, series in frame.items()]:
+        codes = getattr(values, "codes", None)
+        if codes is not None:
+            yield np.asarray(codes), values.categories
+        else:
+            yield np.asarray(values), None
+
+
+def frame_version(frame: pd.DataFrame) -> str:
+    """
+    Возвращает дешевую метку версии таблицы, которая меняется при изменении таблицы.
+
+    В метку входят размер, названия и типы столбцов, адреса их буферов и значения равномерной выборки
+    из FRAME_VERSION_SAMPLE строк, включая первую и последнюю. Замена столбца, добавление строк и
+    изменение выбранных строк меняют метку без хэширования всей таблицы.
+
+    Args:
+        frame (pd.DataFrame): Таблица.
+
+    Returns:
+        str: Шестнадцатеричная метка.
+    """
+    import numpy as np
+
+    positions = np.unique(np.linspace(0, len(frame) - 1, min(len(frame), FRAME_VERSION_SAMPLE), dtype=np.intp))
+    digest = hashlib.blake2b(digest_size=16)
+    layout: List[Any] = [list(frame.shape), [str(column) for column in frame.columns]]
+    for array, categories in _column_arrays(frame):
+        layout += [array.dtype.str, array.__array_interface__["data"][0]]
+        if categories is not None:
+            layout += [len(categories), np.asarray(categories).__array_interface__["data"][0]]
+        sample = array.take(positions)
+        if sample.dtype == object:
+            layout.append([str(value) for value in sample])
+        else:
+            digest.update(sample.tobytes())
+    digest.update(json.dumps(layout, ensure_ascii=False).encode("utf-8"))
+    return digest.hexdigest()
@@ -1,10 +1,24 @@
 import datetime
 import json
 import logging
-from typing import Dict, List
-
-import pandas as pd
-import requests
+from typing import Any, Dict, List
+
+from src.market_cache import get_market_data_cache
+from src.metrics import timed
+from src.top_k import DEFAULT_TOP_K, top_transactions
+from src.transactions import (
+    CARD_NUMBER,
+    CASHBACK,
+    CASHBACK_RATE,
+    OPERATION_AMOUNT,
+    STATUS,
+    STATUS_OK,
+    TransactionData,
+    as_transaction_table,
+    to_str_records,
+)
+
+TOP_TRANSACTIONS_SETTING = "top_transactions"
 
 
 def get_greeting(date_time: datetime.datetime) -> str:
@@ -29,49 +43,65 @@ def get_greeting(date_time: datetime.datetime) -> str:
         return "Добрый вечер"
 
 
-def get_cards(data: Dict[str, List[Dict[str, str]]]) -> List[Dict[str, float]]:
+def get_cards(data: Dict[str, Any]) -> List[Dict[str, Any]]:
     """
     Возвращает список карт с информацией о последних четырех цифрах номера карты, общей сумме трат и cashback.
 
+    Сводка строится за один групповой проход по столбцу «Номер карты» таблицы транзакций. Траты — это
+    успешные списания, кэшбэк берется из столбца «Кэшбэк», а при его отсутствии оценивается как 1% от трат.
+
     Args:
-        data (Dict[str, List[Dict[str, str]]]): Данные о картах и транзакциях.
+        data (Dict[str, Any]): Данные о транзакциях.
 
     Returns:
-        List[Dict[str, float]]: Список карт с информацией.
+        List[Dict[str, Any]]: Список карт с последними цифрами, суммой трат, кэшбэком и числом операций.
     """
+    import pandas as pd
+
     logging.info("Получение информации о картах")
-    cards = []
-    for card in data["cards"]:
-        last_digits = card["card_number"][-4:]
-        transactions_df = pd.DataFrame(card["transactions"])
-        total_spent = transactions_df["amount"].sum()
-        cashback = total_spent * 0.01
-        cards.append({"last_digits": last_digits, "total_spent": total_spent, "cashback": cashback})
-    return cards
+    table = as_transaction_table(data["transactions"])
+    if CARD_NUMBER not in table.columns or table.empty:
+        return []
+    amounts = table[OPERATION_AMOUNT].fillna(0.0)
+    spent = amounts < 0
+    if STATUS in table.columns:
+        spent &= table[STATUS] == STATUS_OK
+    spending = (-amounts).where(spent, 0.0)
+    if CASHBACK in table.columns:
+        cashback = table[CASHBACK].fillna(0.0)
+    else:
+        cashback = spending * CASHBACK_RATE
+    columns = {"total_spent": spending.to_numpy(), "cashback": cashback.to_numpy(), "transactions": 1}
+    grouped = pd.DataFrame(columns).groupby(table[CARD_NUMBER].array, observed=True).sum()
+    last_digits = grouped.index.astype(str).str.lstrip("*").str[-4:]
+    return [
+        {"last_digits": digits, "total_spent": round(total, 2), "cashback": round(bonus, 2), "transactions": count}
+        for digits, total, bonus, count in zip(
+            last_digits,
+            grouped["total_spent"].tolist(),
+            grouped["cashback"].tolist(),
+            grouped["transactions"].tolist(),
+        )
+        if digits
+    ]
 
 
-def get_top_transactions(data: Dict[str, List[Dict[str, str]]]) -> List[Dict[str, str]]:
+def get_top_transactions(data: Dict[str, TransactionData], k: int = DEFAULT_TOP_K) -> List[Dict[str, str]]:
     """
-    Возвращает список топ-5 транзакций по сумме трат.
+    Возвращает список топ-k транзакций по сумме трат.
 
     Args:
-        data (Dict[str, List[Dict[str, str]]]): Данные о транзакциях.
+        data (Dict[str, TransactionData]): Данные о транзакциях.
+        k (int): Число транзакций. Defaults to 5.
 
     Returns:
-        List[Dict[str, str]]: Список топ-5 транзакций.
+        List[Dict[str, str]]: Список топ-k транзакций.
     """
-    logging.info("Получение топ-5 транзакций")
-    transactions_df = pd.DataFrame(data["transactions"])
-    transactions_df["Сумма операции"] = transactions_df["Сумма операции"].astype(float)
-    top_transactions_df = transactions_df.nlargest(5, "Сумма операции")
-    top_transactions = [
-        {str(key): str(value) for key, value in row.items()} for row in top_transactions_df.to_dict("records")
-    ]
-
-    return top_transactions
+    logging.info("Получение топ-%s транзакций", k)
+    return to_str_records(top_transactions(data["transactions"], k))
 
 
-def get_currency_rates(user_settings: Dict[str, List[str]]) -> List[Dict[str, float]]:
+def get_currency_rates(user_settings: Dict[str, List[str]]) -> List[Dict[str, Any]]:
     """
     Возвращает список курсов валют.
 
@@ -79,60 +109,46 @@ def get_currency_rates(user_settings: Dict[str, List[str]]) -> List[Dict[str, fl
         user_settings (Dict[str, List[str]]): Настройки пользователя.
 
     Returns:
-        List[Dict[str, float]]: Список курсов валют.
+        List[Dict[str, Any]]: Список курсов валют.
     """
     logging.info("Получение курсов валют")
-    currency_rates = []
-    for currency in user_settings["user_currencies"]:
-        response = requests.get(f"https://api.exchangerate-api.com/v4/latest/{currency}")
-        data = response.json()
-        currency_rates.append({"currency": currency, "rate": data["rates"][currency]})
-    return currency_rates
+    return get_market_data_cache().get_currency_rates(user_settings["user_currencies"])
 
 
-def get_stock_prices(user_settings: Dict[str, List[str]]) -> List[Dict[str, object]]:
+def get_stock_prices(user_settings: Dict[str, List[str]]) -> List[Dict[str, Any]]:
     """
     Возвращает список цен акций.
     Args:
         user_settings (Dict[str, List[str]]): Настройки пользователя.
     Returns:
-        List[Dict[str, object]]: Список цен акций.
+        List[Dict[str, Any]]: Список цен акций.
     """
     logging.info("Получение цен акций")
-    stock_prices = []
-    api_key = "02d04bda4326f77763e22e13426f9588"
-    api_endpoint = "https://www.alphavantage.co/query"  # Replace with the actual API endpoint
-    for stock in user_settings["user_stocks"]:
-        params = {"function": "GLOBAL_QUOTE", "symbol": stock, "apikey": api_key}
-        response = requests.get(api_endpoint, params=params)
-        response.raise_for_status()  # Raise an exception if the response status code is not 200 (OK)
-        data = response.json()
-        try:
-            stock_price = float(data["Global Quote"]["05. price"])
-        except (KeyError, ValueError):
-            stock_price = 0.0
-        stock_prices.append({"stock": stock, "price": stock_price})
-    return stock_prices
+    return get_market_data_cache().get_stock_prices(user_settings["user_stocks"])
 
 
+@timed("views")
 def get_json_response(
-    date_time: datetime.datetime, data: Dict[str, List[Dict[str, str]]], user_settings: Dict[str, List[str]]
+    date_time: datetime.datetime, data: Dict[str, TransactionData], user_settings: Dict[str, Any]
 ) -> str:
     """
-    Возвращает JSON-ответ с информацией о приветствии, картах, топ-5 транзакциях, курсах валют и ценах акций.
+    Возвращает JSON-ответ с информацией о приветствии, картах, топ-k транзакциях, курсах валют и ценах акций.
+
+    Число транзакций берется из настройки «top_transactions», по умолчанию — 5.
     Args:
         date_time (datetime.datetime): Текущее время.
-        data (Dict[str, List[Dict[str, str]]]): Данные о картах и транзакциях.
-        user_settings (Dict[str, List[str]]): Настройки пользователя.
+        data (Dict[str, TransactionData]): Данные о картах и транзакциях.
+        user_settings (Dict[str, Any]): Настройки пользователя.
     Returns:
         str: JSON-ответ.
     """
     logging.info("Формирование JSON-ответа")
     greeting = get_greeting(date_time)
     cards = get_cards(data)
-    top_transactions = get_top_transactions(data)
-    currency_rates = get_currency_rates(user_settings)
-    stock_prices = get_stock_prices(user_settings)
+    top_transactions = get_top_transactions(data, int(user_settings.get(TOP_TRANSACTIONS_SETTING, DEFAULT_TOP_K)))
+    currency_rates, stock_prices = get_market_data_cache().get_market_data(
+        user_settings["user_currencies"], user_settings["user_stocks"]
+    )
     return json.dumps(
         {
             "greeting": greeting,
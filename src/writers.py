@@ -0,0 +1,231 @@
+from __future__ import annotations
+
+import contextlib
+import datetime
+import json
+import logging
+import os
+import tempfile
+from typing import IO, TYPE_CHECKING, Any, Callable, Dict, Iterator, List, Mapping, Optional, Tuple
+
+from config import REPORTS_DIR
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHUNK_ROWS = 10_000
+
+JSON_FORMAT = "json"
+NDJSON_FORMAT = "ndjson"
+CSV_FORMAT = "csv"
+PARQUET_FORMAT = "parquet"
+
+EXTENSIONS = {
+    ".json": JSON_FORMAT,
+    ".ndjson": NDJSON_FORMAT,
+    ".jsonl": NDJSON_FORMAT,
+    ".csv": CSV_FORMAT,
+    ".parquet": PARQUET_FORMAT,
+}
+
+
+def _current_umask() -> int:
+    umask = os.umask(0o022)
+    os.umask(umask)
+    return umask
+
+
+# Права, с которыми open() создал бы файл; mkstemp создает временный файл с правами 0600
+FILE_MODE = 0o666 & ~_current_umask()
+
+
+def _default(value: Any) -> Any:
+    if isinstance(value, (datetime.datetime, datetime.date)):
+        return value.isoformat()
+    if hasattr(value, "item"):
+        return value.item()
+    raise TypeError(f"Значение типа {type(value).__name__} не сериализуется в JSON")
+
+
+def _json_encoder() -> Callable[[Dict[str, Any]], bytes]:
+    try:
+        import orjson
+    except ImportError:
+        return lambda row: json.dumps(row, ensure_ascii=False, default=_default).encode("utf-8")
+    options = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+    return lambda row: orjson.dumps(row, default=_default, option=options)
+
+
+def _iter_chunks(report: pd.DataFrame, chunk_rows: int) -> Iterator[pd.DataFrame]:
+    for start in range(0, len(report), chunk_rows):
+        yield report.iloc[start : start + chunk_rows]  # noqa: E203
+
+
+def _iter_records(report: pd.DataFrame, chunk_rows: int) -> Iterator[Dict[str, Any]]:
+    columns = [str(column) for column in report.columns]
+    for chunk in _iter_chunks(report, chunk_rows):
+        for values in zip(*(chunk[column].tolist() for column in chunk.columns)):
+            yield {column: None if value != value else value for column, value in zip(columns, values)}
+
+
+def _write_json(report: pd.DataFrame, f: IO[bytes], chunk_rows: int) -> None:
+    encode = _json_encoder()
+    f.write(b"[")
+    for index, record in enumerate(_iter_records(report, chunk_rows)):
+        if index:
+            f.write(b",")
+        f.write(encode(record))
+    f.write(b"]")
+
+
+def _write_ndjson(report: pd.DataFrame, f: IO[bytes], chunk_rows: int) -> None:
+    encode = _json_encoder()
+    for record in _iter_records(report, chunk_rows):
+        f.write(encode(record))
+        f.write(b"\n")
+
+
+def _write_csv(report: pd.DataFrame, f: IO[bytes], chunk_rows: int) -> None:
+    import io
+
+    text = io.TextIOWrapper(f, encoding="utf-8", newline="")
+    for index, chunk in enumerate(_iter_chunks(report, chunk_rows)):
+        chunk.to_csv(text, header=index == 0, index=False)
+    if report.empty:
+        report.to_csv(text, index=False)
+    text.flush()
+    text.detach()
+
+
+def _write_parquet(report: pd.DataFrame, f: IO[bytes], chunk_rows: int) -> None:
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as error:
+        raise ImportError("Для записи отчетов в Parquet установите пакет pyarrow") from error
+
+    schema = pa.Schema.from_pandas(report, preserve_index=False)
+    with pq.ParquetWriter(f, schema) as writer:
+        for chunk in _iter_chunks(report, chunk_rows):
+            writer.write_table(pa.Table.from_pandas(chunk, schema=schema, preserve_index=False))
+
+
+WRITERS: Dict[str, Callable[[Any, IO[bytes], int], None]] = {
+    JSON_FORMAT: _write_json,
+    NDJSON_FORMAT: _write_ndjson,
+    CSV_FORMAT: _write_csv,
+    PARQUET_FORMAT: _write_parquet,
+}
+
+
+def resolve_report_path(file_name: str, output_dir: Optional[str] = None) -> str:
+    """
+    Возвращает путь к файлу отчета: относительные имена считаются от каталога отчетов.
+
+    Args:
+        file_name (str): Имя или путь файла.
+        output_dir (Optional[str]): Каталог отчетов. Defaults to None — REPORTS_DIR из config.
+
+    Returns:
+        str: Путь к файлу.
+    """
+    return os.path.join(REPORTS_DIR if output_dir is None else output_dir, file_name)
+
+
+def _report_format(path: str, report_format: Optional[str]) -> str:
+    if report_format is None:
+        extension = os.path.splitext(path)[1].lower()
+        if extension not in EXTENSIONS:
+            raise ValueError(f"Не удалось определить формат отчета по расширению: {path}")
+        report_format = EXTENSIONS[extension]
+    if report_format not in WRITERS:
+        raise ValueError(f"Неподдерживаемый формат отчета: {report_format}")
+    return report_format
+
+
+def _write_temporary(report: pd.DataFrame, path: str, report_format: str, chunk_rows: int) -> str:
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            os.fchmod(f.fileno(), FILE_MODE)
+            WRITERS[report_format](report, f, chunk_rows)
+    except BaseException:
+        with contextlib.suppress(OSError):
+            os.remove(tmp_path)
+        raise
+    return tmp_path
+
+
+def write_report(
+    report: pd.DataFrame,
+    file_name: str,
+    report_format: Optional[str] = None,
+    output_dir: Optional[str] = None,
+    chunk_rows: int = DEFAULT_CHUNK_ROWS,
+) -> str:
+    """
+    Атомарно сохраняет отчет в файл.
+
+    Отчет сериализуется по chunk_rows строк во временный файл рядом с целевым, который затем
+    переименовывается, поэтому читатели никогда не видят недописанный файл, а сериализованный
+    отчет целиком не хранится в памяти.
+
+    Args:
+        report (pd.DataFrame): Отчет.
+        file_name (str): Имя или путь файла; относительные имена считаются от output_dir.
+        report_format (Optional[str]): Формат: json, ndjson, csv или parquet. Defaults to None — по расширению.
+        output_dir (Optional[str]): Каталог отчетов. Defaults to None — REPORTS_DIR из config.
+        chunk_rows (int): Число строк, сериализуемых за раз. Defaults to 10 000.
+
+    Returns:
+        str: Путь к сохраненному файлу.
+    """
+    path = resolve_report_path(file_name, output_dir)
+    tmp_path = _write_temporary(report, path, _report_format(path, report_format), chunk_rows)
+    os.replace(tmp_path, path)
+    logger.info("Отчет сохранен: %s", path)
+    return path
+
+
+def write_reports(
+    reports: Mapping[str, pd.DataFrame],
+    report_format: Optional[str] = None,
+    output_dir: Optional[str] = None,
+    chunk_rows: int = DEFAULT_CHUNK_ROWS,
+) -> Dict[str, str]:
+    """
+    Сохраняет несколько отчетов за один вызов.
+
+    Сначала все отчеты записываются во временные файлы и только затем переименовываются, поэтому при
+    ошибке сериализации любого отчета ни один из файлов не заменяется.
+
+    Args:
+        reports (Mapping[str, pd.DataFrame]): Отчеты по именам файлов.
+        report_format (Optional[str]): Формат всех отчетов. Defaults to None — по расширению каждого файла.
+        output_dir (Optional[str]): Каталог отчетов. Defaults to None — REPORTS_DIR из config.
+        chunk_rows (int): Число строк, сериализуемых за раз. Defaults to 10 000.
+
+    Returns:
+        Dict[str, str]: Пути к сохраненным файлам по именам отчетов.
+    """
+    pending: List[Tuple[str, str, str]] = []
+    try:
+        for file_name, report in reports.items():
+            path = resolve_report_path(file_name, output_dir)
+            tmp_path = _write_temporary(report, path, _report_format(path, report_format), chunk_rows)
+            pending.append((file_name, tmp_path, path))
+    except BaseException:
+        for _, tmp_path, _ in pending:
+            with contextlib.suppress(OSError):
+                os.remove(tmp_path)
+        raise
+    paths = {}
+    for file_name, tmp_path, path in pending:
+        os.replace(tmp_path, path)
+        paths[file_name] = path
+    logger.info("Сохранено отчетов: %s", len(paths))
+    return paths
@@ -0,0 +1,107 @@
+import datetime
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Iterator
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+RATES = {"RUB": 1.0, "USD": 0.0125, "EUR": 0.01}
+PRICES = {"AAPL": "100.0", "GOOG": "200.0", "MSFT": "300.0"}
+DELAY = 0.2
+# Номинал и курс валют ЦБ РФ: курс на день равен базовому плюс номер дня месяца в сотых
+CBR_RATES = {"R01235": (1, 70.0), "R01820": (100, 60.0)}
+
+
+def cbr_rate(currency_id: str, date: datetime.date) -> float:
+    """Возвращает курс заглушки ЦБ РФ за единицу валюты"""
+    nominal, base = CBR_RATES[currency_id]
+    return (base + date.day / 100) / nominal
+
+
+def _cbr_response(currency_id: str, first: str, last: str) -> bytes:
+    start = datetime.datetime.strptime(first, "%d/%m/%Y").date()
+    end = datetime.datetime.strptime(last, "%d/%m/%Y").date()
+    records = []
+    nominal, base = CBR_RATES[currency_id]
+    date = start
+    while date <= end:
+        if date.weekday() < 5:
+            value = f"{base + date.day / 100:.4f}".replace(".", ",")
+            records.append(
+                f'<Record Date="{date:%d.%m.%Y}" Id="{currency_id}">'
+                f"<Nominal>{nominal}</Nominal><Value>{value}</Value></Record>"
+            )
+        date += datetime.timedelta(days=1)
+    xml = f'<?xml version="1.0" encoding="windows-1251"?><ValCurs ID="{currency_id}">{"".join(records)}</ValCurs>'
+    return xml.encode("windows-1251")
+
+
+class StubMarketServer(ThreadingHTTPServer):
+    """Заглушка API курсов валют и цен акций, считающая запросы"""
+
+    def __init__(self) -> None:
+        super().__init__(("127.0.0.1", 0), StubHandler)
+        self.requests: Dict[str, int] = {}
+        self.lock = threading.Lock()
+        self.base_url = f"http://127.0.0.1:{self.server_address[1]}"
+
+    def count(self, key: str) -> None:
+        with self.lock:
+            self.requests[key] = self.requests.get(key, 0) + 1
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    server: StubMarketServer
+
+    def do_GET(self) -> None:
+        url = urlparse(self.path)
+        time.sleep(DELAY)
+        if url.path == "/cbr":
+            params = {name: values[0] for name, values in parse_qs(url.query).items()}
+            self.server.count(params["VAL_NM_RQ"])
+            if params["VAL_NM_RQ"] not in CBR_RATES:
+                self.send_error(500)
+                return
+            xml = _cbr_response(params["VAL_NM_RQ"], params["date_req1"], params["date_req2"])
+            self.send_response(200)
+            self.send_header("Content-Type", "application/xml")
+            self.send_header("Content-Length", str(len(xml)))
+            self.end_headers()
+            self.wfile.write(xml)
+            return
+        if url.path.startswith("/latest/"):
+            base = url.path.rsplit("/", 1)[-1]
+            self.server.count(base)
+            if base != "RUB":
+                self.send_error(500)
+                return
+            body: Dict[str, object] = {"base": base, "rates": RATES}
+        else:
+            symbol = parse_qs(url.query)["symbol"][0]
+            self.server.count(symbol)
+            if symbol == "SLOW":
+                time.sleep(1.0)
+            body = {"Global Quote": {"05. price": PRICES[symbol]}} if symbol in PRICES else {}
+        payload = json.dumps(body).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format: str, *args: object) -> None:
+        pass
+
+
+@pytest.fixture
+def stub_server() -> Iterator[StubMarketServer]:
+    """Эта фикстура запускает локальный HTTP-сервер с заглушкой API рыночных данных"""
+    server = StubMarketServer()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
@@ -0,0 +1,96 @@
+import json
+import os
+import stat
+from typing import Any, Dict
+
+import pandas as pd
+import pytest
+
+from src.batch import SUMMARY_FILE, BatchJob, load_manifest, run_batch, run_job
+from src.column_store import build_column_store
+from src.writers import FILE_MODE
+
+
+@pytest.fixture
+def statement(tmp_path: str) -> str:
+    """Эта фикстура сохраняет небольшую выписку и возвращает путь к ней"""
+    path = os.path.join(str(tmp_path), "operations.xlsx")
+    pd.DataFrame(
+        {
+            "Дата операции": ["10.02.2022 12:00:00", "12.02.2022 10:00:00", "05.01.2022 09:30:00"],
+            "Номер карты": ["*7197", "*4556", "*7197"],
+            "Статус": ["OK", "OK", "OK"],
+            "Сумма операции": [-100.0, -200.0, -300.0],
+            "Кэшбэк": [1.0, 2.0, 3.0],
+            "Категория": ["Каршеринг", "Супермаркеты", "Каршеринг"],
+        }
+    ).to_excel(path, index=False)
+    return path
+
+
+@pytest.fixture
+def settings() -> Dict[str, Any]:
+    return {"user_currencies": [], "user_stocks": [], "top_transactions": 2}
+
+
+def test_load_manifest(tmp_path: str, settings: Dict[str, Any]) -> None:
+    """Этот тест проверяет относительные пути и настройки из файла"""
+    with open(os.path.join(str(tmp_path), "settings.json"), "w", encoding="utf-8") as f:
+        json.dump(settings, f)
+    manifest = os.path.join(str(tmp_path), "manifest.json")
+    with open(manifest, "w", encoding="utf-8") as f:
+        json.dump(
+            [{"user": "anna", "statement": "a.xlsx", "settings": "settings.json", "date": "2022-03-01 12:00:00"}], f
+        )
+    assert load_manifest(manifest) == [
+        BatchJob("anna", os.path.join(str(tmp_path), "a.xlsx"), settings, "2022-03-01 12:00:00")
+    ]
+
+
+def test_run_job(statement: str, settings: Dict[str, Any], tmp_path: str) -> None:
+    """Этот тест проверяет, что задание сохраняет дашборд и отчеты в каталог пользователя"""
+    output_dir = os.path.join(str(tmp_path), "output")
+    result = run_job(BatchJob("anna", statement, settings, "2022-03-01 12:00:00"), output_dir)
+    assert result.ok, result.error
+    assert sorted(os.listdir(os.path.join(output_dir, "anna"))) == [
+        "cashback_categories.json",
+        "dashboard.json",
+        "spending_by_category.json",
+        "spending_by_weekday.json",
+        "spending_by_workday.json",
+    ]
+    assert stat.S_IMODE(os.stat(os.path.join(output_dir, "anna", "dashboard.json")).st_mode) == FILE_MODE
+    with open(os.path.join(output_dir, "anna", "dashboard.json"), encoding="utf-8") as f:
+        dashboard = json.load(f)
+    assert len(dashboard["top_transactions"]) == 2
+    with open(os.path.join(output_dir, "anna", "cashback_categories.json"), encoding="utf-8") as f:
+        assert json.load(f) == {}
+
+
+def test_run_batch_reports_failures(statement: str, settings: Dict[str, Any], tmp_path: str) -> None:
+    """Этот тест проверяет, что ошибка одного задания не мешает остальным"""
+    output_dir = os.path.join(str(tmp_path), "output")
+    jobs = [
+        BatchJob("anna", statement, settings, "2022-03-01 12:00:00"),
+        BatchJob("boris", os.path.join(str(tmp_path), "missing.xlsx"), settings, "2022-03-01 12:00:00"),
+        BatchJob("../escape", statement, settings, "2022-03-01 12:00:00"),
+    ]
+    results = run_batch(jobs, output_dir, max_workers=2)
+    assert [result.ok for result in results] == [True, False, False]
+    assert "FileNotFoundError" in (results[1].error or "")
+    with open(os.path.join(output_dir, SUMMARY_FILE), encoding="utf-8") as f:
+        summary = json.load(f)
+    assert summary["succeeded"] == 1
+    assert summary["failed"] == 2
+    assert not os.path.exists(os.path.join(str(tmp_path), "escape"))
+
+
+def test_run_job_from_column_store(statement: str, settings: Dict[str, Any], tmp_path: str) -> None:
+    """Этот тест проверяет, что задание из колоночного хранилища дает те же результаты, что и из файла"""
+    job = BatchJob("anna", statement, settings, "2022-03-01 12:00:00")
+    from_file = run_job(job, os.path.join(str(tmp_path), "from_file"))
+    from_store = run_job(job, os.path.join(str(tmp_path), "from_store"), build_column_store(statement))
+    assert from_file.ok and from_store.ok, from_store.error
+    for first, second in zip(from_file.outputs, from_store.outputs):
+        with open(first, encoding="utf-8") as f, open(second, encoding="utf-8") as g:
+            assert f.read() == g.read()
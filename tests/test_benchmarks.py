@@ -0,0 +1,58 @@
+import json
+import os
+
+import pytest
+
+from benchmarks import run
+
+
+def test_parse_size() -> None:
+    """Этот тест проверяет разбор размеров выписки"""
+    assert run.parse_size("10k") == 10_000
+    assert run.parse_size("1M") == 1_000_000
+    assert run.parse_size("2.5m") == 2_500_000
+    assert run.parse_size("1234") == 1234
+
+
+def test_compare() -> None:
+    """Этот тест проверяет обнаружение регрессий по времени и памяти"""
+    baseline = {"a@10": {"seconds": 1.0, "peak_mb": 10.0}, "b@10": {"seconds": 1.0, "peak_mb": 10.0}}
+    results = {
+        "a@10": {"seconds": 1.2, "peak_mb": 13.0},
+        "b@10": {"seconds": 2.0, "peak_mb": 5.0},
+        "c@10": {"seconds": 100.0, "peak_mb": 100.0},
+    }
+    regressions = run.compare(results, baseline, 0.25)
+    assert len(regressions) == 2
+    assert regressions[0].startswith("a@10: peak_mb")
+    assert regressions[1].startswith("b@10: seconds")
+
+
+def test_memoized_report_is_faster() -> None:
+    """Этот тест проверяет, что попадание в кэш отчетов быстрее расчета отчета без кэша"""
+    names = ["reports.spending_by_category", "reports.spending_by_category[memoized]"]
+    results = run.run([100_000], names, repeat=3)
+    assert len(results) == 2
+    assert run.check_faster(results) == []
+
+
+def test_check_faster() -> None:
+    """Этот тест проверяет обнаружение кэшированного бенчмарка, который не быстрее расчета"""
+    results = {
+        "reports.spending_by_category@10": {"seconds": 1.0, "peak_mb": 1.0},
+        "reports.spending_by_category[memoized]@10": {"seconds": 2.0, "peak_mb": 1.0},
+    }
+    assert len(run.check_faster(results)) == 1
+
+
+def test_main_saves_baseline_and_detects_regression(tmp_path: str, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Этот тест проверяет сохранение базовых значений и код возврата при регрессии"""
+    baseline = os.path.join(tmp_path, "baseline.json")
+    args = ["--sizes", "1k", "--only", "views.get_cards", "--repeat", "1", "--baseline", baseline]
+    assert run.main(args + ["--save-baseline"]) == 0
+    with open(baseline, "r", encoding="utf-8") as f:
+        saved = json.load(f)
+    assert list(saved) == ["views.get_cards@1000"]
+
+    monkeypatch.setattr(run, "measure", lambda call, repeat: {"seconds": 1e6, "peak_mb": 0.0})
+    assert run.main(args) == 1
@@ -0,0 +1,134 @@
+import datetime
+import json
+import os
+import subprocess
+import sys
+
+import pandas as pd
+import pytest
+
+from src.column_store import build_column_store, get_store_path, open_column_store, write_column_store
+from src.currency import RateHistory
+from src.market_data import MarketDataClient
+from src.rollup import DailyRollup
+from src.services import invest_savings_by_month
+from src.synthetic import generate_transactions
+from src.transactions import CATEGORY, MCC, OPERATION_AMOUNT, to_transaction_table
+from tests.conftest import StubMarketServer, cbr_rate
+
+
+@pytest.fixture
+def transactions() -> pd.DataFrame:
+    """Эта фикстура возвращает синтетическую выписку на 5 000 строк"""
+    return generate_transactions(5_000, seed=4)
+
+
+@pytest.fixture
+def store(tmp_path: str, transactions: pd.DataFrame) -> str:
+    """Эта фикстура сохраняет выписку в колоночное хранилище и возвращает путь к нему"""
+    return write_column_store(transactions, os.path.join(str(tmp_path), "operations.columns"))
+
+
+def test_open_column_store_round_trip(store: str, transactions: pd.DataFrame) -> None:
+    """Этот тест проверяет, что хранилище возвращает исходную таблицу"""
+    pd.testing.assert_frame_equal(open_column_store(store), transactions)
+
+
+def test_open_column_store_is_read_only_memmap(store: str) -> None:
+    """Этот тест проверяет, что столбцы отображены в память и доступны только для чтения"""
+    table = open_column_store(store)
+    amounts = table[OPERATION_AMOUNT].to_numpy()
+    codes = table[CATEGORY].cat.codes.to_numpy()
+    for values in (amounts, codes):
+        assert not values.flags.writeable
+        base = values
+        while base.base is not None and not hasattr(base, "filename"):
+            base = base.base
+        assert getattr(base, "filename", None) is not None
+    with pytest.raises(ValueError):
+        amounts[0] = 0.0
+
+
+def test_open_column_store_supports_analytics(store: str, transactions: pd.DataFrame) -> None:
+    """Этот тест проверяет, что сервисы и куб работают с таблицей из хранилища"""
+    table = open_column_store(store)
+    pd.testing.assert_frame_equal(invest_savings_by_month(table), invest_savings_by_month(transactions))
+    assert (
+        DailyRollup.from_transactions(table).fingerprint() == DailyRollup.from_transactions(transactions).fingerprint()
+    )
+
+
+def test_write_column_store_mixed_categories(tmp_path: str) -> None:
+    """Этот тест проверяет словарь категорий со значениями разных типов и замену хранилища"""
+    frame = to_transaction_table(
+        pd.DataFrame(
+            {
+                "Дата операции": ["10.02.2022 12:00:00", "11.02.2022 12:00:00"],
+                "MCC": pd.Categorical([5411.0, "5812.0"]),
+                "Сумма операции": [-1.0, -2.0],
+            }
+        )
+    )
+    directory = os.path.join(str(tmp_path), "mixed.columns")
+    write_column_store(frame.iloc[:1], directory)
+    write_column_store(frame, directory)
+    table = open_column_store(directory)
+    assert table[MCC].tolist() == [5411.0, "5812.0"]
+    assert os.listdir(str(tmp_path)) == ["mixed.columns"]
+
+
+def test_build_column_store_reuses_store(tmp_path: str, transactions: pd.DataFrame) -> None:
+    """Этот тест проверяет, что хранилище пересобирается только при изменении выписки"""
+    statement = os.path.join(str(tmp_path), "operations.xlsx")
+    transactions.iloc[:200].to_excel(statement, index=False)
+    directory = build_column_store(statement)
+    assert directory == get_store_path(statement)
+    meta_mtime = os.stat(os.path.join(directory, "meta.json")).st_mtime_ns
+    assert build_column_store(statement) == directory
+    assert os.stat(os.path.join(directory, "meta.json")).st_mtime_ns == meta_mtime
+    transactions.iloc[:100].to_excel(statement, index=False)
+    assert len(open_column_store(build_column_store(statement))) == 100
+
+
+def test_build_column_store_tracks_rates(tmp_path: str, stub_server: StubMarketServer) -> None:
+    """Этот тест проверяет, что хранилище пересобирается при смене базовой валюты и курсов"""
+    statement = os.path.join(str(tmp_path), "operations.xlsx")
+    pd.DataFrame(
+        {
+            "Дата операции": ["12.01.2022 12:00:00", "14.01.2022 12:00:00"],
+            "Сумма операции": [-10.0, -700.0],
+            "Валюта операции": ["USD", "RUB"],
+        }
+    ).to_excel(statement, index=False)
+    rates_path = os.path.join(str(tmp_path), "rates.json")
+    today = datetime.date(2022, 1, 31)
+    with MarketDataClient(rate_history_url=f"{stub_server.base_url}/cbr", timeout=2.0) as client:
+        history = RateHistory(client, rates_path, today=lambda: today)
+        directory = build_column_store(statement, history=history)
+        usd_rate = cbr_rate("R01235", datetime.date(2022, 1, 12))
+        assert open_column_store(directory)[OPERATION_AMOUNT].tolist() == pytest.approx([-10.0 * usd_rate, -700.0])
+        meta_mtime = os.stat(os.path.join(directory, "meta.json")).st_mtime_ns
+        assert build_column_store(statement, history=history) == directory
+        assert os.stat(os.path.join(directory, "meta.json")).st_mtime_ns == meta_mtime
+
+        build_column_store(statement, history=history, base_currency="USD")
+        assert open_column_store(directory)[OPERATION_AMOUNT].tolist() == pytest.approx(
+            [-10.0, -700.0 / cbr_rate("R01235", datetime.date(2022, 1, 14))]
+        )
+
+        with open(rates_path, "r", encoding="utf-8") as f:
+            entries = json.load(f)
+        entries["USD"]["rates"]["2022-01-12"] = 75.0
+        with open(rates_path, "w", encoding="utf-8") as f:
+            json.dump(entries, f)
+        build_column_store(statement, history=RateHistory(client, rates_path, today=lambda: today))
+        assert open_column_store(directory)[OPERATION_AMOUNT].tolist() == pytest.approx([-750.0, -700.0])
+    assert stub_server.requests == {"R01235": 2}
+
+
+def test_open_column_store_in_other_process(store: str, transactions: pd.DataFrame) -> None:
+    """Этот тест проверяет, что хранилище открывается из другого процесса"""
+    code = f"from src.column_store import open_column_store; print(len(open_column_store({store!r})))"
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    completed = subprocess.run([sys.executable, "-c", code], cwd=root, capture_output=True, text=True, check=True)
+    assert completed.stdout.strip() == str(len(transactions))
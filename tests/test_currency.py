@@ -0,0 +1,122 @@
+import datetime
+import os
+from typing import Iterator
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.currency import ORIGINAL_AMOUNT, ORIGINAL_CURRENCY, RateHistory, normalize_currency
+from src.market_data import MarketDataClient
+from src.transactions import (
+    OPERATION_AMOUNT,
+    OPERATION_CURRENCY,
+    OPERATION_DATE,
+    PAYMENT_AMOUNT,
+    PAYMENT_CURRENCY,
+    to_transaction_table,
+)
+from tests.conftest import StubMarketServer, cbr_rate
+
+TODAY = datetime.date(2022, 1, 31)
+
+
+@pytest.fixture
+def stub_client(stub_server: StubMarketServer) -> Iterator[MarketDataClient]:
+    """Эта фикстура возвращает клиент, настроенный на локальную заглушку ЦБ РФ"""
+    client = MarketDataClient(rate_history_url=f"{stub_server.base_url}/cbr", timeout=2.0)
+    yield client
+    client.close()
+
+
+@pytest.fixture
+def history(stub_client: MarketDataClient, tmp_path: str) -> RateHistory:
+    """Эта фикстура возвращает кэш курсов в временном каталоге"""
+    return RateHistory(stub_client, os.path.join(tmp_path, "rates.json"), today=lambda: TODAY)
+
+
+@pytest.fixture
+def transactions() -> pd.DataFrame:
+    """Эта фикстура возвращает операции в рублях, долларах, иенах и неизвестной валюте"""
+    return to_transaction_table(
+        pd.DataFrame(
+            {
+                OPERATION_DATE: pd.to_datetime(
+                    [
+                        "2022-01-10 10:00",
+                        "2022-01-12 12:00",
+                        "2022-01-15 18:00",
+                        "2022-01-17 09:00",
+                        "2022-01-18 08:00",
+                    ]
+                ),
+                OPERATION_AMOUNT: [-100.0, -10.0, -2.0, -1000.0, -5.0],
+                OPERATION_CURRENCY: ["RUB", "USD", "USD", "JPY", "XXX"],
+                PAYMENT_AMOUNT: [-100.0, -760.0, -2.0, -1000.0, -5.0],
+                PAYMENT_CURRENCY: ["RUB", "RUB", "USD", "JPY", "XXX"],
+            }
+        )
+    )
+
+
+def test_fetch_rate_history(stub_client: MarketDataClient) -> None:
+    """Этот тест проверяет разбор курсов ЦБ РФ с учетом номинала"""
+    rates = stub_client.fetch_rate_history("R01820", datetime.date(2022, 1, 14), datetime.date(2022, 1, 17))
+    assert rates == [
+        (datetime.date(2022, 1, 14), pytest.approx(cbr_rate("R01820", datetime.date(2022, 1, 14)))),
+        (datetime.date(2022, 1, 17), pytest.approx(cbr_rate("R01820", datetime.date(2022, 1, 17)))),
+    ]
+
+
+def test_rate_history_fetches_only_missing_ranges(
+    history: RateHistory, stub_server: StubMarketServer, stub_client: MarketDataClient, tmp_path: str
+) -> None:
+    """Этот тест проверяет дозагрузку краев периода и сохранение курсов на диск"""
+    rates = history.rates(["USD", "RUB"], datetime.date(2022, 1, 10), datetime.date(2022, 1, 20))
+    assert set(rates["currency"]) == {"USD"}
+    assert rates["date"].is_monotonic_increasing
+    assert stub_server.requests == {"R01235": 1}
+
+    history.rates(["USD"], datetime.date(2022, 1, 12), datetime.date(2022, 1, 15))
+    assert stub_server.requests == {"R01235": 1}
+
+    extended = history.rates(["USD"], datetime.date(2022, 1, 10), datetime.date(2022, 3, 1))
+    assert stub_server.requests == {"R01235": 2}
+    assert extended["date"].max() == pd.Timestamp(TODAY)
+
+    reloaded = RateHistory(stub_client, os.path.join(tmp_path, "rates.json"), today=lambda: TODAY)
+    pd.testing.assert_frame_equal(reloaded.rates(["USD"], datetime.date(2022, 1, 10), TODAY), extended)
+    assert stub_server.requests == {"R01235": 2}
+
+
+def test_normalize_currency(
+    history: RateHistory, transactions: pd.DataFrame, stub_server: StubMarketServer, caplog: pytest.LogCaptureFixture
+) -> None:
+    """Этот тест проверяет пересчет сумм в рубли по сумме платежа и курсу на дату операции"""
+    normalized = normalize_currency(transactions, history, "RUB")
+    expected = [
+        -100.0,
+        -760.0,
+        -2.0 * cbr_rate("R01235", datetime.date(2022, 1, 14)),
+        -1000.0 * cbr_rate("R01820", datetime.date(2022, 1, 17)),
+        np.nan,
+    ]
+    np.testing.assert_allclose(normalized[OPERATION_AMOUNT].to_numpy(), expected)
+    assert normalized[OPERATION_CURRENCY].tolist() == ["RUB"] * 5
+    assert normalized[ORIGINAL_AMOUNT].tolist() == transactions[OPERATION_AMOUNT].tolist()
+    assert normalized[ORIGINAL_CURRENCY].tolist() == transactions[OPERATION_CURRENCY].tolist()
+    assert stub_server.requests == {"R01235": 1, "R01820": 1}
+    assert "Не найден курс для 1 операций" in caplog.text
+
+    assert normalize_currency(normalized, history, "RUB") is normalized
+
+
+def test_normalize_currency_cross_rates(history: RateHistory, transactions: pd.DataFrame) -> None:
+    """Этот тест проверяет пересчет в небазовую для ЦБ РФ валюту через кросс-курс"""
+    normalized = normalize_currency(transactions.iloc[:4], history, "USD")
+    date = datetime.date(2022, 1, 10)
+    assert normalized[OPERATION_AMOUNT].iloc[0] == pytest.approx(-100.0 / cbr_rate("R01235", date))
+    assert normalized[OPERATION_AMOUNT].iloc[1] == -10.0
+    assert normalized[OPERATION_AMOUNT].iloc[2] == -2.0
+    jpy = -1000.0 * cbr_rate("R01820", datetime.date(2022, 1, 17)) / cbr_rate("R01235", datetime.date(2022, 1, 17))
+    assert normalized[OPERATION_AMOUNT].iloc[3] == pytest.approx(jpy)
@@ -0,0 +1,75 @@
+import os
+from typing import List
+
+import pandas as pd
+import pytest
+
+from src.ingest import StatementIngest, find_statements, load_statements, transaction_hashes
+from src.synthetic import generate_transactions, write_statement
+from src.transactions import OPERATION_AMOUNT, to_transaction_table
+
+
+@pytest.fixture
+def transactions() -> pd.DataFrame:
+    """Эта фикстура возвращает синтетическую выписку на 3 000 строк"""
+    return generate_transactions(3_000, seed=3)
+
+
+@pytest.fixture
+def statements(tmp_path: str, transactions: pd.DataFrame) -> List[str]:
+    """Эта фикстура сохраняет три выписки с пересекающимися периодами в разных форматах"""
+    parts = [(0, 1_200, "a.csv"), (1_000, 2_200, "b.ndjson"), (2_000, 3_000, "c.csv")]
+    paths = []
+    for first, last, name in parts:
+        path = os.path.join(str(tmp_path), name)
+        write_statement(transactions.iloc[first:last], path)
+        paths.append(path)
+    return paths
+
+
+def test_find_statements(tmp_path: str, statements: List[str]) -> None:
+    """Этот тест проверяет поиск выписок в каталоге и по шаблону"""
+    with open(os.path.join(str(tmp_path), "notes.txt"), "w") as f:
+        f.write("не выписка")
+    assert find_statements([str(tmp_path)]) == sorted(statements)
+    assert find_statements([os.path.join(str(tmp_path), "*.csv")]) == [statements[0], statements[2]]
+    with pytest.raises(FileNotFoundError):
+        find_statements([os.path.join(str(tmp_path), "*.xlsx")])
+    with pytest.raises(FileNotFoundError):
+        find_statements([os.path.join(str(tmp_path), "missing.csv")])
+
+
+def test_load_statements_drops_overlap(tmp_path: str, statements: List[str], transactions: pd.DataFrame) -> None:
+    """Этот тест проверяет, что пересечения выписок попадают в таблицу один раз"""
+    table = load_statements([str(tmp_path)], max_workers=2)
+    assert len(table) == len(transactions)
+    assert table[OPERATION_AMOUNT].sum() == pytest.approx(transactions[OPERATION_AMOUNT].sum())
+    assert sorted(transaction_hashes(table)) == sorted(transaction_hashes(transactions))
+
+
+def test_ingest_repeated_statement(statements: List[str]) -> None:
+    """Этот тест проверяет, что повторная загрузка выписки не пересобирает таблицу"""
+    ingest = StatementIngest()
+    assert ingest.ingest(statements[:2]) == 2_200
+    assert ingest.duplicates == 200
+    table = ingest.table
+    assert ingest.ingest([statements[1]]) == 0
+    assert ingest.duplicates == 1_400
+    assert ingest.table is table
+    assert len(ingest) == 2_200
+
+
+def test_ingest_keeps_duplicates_within_statement() -> None:
+    """Этот тест проверяет, что одинаковые операции внутри одной выписки не удаляются"""
+    frame = pd.DataFrame(
+        {
+            "Дата операции": ["10.02.2022 12:00:00", "10.02.2022 12:00:00"],
+            "Номер карты": ["*7197", "*7197"],
+            "Сумма операции": [-100.0, -100.0],
+            "Описание": ["Кофе", "Кофе"],
+        }
+    )
+    ingest = StatementIngest()
+    assert ingest.add(to_transaction_table(frame)) == 2
+    assert ingest.add(to_transaction_table(frame)) == 0
+    assert len(ingest.table) == 2
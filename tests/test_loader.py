@@ -0,0 +1,51 @@
+import os
+from unittest.mock import patch
+
+import pandas as pd
+import pytest
+
+from src.loader import get_cache_path, load_transactions
+from src.transactions import to_transaction_table
+
+
+@pytest.fixture
+def statement_path(tmp_path: str) -> str:
+    """Эта фикстура создает небольшой файл выписки"""
+    path = os.path.join(str(tmp_path), "operations.xlsx")
+    pd.DataFrame(
+        {
+            "Дата операции": ["31.12.2021 16:44:00", "30.12.2021 10:00:00"],
+            "Номер карты": ["*7197", None],
+            "Сумма операции": [-160.89, -50.0],
+            "Категория": ["Супермаркеты", "Каршеринг"],
+            "MCC": [5411.0, None],
+        }
+    ).to_excel(path, index=False)
+    return path
+
+
+def test_load_transactions_builds_cache(statement_path: str) -> None:
+    """Этот тест проверяет, что кэш создается и совпадает с исходными данными"""
+    expected = to_transaction_table(pd.read_excel(statement_path))
+    result = load_transactions(statement_path)
+    assert os.path.exists(get_cache_path(statement_path))
+    pd.testing.assert_frame_equal(result, expected)
+
+
+def test_load_transactions_uses_cache(statement_path: str) -> None:
+    """Этот тест проверяет, что повторная загрузка не разбирает Excel-файл"""
+    expected = load_transactions(statement_path)
+    with patch("src.loader.read_statement") as mock_read_statement:
+        result = load_transactions(statement_path)
+    mock_read_statement.assert_not_called()
+    pd.testing.assert_frame_equal(result, expected)
+
+
+def test_load_transactions_rebuilds_changed_file(statement_path: str) -> None:
+    """Этот тест проверяет, что кэш пересобирается после изменения файла"""
+    load_transactions(statement_path)
+    pd.DataFrame({"Дата операции": ["01.01.2022 12:00:00"], "Сумма операции": [1.0]}).to_excel(
+        statement_path, index=False
+    )
+    result = load_transactions(statement_path)
+    assert list(result["Сумма операции"]) == [1.0]
@@ -1,9 +1,26 @@
+import json
+import os
+import subprocess
+import sys
 from typing import Dict, Hashable, List
 from unittest.mock import MagicMock, patch
 
 import pytest
 
+from src.ingest import load_statements
+from src.loader import load_transactions
 from src.main import convert_to_str_dict, main
+from src.metrics import metrics
+
+IMPORT_TIME_BUDGET_US = 500_000
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture(autouse=True)
+def run_in_tmp_path(tmp_path: str, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Эта фикстура запускает main во временном каталоге, куда сохраняются отчеты"""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr("src.writers.REPORTS_DIR", str(tmp_path))
 
 
 def test_convert_to_str_dict(mock_data: Dict[str, List[Dict[Hashable, str]]]) -> None:
@@ -20,7 +37,7 @@ def test_convert_to_str_dict(mock_data: Dict[str, List[Dict[Hashable, str]]]) ->
 
 @pytest.fixture
 def mock_data() -> Dict[str, List[Dict[Hashable, str]]]:
-    """Этот фикстура возвращает тестовые данные"""
+    """Эта фикстура возвращает тестовые данные"""
     return {
         "cards": [],
         "transactions": [
@@ -32,7 +49,7 @@ def mock_data() -> Dict[str, List[Dict[Hashable, str]]]:
 
 @pytest.fixture
 def mock_user_settings() -> Dict[str, List[str]]:
-    """Этот фикстура возвращает тестовые настройки пользователя"""
+    """Эта фикстура возвращает тестовые настройки пользователя"""
     return {"user_currencies": ["USD", "EUR"], "user_stocks": ["AAPL", "GOOG"]}
 
 
@@ -95,5 +112,79 @@ def test_spending_by_workday(mock_spending_by_workday: MagicMock) -> None:
     main()
 
 
+def test_main_writes_metrics_and_profile(tmp_path: str) -> None:
+    """Этот тест проверяет сохранение метрик этапов и результатов профилирования"""
+    metrics_dir = os.path.join(tmp_path, "metrics")
+    profile_dir = os.path.join(tmp_path, "profile")
+    metrics.reset()
+    with patch("src.main.get_json_response", return_value="{}"):
+        main(["--metrics-dir", metrics_dir, "--profile-dir", profile_dir])
+    with open(os.path.join(metrics_dir, "metrics.json"), "r", encoding="utf-8") as f:
+        saved = json.load(f)
+    assert saved["stages"]["services"]["calls"] == 1
+    assert saved["stages"]["services"]["peak_alloc_bytes"] > 0
+    assert saved["stages"]["convert"]["rows"] > 0
+    assert {"normalized_dataset", "reports"} <= set(saved["caches"])
+    assert os.path.exists(os.path.join(metrics_dir, "metrics.prom"))
+    assert os.path.exists(os.path.join(profile_dir, "profile.pstats"))
+
+
+def test_main_reads_statements(tmp_path: str) -> None:
+    """Этот тест проверяет, что повторно переданная выписка загружается один раз"""
+    statement = os.path.join(ROOT_DIR, "data", "operations.xlsx")
+    with patch("src.main.get_json_response", return_value="{}") as mock_get_json_response:
+        with patch("src.main.load_statements", wraps=load_statements) as mock_load_statements:
+            main(["--statements", statement, statement])
+    mock_load_statements.assert_called_once_with([statement, statement])
+    transactions = mock_get_json_response.call_args.args[1]["transactions"]
+    assert len(transactions) == len(load_transactions(statement))
+
+
+def test_main_prints_timings(capsys: pytest.CaptureFixture[str]) -> None:
+    """Этот тест проверяет вывод времени этапов и критического пути"""
+    with patch("src.main.get_json_response", return_value="{}"):
+        main(["--timings"])
+    output = capsys.readouterr().out
+    assert "→ output" in output
+    for stage in ["market_data", "dashboard", "cashback", "spending_by_workday", "convert"]:
+        assert stage in output
+
+
+def _import_times(module: str) -> Dict[str, int]:
+    """Возвращает накопленное время импорта каждого модуля в микросекундах"""
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT_DIR,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times = {}
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.split(":", 1)[1].split("|")
+        times[name.strip()] = int(cumulative)
+    return times
+
+
+@pytest.mark.parametrize("module", ["src.main", "src.reports", "src.views", "src.services"])
+def test_import_time_budget(module: str) -> None:
+    """Этот тест проверяет, что импорт модулей не загружает pandas и requests и укладывается в бюджет"""
+    times = _import_times(module)
+    assert "pandas" not in times
+    assert "requests" not in times
+    assert times[module] < IMPORT_TIME_BUDGET_US
+
+
+def test_main_help() -> None:
+    """Этот тест проверяет, что справка выводится без загрузки данных"""
+    completed = subprocess.run(
+        [sys.executable, "-m", "src.main", "--help"], cwd=ROOT_DIR, capture_output=True, text=True
+    )
+    assert completed.returncode == 0
+    assert "--date" in completed.stdout
+
+
 if __name__ == "__main__":
     main()
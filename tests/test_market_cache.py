@@ -0,0 +1,119 @@
+import os
+import threading
+import time
+from typing import Iterator, List
+
+import pytest
+
+from src.market_cache import DEFAULT_MAX_STALE, MarketDataCache
+from src.market_data import MarketDataClient
+from tests.conftest import StubMarketServer
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def client(stub_server: StubMarketServer) -> Iterator[MarketDataClient]:
+    """Эта фикстура возвращает клиент, настроенный на локальный HTTP-сервер"""
+    client = MarketDataClient(
+        exchange_rates_url=f"{stub_server.base_url}/latest", stock_prices_url=f"{stub_server.base_url}/query"
+    )
+    yield client
+    client.close()
+
+
+@pytest.fixture
+def cache_path(tmp_path: str) -> str:
+    return os.path.join(str(tmp_path), "market_data.json")
+
+
+def test_currency_rates_share_one_table(
+    client: MarketDataClient, stub_server: StubMarketServer, cache_path: str
+) -> None:
+    """Этот тест проверяет, что курсы всех валют берутся из одной таблицы"""
+    cache = MarketDataCache(client, cache_path)
+    rates = cache.get_currency_rates(["USD", "EUR"])
+    cache.get_currency_rates(["USD"])
+    assert [rate["rate"] for rate in rates] == [80.0, 100.0]
+    assert stub_server.requests == {"RUB": 1}
+    assert cache.stats["hits"] == 1
+    assert cache.stats["misses"] == 1
+
+
+def test_cache_survives_restart(client: MarketDataClient, stub_server: StubMarketServer, cache_path: str) -> None:
+    """Этот тест проверяет, что значения сохраняются на диск"""
+    MarketDataCache(client, cache_path).get_stock_prices(["AAPL"])
+    prices = MarketDataCache(client, cache_path).get_stock_prices(["AAPL"])
+    assert prices == [{"stock": "AAPL", "price": 100.0}]
+    assert stub_server.requests == {"AAPL": 1}
+
+
+def test_stale_while_revalidate(client: MarketDataClient, stub_server: StubMarketServer, cache_path: str) -> None:
+    """Этот тест проверяет, что устаревшее значение отдается сразу и обновляется в фоне"""
+    clock = FakeClock()
+    cache = MarketDataCache(client, cache_path, ttls={"stocks": 10.0}, clock=clock)
+    cache.get_stock_price("AAPL")
+    clock.now += 60.0
+    started = time.perf_counter()
+    assert cache.get_stock_price("AAPL") == 100.0
+    assert time.perf_counter() - started < 0.1
+    assert cache.stats["stale_hits"] == 1
+    deadline = time.time() + 5
+    while stub_server.requests.get("AAPL", 0) < 2 and time.time() < deadline:
+        time.sleep(0.05)
+    assert stub_server.requests["AAPL"] == 2
+
+
+def test_missing_quote_is_not_cached(client: MarketDataClient, stub_server: StubMarketServer, cache_path: str) -> None:
+    """Этот тест проверяет, что ответ без цены не сохраняется в кэш и не отдается как цена 0.0"""
+    cache = MarketDataCache(client, cache_path)
+    assert cache.get_stock_prices(["UNKNOWN"]) == [{"stock": "UNKNOWN", "price": 0.0}]
+    assert "stocks:UNKNOWN" not in cache.snapshot()
+    assert not os.path.exists(cache_path)
+    cache.get_stock_prices(["UNKNOWN"])
+    assert stub_server.requests == {"UNKNOWN": 2}
+
+
+def test_failed_refresh_keeps_last_value(
+    client: MarketDataClient, stub_server: StubMarketServer, cache_path: str
+) -> None:
+    """Этот тест проверяет, что неудачное обновление не заменяет последнее полученное значение"""
+    clock = FakeClock()
+    cache = MarketDataCache(client, cache_path, ttls={"stocks": 10.0}, clock=clock)
+    cache.get_stock_price("AAPL")
+    clock.now += 60.0
+
+    def rate_limited() -> float:
+        # Alpha Vantage при превышении лимита запросов возвращает ответ без котировки
+        return client.fetch_stock_price("UNKNOWN")
+
+    assert cache.get("stocks", "AAPL", rate_limited) == 100.0
+    deadline = time.time() + 5
+    while cache.stats["errors"] < 1 and time.time() < deadline:
+        time.sleep(0.05)
+    assert cache.stats["errors"] == 1
+    assert cache.snapshot()["stocks:AAPL"]["value"] == 100.0
+    clock.now += DEFAULT_MAX_STALE
+    assert cache.get("stocks", "AAPL", rate_limited) == 100.0
+
+
+def test_concurrent_lookups_are_coalesced(
+    client: MarketDataClient, stub_server: StubMarketServer, cache_path: str
+) -> None:
+    """Этот тест проверяет, что одновременные запросы одного символа объединяются"""
+    cache = MarketDataCache(client, cache_path)
+    results: List[float] = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get_stock_price("GOOG"))) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert results == [200.0] * 5
+    assert stub_server.requests == {"GOOG": 1}
+    assert cache.hit_rate() < 1.0
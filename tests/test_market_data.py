@@ -0,0 +1,58 @@
+import time
+from typing import Iterator
+
+import pytest
+
+from src.market_data import MarketDataClient
+from tests.conftest import DELAY, StubMarketServer
+
+
+@pytest.fixture
+def stub_client(stub_server: StubMarketServer) -> Iterator[MarketDataClient]:
+    """Эта фикстура возвращает клиент, настроенный на локальный HTTP-сервер"""
+    client = MarketDataClient(
+        exchange_rates_url=f"{stub_server.base_url}/latest",
+        stock_prices_url=f"{stub_server.base_url}/query",
+        timeout=0.6,
+        stock_concurrency=3,
+    )
+    yield client
+    client.close()
+
+
+def test_fetch_market_data_runs_in_parallel(stub_client: MarketDataClient) -> None:
+    """Этот тест проверяет, что все символы запрашиваются параллельно"""
+    started = time.perf_counter()
+    rates, prices = stub_client.fetch_market_data(["USD", "EUR"], ["AAPL", "GOOG", "MSFT"])
+    elapsed = time.perf_counter() - started
+    assert rates == [{"currency": "USD", "rate": 80.0}, {"currency": "EUR", "rate": 100.0}]
+    assert [price["price"] for price in prices] == [100.0, 200.0, 300.0]
+    assert elapsed < DELAY * 3
+
+
+def test_fetch_currency_rates_partial_failure(stub_client: MarketDataClient) -> None:
+    """Этот тест проверяет, что неизвестная валюта не мешает получить остальные"""
+    rates = stub_client.fetch_currency_rates(["USD", "XXX"])
+    assert rates == [{"currency": "USD", "rate": 80.0}, {"currency": "XXX", "rate": 0.0}]
+
+
+def test_fetch_currency_rates_failed_table(stub_client: MarketDataClient) -> None:
+    """Этот тест проверяет ответ при недоступной таблице курсов"""
+    rates = stub_client.fetch_currency_rates(["USD"], base_currency="XXX")
+    assert rates == [{"currency": "USD", "rate": 0.0}]
+
+
+def test_fetch_stock_price_without_quote(stub_client: MarketDataClient) -> None:
+    """Этот тест проверяет, что ответ без котировки считается ошибкой, а не ценой 0.0"""
+    with pytest.raises(ValueError):
+        stub_client.fetch_stock_price("UNKNOWN")
+
+
+def test_fetch_stock_prices_timeout(stub_client: MarketDataClient) -> None:
+    """Этот тест проверяет, что медленный ответ прерывается по таймауту"""
+    prices = stub_client.fetch_stock_prices(["AAPL", "SLOW", "UNKNOWN"])
+    assert prices == [
+        {"stock": "AAPL", "price": 100.0},
+        {"stock": "SLOW", "price": 0.0},
+        {"stock": "UNKNOWN", "price": 0.0},
+    ]
@@ -0,0 +1,115 @@
+import json
+import os
+import time
+import tracemalloc
+from typing import List
+
+import pytest
+
+from src.metrics import METRICS_JSON, METRICS_PROMETHEUS, PROFILE_ALLOCATIONS, PROFILE_STATS, Metrics, profile
+
+
+@pytest.fixture
+def metrics() -> Metrics:
+    """Эта фикстура возвращает пустой набор метрик"""
+    return Metrics()
+
+
+def test_stage(metrics: Metrics) -> None:
+    """Этот тест проверяет учет вызовов, длительности и строк этапа"""
+    with metrics.stage("load", rows=10):
+        time.sleep(0.01)
+    with metrics.stage("load") as run:
+        run.rows = 5
+    stats = metrics.snapshot()["stages"]["load"]
+    assert stats["calls"] == 2
+    assert stats["rows"] == 15
+    assert stats["seconds"] >= stats["max_seconds"] >= 0.01
+    assert "peak_alloc_bytes" not in stats
+
+
+def test_stage_records_failures(metrics: Metrics) -> None:
+    """Этот тест проверяет, что этап учитывается и при исключении"""
+    with pytest.raises(ValueError):
+        with metrics.stage("services"):
+            raise ValueError("ошибка")
+    assert metrics.snapshot()["stages"]["services"]["calls"] == 1
+
+
+def test_timed(metrics: Metrics) -> None:
+    """Этот тест проверяет декоратор и подсчет строк по результату"""
+
+    @metrics.timed("convert", rows=len)
+    def convert(values: List[int]) -> List[str]:
+        """Преобразует значения в строки"""
+        return [str(value) for value in values]
+
+    assert convert([1, 2, 3]) == ["1", "2", "3"]
+    convert([4, 5, 6])
+    assert convert.__doc__ == "Преобразует значения в строки"
+    assert metrics.snapshot()["stages"]["convert"]["rows"] == 6
+    assert metrics.format_stages().splitlines()[1].split() == ["convert", "2", "0.000", "6"]
+
+
+def test_stage_allocations(metrics: Metrics) -> None:
+    """Этот тест проверяет пиковые аллокации вложенных этапов при включенном tracemalloc"""
+    tracemalloc.start()
+    try:
+        with metrics.stage("outer"):
+            with metrics.stage("inner"):
+                data = bytearray(4 * 2**20)
+                del data
+    finally:
+        tracemalloc.stop()
+    stages = metrics.snapshot()["stages"]
+    assert stages["inner"]["peak_alloc_bytes"] >= 4 * 2**20
+    assert stages["outer"]["peak_alloc_bytes"] >= stages["inner"]["peak_alloc_bytes"]
+
+
+def test_caches(metrics: Metrics) -> None:
+    """Этот тест проверяет подсчет попаданий в кэши"""
+    metrics.record_cache("dataset", hit=False)
+    metrics.record_cache("dataset", hit=True)
+    metrics.record_cache("dataset", hit=True)
+    metrics.register_cache("reports", lambda: {"hits": 1, "misses": 3})
+    caches = metrics.snapshot()["caches"]
+    assert caches["dataset"] == {"hits": 2, "misses": 1, "hit_rate": pytest.approx(2 / 3)}
+    assert caches["reports"]["hit_rate"] == 0.25
+
+    metrics.reset()
+    assert "dataset" not in metrics.snapshot()["caches"]
+
+
+def test_to_prometheus(metrics: Metrics) -> None:
+    """Этот тест проверяет текстовый формат Prometheus"""
+    with metrics.stage('http."rates"', rows=1):
+        pass
+    metrics.record_cache("dataset", hit=True)
+    text = metrics.to_prometheus()
+    assert "# TYPE pipeline_stage_seconds_total counter" in text
+    assert 'pipeline_stage_calls_total{stage="http.\\"rates\\""} 1' in text
+    assert 'pipeline_cache_hit_ratio{cache="dataset"} 1.0' in text
+    assert "pipeline_stage_peak_alloc_bytes" not in text
+    assert text.endswith("\n")
+
+
+def test_write(metrics: Metrics, tmp_path: str) -> None:
+    """Этот тест проверяет сохранение метрик в JSON и Prometheus"""
+    with metrics.stage("views"):
+        pass
+    paths = metrics.write(os.path.join(tmp_path, "metrics"))
+    assert paths["json"].endswith(METRICS_JSON)
+    assert paths["prometheus"].endswith(METRICS_PROMETHEUS)
+    with open(paths["json"], "r", encoding="utf-8") as f:
+        saved = json.load(f)
+    assert saved["stages"]["views"]["calls"] == 1
+    assert saved["peak_rss_bytes"] > 0
+
+
+def test_profile(tmp_path: str) -> None:
+    """Этот тест проверяет сохранение результатов профилирования"""
+    with profile(str(tmp_path)):
+        sum(range(1000))
+    assert not tracemalloc.is_tracing()
+    assert os.path.getsize(os.path.join(tmp_path, PROFILE_STATS)) > 0
+    assert os.path.exists(os.path.join(tmp_path, PROFILE_ALLOCATIONS))
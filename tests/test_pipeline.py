@@ -0,0 +1,96 @@
+import threading
+import time
+from typing import List
+
+import pytest
+
+from src.pipeline import Pipeline, Stage
+
+
+def _sleep(seconds: float, value: str) -> str:
+    time.sleep(seconds)
+    return value
+
+
+def test_pipeline_passes_results() -> None:
+    """Этот тест проверяет передачу результатов этапов зависящим этапам"""
+    calls: List[str] = []
+
+    def load() -> int:
+        calls.append("load")
+        return 2
+
+    pipeline = Pipeline(
+        [
+            Stage("total", lambda doubled, squared: doubled + squared, ("doubled", "squared")),
+            Stage("doubled", lambda value: value * 2, ("load",)),
+            Stage("squared", lambda value: value**2, ("load",)),
+            Stage("load", load),
+        ]
+    )
+    assert pipeline.order[0] == "load"
+    assert pipeline.order[-1] == "total"
+    for max_workers in (1, 4):
+        assert pipeline.run(max_workers)["total"] == 8
+    assert calls == ["load", "load"]
+
+
+def test_pipeline_overlaps_independent_stages() -> None:
+    """Этот тест проверяет, что независимые этапы выполняются одновременно"""
+    pipeline = Pipeline(
+        [
+            Stage("network", lambda: _sleep(0.3, "rates")),
+            Stage("disk", lambda: _sleep(0.3, "statement")),
+            Stage("dashboard", lambda rates, statement: f"{rates}+{statement}", ("network", "disk")),
+        ]
+    )
+    started = time.perf_counter()
+    assert pipeline.run(4)["dashboard"] == "rates+statement"
+    assert time.perf_counter() - started < 0.5
+    assert pipeline.timings["dashboard"].start >= max(pipeline.timings["network"].end, pipeline.timings["disk"].end)
+
+
+def test_pipeline_critical_path() -> None:
+    """Этот тест проверяет критический путь и таблицу времени этапов"""
+    pipeline = Pipeline(
+        [
+            Stage("fast", lambda: _sleep(0.01, "fast")),
+            Stage("slow", lambda: _sleep(0.2, "slow")),
+            Stage("report", lambda fast: _sleep(0.01, fast), ("fast",)),
+            Stage("output", lambda slow, report: None, ("slow", "report")),
+        ]
+    )
+    pipeline.run(4)
+    assert pipeline.critical_path() == ["slow", "output"]
+    lines = pipeline.format_timings().splitlines()
+    assert len(lines) == 6
+    assert [line.split()[0] for line in lines[1:-1] if line.endswith("*")] == ["slow", "output"]
+    assert "slow → output" in lines[-1]
+
+
+def test_pipeline_stops_on_error() -> None:
+    """Этот тест проверяет, что ошибка этапа пробрасывается, а зависящие этапы не запускаются"""
+    started = threading.Event()
+
+    def fail() -> None:
+        raise RuntimeError("сеть недоступна")
+
+    pipeline = Pipeline([Stage("fetch", fail), Stage("dashboard", lambda _: started.set(), ("fetch",))])
+    for max_workers in (1, 4):
+        with pytest.raises(RuntimeError, match="сеть недоступна"):
+            pipeline.run(max_workers)
+    assert not started.is_set()
+
+
+@pytest.mark.parametrize(
+    "stages",
+    [
+        [Stage("a", lambda: None), Stage("a", lambda: None)],
+        [Stage("a", lambda b: None, ("b",))],
+        [Stage("a", lambda b: None, ("b",)), Stage("b", lambda a: None, ("a",))],
+    ],
+)
+def test_pipeline_rejects_invalid_graph(stages: List[Stage]) -> None:
+    """Этот тест проверяет повторные имена, необъявленные входы и циклы"""
+    with pytest.raises(ValueError):
+        Pipeline(stages)
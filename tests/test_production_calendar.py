@@ -0,0 +1,30 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.production_calendar import is_workday, workday_table
+
+
+@pytest.mark.parametrize(
+    "date, expected",
+    [
+        ("2021-12-30 10:00:00", True),
+        ("2021-12-31 10:00:00", False),
+        ("2022-01-10 10:00:00", True),
+        ("2022-03-05 10:00:00", True),
+        ("2022-03-07 10:00:00", False),
+        ("2022-03-12 10:00:00", False),
+        ("2030-01-07 10:00:00", True),
+    ],
+)
+def test_is_workday(date: str, expected: bool) -> None:
+    """Этот тест проверяет праздники, переносы и даты вне календаря"""
+    assert is_workday(pd.Series(pd.to_datetime([date])))[0] == expected
+
+
+def test_workday_table_is_read_only() -> None:
+    """Этот тест проверяет, что таблица календаря строится один раз и не изменяется"""
+    table = workday_table()
+    assert table is workday_table()
+    assert table.dtype == np.bool_
+    assert not table.flags.writeable
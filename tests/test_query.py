@@ -0,0 +1,98 @@
+import datetime
+from typing import Any
+
+import numpy as np
+import pandas as pd
+import pytest
+from numpy.typing import NDArray
+
+from src.query import TransactionIndex, TransactionQuery
+from src.synthetic import generate_transactions
+from src.transactions import CARD_NUMBER, CATEGORY, MCC, OPERATION_AMOUNT, OPERATION_DATE, STATUS, to_transaction_table
+
+
+@pytest.fixture(scope="module")
+def transactions() -> pd.DataFrame:
+    """Эта фикстура возвращает синтетическую выписку на 20 000 строк"""
+    return generate_transactions(
+        20_000, seed=5, start=datetime.datetime(2021, 1, 1), end=datetime.datetime(2022, 1, 1)
+    )
+
+
+@pytest.fixture(scope="module")
+def index(transactions: pd.DataFrame) -> TransactionIndex:
+    """Эта фикстура возвращает индекс синтетической выписки"""
+    return TransactionIndex(transactions)
+
+
+def _expected(transactions: pd.DataFrame, query: TransactionQuery) -> NDArray[Any]:
+    mask = pd.Series(True, index=transactions.index).to_numpy()
+    for column, values in query.values:
+        mask &= transactions[column].isin(list(values)).to_numpy()
+    if query.start is not None:
+        mask &= (transactions[OPERATION_DATE] >= query.start).to_numpy()
+    if query.end is not None:
+        mask &= (transactions[OPERATION_DATE] < query.end).to_numpy()
+    if query.min_amount is not None:
+        mask &= (transactions[OPERATION_AMOUNT] >= query.min_amount).to_numpy()
+    if query.max_amount is not None:
+        mask &= (transactions[OPERATION_AMOUNT] <= query.max_amount).to_numpy()
+    return np.flatnonzero(mask)
+
+
+@pytest.mark.parametrize(
+    "query",
+    [
+        TransactionQuery(),
+        TransactionQuery().card("*7197"),
+        TransactionQuery().card("*7197", "*4556").category("Супермаркеты", "Фастфуд"),
+        TransactionQuery().status("FAILED").amount(maximum=-100),
+        TransactionQuery().between(datetime.datetime(2021, 10, 1), datetime.datetime(2021, 12, 31, 12)),
+        TransactionQuery().between(datetime.datetime(2021, 3, 1, 0, 0, 7)).mcc("5411.0").currency("RUB"),
+        TransactionQuery().amount(-500, -100).between(end=datetime.datetime(2021, 2, 1)),
+        TransactionQuery().category("Каршеринг").between(datetime.datetime(2021, 5, 1), datetime.datetime(2021, 5, 2)),
+        TransactionQuery().between(datetime.datetime(2022, 1, 1), datetime.datetime(2021, 1, 1)),
+    ],
+)
+def test_positions_match_full_scan(
+    transactions: pd.DataFrame, index: TransactionIndex, query: TransactionQuery
+) -> None:
+    """Этот тест проверяет совпадение результатов индекса с полным просмотром таблицы"""
+    positions = index.positions(query)
+    assert positions.dtype == np.int64
+    assert positions.tolist() == _expected(transactions, query).tolist()
+    assert index.count(query) == len(positions)
+    pd.testing.assert_frame_equal(index.select(query), transactions.iloc[positions])
+
+
+def test_query_composition() -> None:
+    """Этот тест проверяет объединение условий через &"""
+    first = TransactionQuery().card("*7197", "*4556").between(datetime.datetime(2021, 1, 1)).amount(maximum=-10)
+    second = TransactionQuery().card("*4556").between(end=datetime.datetime(2021, 6, 1)).amount(-1000, -100)
+    combined = first & second
+    assert dict(combined.values) == {CARD_NUMBER: frozenset({"*4556"})}
+    assert (combined.start, combined.end) == (datetime.datetime(2021, 1, 1), datetime.datetime(2021, 6, 1))
+    assert (combined.min_amount, combined.max_amount) == (-1000, -100)
+    assert first.category("Фастфуд") == first & TransactionQuery().where(CATEGORY, "Фастфуд")
+
+
+def test_numeric_mcc_and_unknown_values() -> None:
+    """Этот тест проверяет поиск MCC, записанных числами, и отсутствующие значения"""
+    table = to_transaction_table(
+        pd.DataFrame(
+            {
+                OPERATION_DATE: pd.to_datetime(["2021-12-01", "2021-12-02", "2021-12-03"]),
+                OPERATION_AMOUNT: [-1500.0, -200.0, -3000.0],
+                MCC: [5411.0, 5812.0, 5411.0],
+                STATUS: ["FAILED", "OK", "OK"],
+                CARD_NUMBER: ["*7197", "*7197", None],
+            }
+        )
+    )
+    index = TransactionIndex(table)
+    assert index.positions(TransactionQuery().mcc(5411)).tolist() == [0, 2]
+    assert index.positions(TransactionQuery().mcc("5411").status("FAILED").card("*7197")).tolist() == [0]
+    assert index.count(TransactionQuery().card("*0000")) == 0
+    assert index.count(TransactionQuery().card("*7197") & TransactionQuery().card("*4556")) == 0
+    with pytest.raises(KeyError):
+        index.positions(TransactionQuery().category("Фастфуд"))
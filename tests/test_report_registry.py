@@ -0,0 +1,123 @@
+import os
+from typing import Any, List
+from unittest.mock import patch
+
+import pandas as pd
+import pytest
+
+from src.loader import invalidate_dataset
+from src.report_registry import ReportRegistry, dataset_fingerprint, report_registry
+from src.rollup import DailyRollup
+from src.synthetic import generate_transactions
+from src.transactions import frame_fingerprint, to_transaction_table
+
+
+@pytest.fixture
+def transactions() -> pd.DataFrame:
+    return to_transaction_table(
+        pd.DataFrame(
+            {
+                "Дата операции": ["10.02.2022 12:00:00", "12.02.2022 10:00:00"],
+                "Сумма операции": [-100.0, -200.0],
+                "Категория": ["Каршеринг", "Супермаркеты"],
+            }
+        )
+    )
+
+
+def _counting_report(registry: ReportRegistry, calls: List[Any]) -> Any:
+    @registry.memoize
+    def total(transactions: Any, category: str, scale: float = 1.0) -> pd.DataFrame:
+        calls.append((category, scale))
+        selected = transactions[transactions["Категория"] == category]
+        return pd.DataFrame({"total": [selected["Сумма операции"].sum() * scale]})
+
+    return total
+
+
+def test_memoize_normalizes_arguments(transactions: pd.DataFrame) -> None:
+    """Этот тест проверяет, что одинаковые вызовы считаются один раз"""
+    calls: List[Any] = []
+    total = _counting_report(ReportRegistry(), calls)
+    first = total(transactions, "Каршеринг")
+    second = total(transactions, category="Каршеринг", scale=1.0)
+    pd.testing.assert_frame_equal(first, second)
+    assert calls == [("Каршеринг", 1.0)]
+    total(transactions, "Супермаркеты")
+    assert len(calls) == 2
+
+
+def test_memoize_returns_copies(transactions: pd.DataFrame) -> None:
+    """Этот тест проверяет, что изменение результата не портит сохраненный отчет"""
+    total = _counting_report(ReportRegistry(), [])
+    total(transactions, "Каршеринг")["total"] = 0.0
+    assert total(transactions, "Каршеринг")["total"].tolist() == [-100.0]
+
+
+def test_memoize_detects_changed_data(transactions: pd.DataFrame) -> None:
+    """Этот тест проверяет, что результат пересчитывается для других данных"""
+    calls: List[Any] = []
+    total = _counting_report(ReportRegistry(), calls)
+    total(transactions, "Каршеринг")
+    changed = transactions.copy()
+    changed["Сумма операции"] = [-1.0, -2.0]
+    assert total(changed, "Каршеринг")["total"].tolist() == [-1.0]
+    rollup = DailyRollup.from_transactions(transactions)
+    fingerprint = rollup.fingerprint()
+    rollup.append(changed)
+    assert rollup.fingerprint() != fingerprint
+    assert len(calls) == 2
+
+
+def test_dataset_fingerprint_is_computed_once(transactions: pd.DataFrame) -> None:
+    """Этот тест проверяет, что отпечаток таблицы вычисляется один раз для каждого объекта таблицы"""
+    with patch("src.report_registry.frame_fingerprint", wraps=frame_fingerprint) as mock_fingerprint:
+        fingerprint = dataset_fingerprint(transactions)
+        assert dataset_fingerprint(transactions) == fingerprint
+        assert dataset_fingerprint(transactions.copy()) == fingerprint
+    assert mock_fingerprint.call_count == 2
+
+
+def test_memoize_detects_in_place_change(transactions: pd.DataFrame) -> None:
+    """Этот тест проверяет, что отчет пересчитывается после изменения таблицы на месте"""
+    from src.reports import spending_by_category
+
+    table = generate_transactions(50_000, seed=5)
+    first = spending_by_category(table, "Каршеринг", "2021-12-31")
+    table.loc[table.index[0], "Сумма операции"] = -1e9
+    table.loc[table.index[-1], "Категория"] = "Каршеринг"
+    second = spending_by_category(table, "Каршеринг", "2021-12-31")
+    assert not first.equals(second)
+    calls: List[Any] = []
+    total = _counting_report(ReportRegistry(), calls)
+    assert total(transactions, "Каршеринг")["total"].tolist() == [-100.0]
+    transactions.loc[transactions.index[0], "Сумма операции"] = -999.0
+    assert total(transactions, "Каршеринг")["total"].tolist() == [-999.0]
+    transactions["Категория"] = transactions["Категория"].cat.rename_categories({"Каршеринг": "Такси"})
+    assert total(transactions, "Каршеринг")["total"].tolist() == [0.0]
+    assert len(calls) == 3
+
+
+def test_memoize_lru_and_disk(transactions: pd.DataFrame, tmp_path: str) -> None:
+    """Этот тест проверяет вытеснение из памяти и чтение с диска"""
+    calls: List[Any] = []
+    registry = ReportRegistry(max_entries=1, cache_dir=str(tmp_path))
+    total = _counting_report(registry, calls)
+    total(transactions, "Каршеринг")
+    total(transactions, "Супермаркеты")
+    assert len(os.listdir(str(tmp_path))) == 2
+    assert total(transactions, "Каршеринг")["total"].tolist() == [-100.0]
+    assert registry.stats == {"hits": 0, "disk_hits": 1, "misses": 2}
+    assert len(calls) == 2
+
+
+def test_invalidate_dataset_clears_reports(transactions: pd.DataFrame) -> None:
+    """Этот тест проверяет очистку памяти при сбросе данных"""
+    from src.reports import spending_by_weekday
+
+    spending_by_weekday(transactions, "2022-03-01")
+    assert "spending_by_weekday" in report_registry.reports
+    invalidate_dataset()
+    hits = report_registry.stats["hits"]
+    spending_by_weekday(transactions, "2022-03-01")
+    assert report_registry.stats["hits"] == hits
@@ -1,3 +1,5 @@
+from typing import List
+
 import pandas as pd
 import pytest
 
@@ -21,27 +23,36 @@ def test_spending_by_category(mock_transactions: pd.DataFrame) -> None:
     assert (1, 2) != (2, 2)
     assert result["Категория"].iloc[0] == category
     assert result["Сумма операции"].iloc[0] == 100.0
+    assert spending_by_category(mock_transactions, "Transport", "2022-01-02")["Категория"].tolist() == ["Transport"]
 
 
 def test_spending_by_weekday() -> None:
     mock_transactions = pd.DataFrame(
         {"Дата операции": ["2022-01-01", "2022-01-02", "2022-01-03"], "Сумма операции": [100.0, 200.0, 300.0]}
     )
-    date = "2022-01-01"
+    date = "2022-01-03"
     result = spending_by_weekday(mock_transactions, date)
-    print(result.index)  # Print the index to check its length
     assert result.shape == (7, 2)
     assert result["День недели"].iloc[0] == "Понедельник"
-    assert result["Сумма операции"].iloc[0] == 100.0
+    assert list(result["Сумма операции"]) == [300.0, 0.0, 0.0, 0.0, 0.0, 100.0, 200.0]
 
 
-def test_spending_by_workday() -> None:
-    mock_transactions = pd.DataFrame(
-        {"Дата операции": ["2022-01-01", "2022-01-02", "2022-01-03"], "Сумма операции": [100.0, 200.0, 300.0]}
-    )
-    date = "2022-01-01"
-    result = spending_by_workday(mock_transactions, date)
-    print(result.index)  # Print the index to check its length
+def test_spending_by_weekday_does_not_mutate_input() -> None:
+    mock_transactions = pd.DataFrame({"Дата операции": ["2022-01-01"], "Сумма операции": [100.0]})
+    spending_by_weekday(mock_transactions, "2022-01-01")
+    assert mock_transactions["Дата операции"].iloc[0] == "2022-01-01"
+
+
+@pytest.mark.parametrize(
+    "dates, expected",
+    [
+        (["2022-01-01", "2022-01-02", "2022-01-03"], [0.0, 200.0]),
+        (["2022-03-04", "2022-03-05", "2022-03-07"], [150.0, 300.0]),
+    ],
+)
+def test_spending_by_workday(dates: List[str], expected: List[float]) -> None:
+    mock_transactions = pd.DataFrame({"Дата операции": dates, "Сумма операции": [100.0, 200.0, 300.0]})
+    result = spending_by_workday(mock_transactions, dates[-1])
     assert result.shape == (2, 2)
     assert result["Рабочий/Выходной день"].iloc[0] == "Рабочии дни"
-    assert result["Сумма операции"].iloc[0] == 100.0
+    assert list(result["Сумма операции"]) == expected
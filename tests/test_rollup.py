@@ -0,0 +1,65 @@
+import datetime
+
+import pandas as pd
+import pytest
+
+from src.reports import spending_by_category, spending_by_weekday, spending_by_workday
+from src.rollup import DailyRollup
+from src.services import cashback_by_category
+
+
+@pytest.fixture
+def transactions() -> pd.DataFrame:
+    return pd.DataFrame(
+        {
+            "Дата операции": [
+                "01.03.2022 10:00:00",
+                "01.03.2022 18:00:00",
+                "05.03.2022 12:00:00",
+                "06.03.2022 12:00:00",
+                "07.03.2022 12:00:00",
+                "09.03.2022 12:00:00",
+            ],
+            "Номер карты": ["*7197", "*7197", "*4556", "*7197", "*4556", "*7197"],
+            "Статус": ["OK", "OK", "OK", "FAILED", "OK", "OK"],
+            "Сумма операции": [-100.0, -300.0, -50.0, -70.0, -20.0, -10.0],
+            "Кэшбэк": [1.0, None, 0.5, None, None, 2.0],
+            "Категория": ["Food", "Food", "Taxi", "Food", "Taxi", "Taxi"],
+            "MCC": [5411.0, 5411.0, 4121.0, 5411.0, 4121.0, 4121.0],
+        }
+    )
+
+
+def test_rollup_matches_reports(transactions: pd.DataFrame) -> None:
+    """Этот тест проверяет, что отчеты по кубу совпадают с отчетами по транзакциям"""
+    rollup = DailyRollup.from_transactions(transactions)
+    assert len(rollup.cube) == 5
+    for report, args in [
+        (spending_by_category, ("Food", "2022-03-09")),
+        (spending_by_weekday, ("2022-03-09",)),
+        (spending_by_workday, ("2022-03-09",)),
+    ]:
+        pd.testing.assert_frame_equal(report(rollup, *args), report(transactions, *args))
+
+
+def test_rollup_window(transactions: pd.DataFrame) -> None:
+    """Этот тест проверяет отбор строк куба за окно дат"""
+    rollup = DailyRollup.from_transactions(transactions)
+    window = rollup.window(datetime.date(2022, 3, 5), datetime.date(2022, 3, 7))
+    assert list(window["amount"]) == [-50.0, -70.0, -20.0]
+
+
+@pytest.mark.parametrize("split", [2, 4])
+def test_rollup_append(transactions: pd.DataFrame, split: int) -> None:
+    """Этот тест проверяет инкрементальное добавление транзакций"""
+    expected = DailyRollup.from_transactions(transactions).cube
+    rollup = DailyRollup.from_transactions(transactions.iloc[split:])
+    rollup.append(transactions.iloc[:split])
+    pd.testing.assert_frame_equal(rollup.cube, expected)
+
+
+def test_rollup_monthly_cashback(transactions: pd.DataFrame) -> None:
+    """Этот тест проверяет кэшбэк по месяцам из куба"""
+    rollup = DailyRollup.from_transactions(transactions)
+    result = cashback_by_category(rollup)
+    assert list(zip(result["category"], result["cashback"])) == [("Food", 1.0), ("Taxi", 2.5)]
@@ -0,0 +1,115 @@
+import os
+import re
+from typing import List
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.search import TransactionSearch, get_index_path, parse_query, tokenize
+from src.synthetic import generate_transactions
+from src.transactions import CATEGORY, DESCRIPTION, OPERATION_AMOUNT, to_transaction_table
+
+
+@pytest.fixture
+def transactions() -> pd.DataFrame:
+    """Эта фикстура возвращает небольшую выписку с описаниями на кириллице и латинице"""
+    return to_transaction_table(
+        pd.DataFrame(
+            {
+                "Дата операции": [
+                    "01.01.2022 10:00:00",
+                    "02.01.2022 10:00:00",
+                    "03.01.2022 10:00:00",
+                    "04.01.2022 10:00:00",
+                    "05.01.2022 10:00:00",
+                ],
+                "Сумма операции": [-100.0, -2500.0, -40.0, 500.0, -900.0],
+                "Категория": ["Аптеки", "Супермаркеты", "Аптеки", "Пополнения", "Супермаркеты"],
+                "Описание": ["Apteka 23", "Пятёрочка", "Аптека Ригла", "Перевод с карты", "Пятерочка Апт"],
+            }
+        )
+    )
+
+
+def test_parse_query() -> None:
+    """Этот тест проверяет разбор слов, префиксов и фраз"""
+    assert tokenize("Пятёрочка, AZS-10") == ["пятерочка", "azs", "10"]
+    assert parse_query('апт* "Food Court" Кафе') == [
+        ("prefix", ("апт",)),
+        ("phrase", ("food", "court")),
+        ("term", ("кафе",)),
+    ]
+
+
+@pytest.mark.parametrize(
+    "query, expected",
+    [
+        ("пятерочка", [1, 4]),
+        ("ПЯТЁРОЧКА", [1, 4]),
+        ("апт*", [0, 2, 4]),
+        ("apt*", [0]),
+        ('"аптека ригла"', [2]),
+        ('"ригла аптека"', []),
+        ('"аптеки apteka"', []),
+        ("супермаркеты апт*", [4]),
+        ("перевод карты", [3]),
+        ("неизвестно", []),
+    ],
+)
+def test_positions(transactions: pd.DataFrame, query: str, expected: List[int]) -> None:
+    """Этот тест проверяет поиск по словам, префиксам и фразам в описании и категории"""
+    assert TransactionSearch(transactions).positions(query).tolist() == expected
+
+
+def test_search_order(transactions: pd.DataFrame) -> None:
+    """Этот тест проверяет сортировку результатов по дате и по сумме"""
+    search = TransactionSearch(transactions)
+    assert search.search("супермаркеты")[OPERATION_AMOUNT].tolist() == [-900.0, -2500.0]
+    assert search.search("апт*", sort="amount", limit=2)[OPERATION_AMOUNT].tolist() == [-900.0, -100.0]
+    with pytest.raises(ValueError):
+        search.search("апт*", sort="name")
+    with pytest.raises(ValueError):
+        search.search("  ,  ")
+
+
+def test_positions_match_scan() -> None:
+    """Этот тест сравнивает результаты индекса с перебором строк на синтетической выписке"""
+    table = generate_transactions(20_000, seed=5)
+    search = TransactionSearch(table)
+    text = (table[CATEGORY].astype(str) + " " + table[DESCRIPTION].astype(str)).str.lower()
+    words = text.map(lambda value: set(re.findall(r"\w+", value)))
+    for term in ["супермаркеты", "аптека", "azs", "кафе"]:
+        expected = np.flatnonzero(words.map(lambda tokens: term in tokens).to_numpy())
+        assert search.positions(term).tolist() == expected.tolist()
+    expected = np.flatnonzero(words.map(lambda tokens: any(token.startswith("с") for token in tokens)).to_numpy())
+    assert search.positions("с*").tolist() == expected.tolist()
+
+
+def test_positions_with_missing_category() -> None:
+    """Этот тест проверяет, что строка без категории находится только по своему описанию"""
+    table = to_transaction_table(
+        pd.DataFrame(
+            {
+                "Дата операции": ["01.01.2022 10:00:00", "02.01.2022 10:00:00", "03.01.2022 10:00:00"],
+                "Сумма операции": [-100.0, -200.0, -300.0],
+                "Категория": ["Аптеки", "Супермаркеты", None],
+                "Описание": ["Аптека", "Пятерочка", "Магнит"],
+            }
+        )
+    )
+    search = TransactionSearch(table)
+    assert search.positions("магнит").tolist() == [2]
+    assert search.positions("аптека").tolist() == [0]
+    assert search.positions("аптеки").tolist() == [0]
+
+
+def test_index_is_persisted(tmp_path: str, transactions: pd.DataFrame) -> None:
+    """Этот тест проверяет, что индекс сохраняется и переиспользуется только для тех же описаний"""
+    path = get_index_path(os.path.join(str(tmp_path), "operations.xlsx"))
+    TransactionSearch(transactions, path)
+    modified = os.stat(path).st_mtime_ns
+    assert TransactionSearch(transactions, path).positions("пятерочка").tolist() == [1, 4]
+    assert os.stat(path).st_mtime_ns == modified
+    assert TransactionSearch(transactions.iloc[:3], path).positions("пятерочка").tolist() == [1]
+    assert os.stat(path).st_mtime_ns != modified
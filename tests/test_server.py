@@ -0,0 +1,110 @@
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterator, Optional, Tuple
+from urllib.error import HTTPError
+from urllib.parse import urlencode
+from urllib.request import Request, urlopen
+
+import pandas as pd
+import pytest
+
+from src.server import DashboardApp, DashboardServer
+
+
+@pytest.fixture
+def server(tmp_path: str) -> Iterator[DashboardServer]:
+    """Эта фикстура запускает сервер дашборда над небольшой выпиской"""
+    statement = os.path.join(str(tmp_path), "operations.xlsx")
+    pd.DataFrame(
+        {
+            "Дата операции": ["10.02.2022 12:00:00", "12.02.2022 10:00:00", "05.01.2022 09:30:00"],
+            "Номер карты": ["*7197", "*4556", "*7197"],
+            "Статус": ["OK", "OK", "OK"],
+            "Сумма операции": [-100.0, -200.0, -300.0],
+            "Кэшбэк": [1.0, 2.0, 3.0],
+            "Категория": ["Каршеринг", "Супермаркеты", "Каршеринг"],
+        }
+    ).to_excel(statement, index=False)
+    settings = os.path.join(str(tmp_path), "user_settings.json")
+    with open(settings, "w", encoding="utf-8") as f:
+        json.dump({"user_currencies": [], "user_stocks": []}, f)
+    app = DashboardApp(statement, settings)
+    app.warm_up()
+    server = DashboardServer(app, "127.0.0.1", 0)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def _get(
+    server: DashboardServer, path: str, headers: Optional[Dict[str, str]] = None
+) -> Tuple[int, Dict[str, str], bytes]:
+    url = f"http://127.0.0.1:{server.server_address[1]}{path}"
+    try:
+        with urlopen(Request(url, headers=headers or {}), timeout=10) as response:
+            return response.status, dict(response.headers), response.read()
+    except HTTPError as error:
+        return error.code, dict(error.headers), error.read()
+
+
+def test_dashboard(server: DashboardServer) -> None:
+    """Этот тест проверяет дашборд и условный запрос по ETag"""
+    status, headers, body = _get(server, "/dashboard?date=2022-03-01%2012:00:00")
+    assert status == 200
+    payload = json.loads(body)
+    assert payload["greeting"] == "Добрый день"
+    assert [card["last_digits"] for card in payload["cards"]] == ["4556", "7197"]
+    status, _, body = _get(server, "/dashboard?date=2022-03-01%2012:00:00", {"If-None-Match": headers["ETag"]})
+    assert status == 304
+    assert body == b""
+
+
+def test_reports(server: DashboardServer) -> None:
+    """Этот тест проверяет отчеты с параметрами даты и категории"""
+    status, _, body = _get(
+        server, "/reports/spending_by_category?" + urlencode({"date": "2022-03-01", "category": "Каршеринг"})
+    )
+    assert status == 200
+    assert json.loads(body) == [{"Категория": "Каршеринг", "Сумма операции": -400}]
+    status, _, body = _get(
+        server, "/reports/spending_by_category?" + urlencode({"date": "2022-03-01", "category": "Супермаркеты"})
+    )
+    assert status == 200
+    assert json.loads(body) == [{"Категория": "Супермаркеты", "Сумма операции": -200}]
+    status, _, body = _get(server, "/reports/spending_by_workday?date=2022-03-01")
+    assert status == 200
+    assert len(json.loads(body)) == 2
+
+
+@pytest.mark.parametrize(
+    "path, expected_status",
+    [("/reports/spending_by_weekday?date=01.03.2022", 400), ("/unknown", 404)],
+)
+def test_errors(server: DashboardServer, path: str, expected_status: int) -> None:
+    """Этот тест проверяет ответы на некорректные запросы"""
+    status, _, body = _get(server, path)
+    assert status == expected_status
+    assert "error" in json.loads(body)
+
+
+def test_concurrent_requests(server: DashboardServer) -> None:
+    """Этот тест проверяет, что одновременные запросы получают одинаковые ответы"""
+    with ThreadPoolExecutor(8) as pool:
+        responses = list(pool.map(lambda _: _get(server, "/reports/spending_by_weekday?date=2022-03-01"), range(16)))
+    assert {status for status, _, _ in responses} == {200}
+    assert len({body for _, _, body in responses}) == 1
+
+
+def test_search(server: DashboardServer) -> None:
+    """Этот тест проверяет поиск транзакций по категории с сортировкой по сумме"""
+    status, _, body = _get(server, "/search?" + urlencode({"q": "карш*", "sort": "amount", "limit": "1"}))
+    assert status == 200
+    assert [row["Сумма операции"] for row in json.loads(body)] == ["-300"]
+    for query in ({"q": ""}, {"q": "каршеринг", "sort": "name"}, {"q": "каршеринг", "limit": "x"}):
+        status, _, body = _get(server, "/search?" + urlencode(query))
+        assert status == 400
+        assert "error" in json.loads(body)
@@ -1,8 +1,14 @@
 import datetime
+import json
+import math
 from typing import Dict, List
 
+import pandas as pd
 import pytest
 
+from src.services import analyze_cashback_categories, cashback_by_category, invest_savings_by_month
+from src.synthetic import generate_transactions
+
 
 @pytest.fixture
 def mock_data() -> Dict[str, List[Dict[str, str]]]:
@@ -20,3 +26,80 @@ def test_analyze_cashback_categories() -> None:
     date_time = datetime.datetime.strptime(date_string, "%d.%m.%Y %H:%M:%S")
 
     print(date_time)
+
+
+@pytest.fixture
+def cashback_transactions() -> List[Dict[str, str]]:
+    return [
+        {"Дата операции": "05.01.2022 12:00:00", "Категория": "Food", "Сумма операции": "-100.0", "Кэшбэк": "5.0"},
+        {"Дата операции": "06.01.2022 12:00:00", "Категория": "Food", "Сумма операции": "-200.0", "Кэшбэк": ""},
+        {"Дата операции": "07.02.2022 12:00:00", "Категория": "Transport", "Сумма операции": "-50.0", "Кэшбэк": "1.0"},
+        {"Дата операции": "08.03.2022 12:00:00", "Категория": "Food", "Сумма операции": "-10.0", "Кэшбэк": "2.0"},
+    ]
+
+
+def test_cashback_by_category_all_periods(cashback_transactions: List[Dict[str, str]]) -> None:
+    """Этот тест проверяет расчет кэшбэка по всем месяцам за один проход"""
+    result = cashback_by_category(cashback_transactions)
+    assert list(zip(result["year"], result["month"], result["category"], result["cashback"])) == [
+        (2022, 1, "Food", 5.0),
+        (2022, 2, "Transport", 1.0),
+        (2022, 3, "Food", 2.0),
+    ]
+
+
+def test_cashback_by_category_selected_periods(cashback_transactions: List[Dict[str, str]]) -> None:
+    """Этот тест проверяет отбор нескольких месяцев"""
+    result = cashback_by_category(cashback_transactions, [(2022, 1), (2022, 3)])
+    assert list(result["month"]) == [1, 3]
+
+
+def test_cashback_by_category_without_cashback_column() -> None:
+    """Этот тест проверяет оценку кэшбэка, если в данных нет столбца «Кэшбэк»"""
+    transactions = [{"Дата операции": "05.01.2022 12:00:00", "Категория": "Food", "Сумма операции": "100.0"}]
+    result = cashback_by_category(transactions)
+    assert result["cashback"].iloc[0] == pytest.approx(1.0)
+
+
+def test_analyze_cashback_categories_wrapper(cashback_transactions: List[Dict[str, str]]) -> None:
+    """Этот тест проверяет JSON-обертку над расчетом кэшбэка"""
+    result = analyze_cashback_categories({"transactions": cashback_transactions}, 2022, 1)
+    assert json.loads(result) == {"Food": 5.0}
+
+
+def test_invest_savings_by_month() -> None:
+    """Этот тест проверяет накопления «Инвесткопилки» для всех шагов округления"""
+    transactions = [
+        {"Дата операции": "05.01.2022 12:00:00", "Сумма операции": "-1712.0", "Статус": "OK"},
+        {"Дата операции": "06.01.2022 12:00:00", "Сумма операции": "-49.99", "Статус": "OK"},
+        {"Дата операции": "07.01.2022 12:00:00", "Сумма операции": "-300.0", "Статус": "FAILED"},
+        {"Дата операции": "08.01.2022 12:00:00", "Сумма операции": "5000.0", "Статус": "OK"},
+        {"Дата операции": "02.03.2022 12:00:00", "Сумма операции": "-100.0", "Статус": "OK"},
+    ]
+    result = invest_savings_by_month(transactions)
+    assert result.to_dict("records") == [
+        {"year": 2022, "month": 1, "step": 10, "savings": 8.01},
+        {"year": 2022, "month": 1, "step": 50, "savings": 38.01},
+        {"year": 2022, "month": 1, "step": 100, "savings": 138.01},
+        {"year": 2022, "month": 3, "step": 10, "savings": 0.0},
+        {"year": 2022, "month": 3, "step": 50, "savings": 0.0},
+        {"year": 2022, "month": 3, "step": 100, "savings": 0.0},
+    ]
+    assert invest_savings_by_month(transactions, [100], periods=[(2022, 2)]).empty
+    with pytest.raises(ValueError):
+        invest_savings_by_month(transactions, [0, 10])
+
+
+def test_invest_savings_by_month_matches_loop() -> None:
+    """Этот тест проверяет совпадение с построчным расчетом на синтетической выписке"""
+    transactions = generate_transactions(5_000, seed=8)
+    result = invest_savings_by_month(transactions, (10, 50), periods=[(2019, 5), (2021, 12)])
+    spends = transactions[(transactions["Сумма операции"] < 0) & (transactions["Статус"] == "OK")]
+    expected = []
+    for (year, month), group in spends.groupby([spends["Дата операции"].dt.year, spends["Дата операции"].dt.month]):
+        if (year, month) not in [(2019, 5), (2021, 12)]:
+            continue
+        for step in (10, 50):
+            savings = sum(math.ceil(round(-amount, 2) / step) * step + amount for amount in group["Сумма операции"])
+            expected.append({"year": year, "month": month, "step": step, "savings": savings})
+    pd.testing.assert_frame_equal(result, pd.DataFrame(expected), check_dtype=False, atol=1e-6)
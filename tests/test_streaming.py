@@ -0,0 +1,84 @@
+import os
+import tracemalloc
+
+import pandas as pd
+import pytest
+
+from src.rollup import DailyRollup
+from src.streaming import iter_transaction_chunks, stream_rollup
+from src.transactions import concat_tables, to_transaction_table
+
+
+@pytest.fixture
+def transactions() -> pd.DataFrame:
+    return pd.DataFrame(
+        {
+            "Дата операции": ["31.12.2021 16:44:00", "30.12.2021 10:00:00", "29.12.2021 09:30:00"],
+            "Номер карты": ["*7197", "*4556", "*7197"],
+            "Сумма операции": [-160.89, -50.0, 1000.0],
+            "Кэшбэк": [1.0, None, None],
+            "Категория": ["Супермаркеты", "Каршеринг", "Пополнения"],
+            "MCC": [5411.0, 7512.0, None],
+        }
+    )
+
+
+def _write(frame: pd.DataFrame, path: str) -> None:
+    if path.endswith(".xlsx"):
+        frame.to_excel(path, index=False)
+    elif path.endswith(".csv"):
+        frame.to_csv(path, index=False)
+    else:
+        frame.to_json(path, orient="records", lines=True, force_ascii=False)
+
+
+@pytest.mark.parametrize("file_name", ["operations.xlsx", "operations.csv", "operations.ndjson"])
+def test_iter_transaction_chunks(transactions: pd.DataFrame, tmp_path: str, file_name: str) -> None:
+    """Этот тест проверяет, что фрагменты совпадают с полной таблицей"""
+    path = os.path.join(str(tmp_path), file_name)
+    _write(transactions, path)
+    chunks = list(iter_transaction_chunks(path, chunk_size=2))
+    assert [len(chunk) for chunk in chunks] == [2, 1]
+    result = concat_tables(chunks)
+    expected = to_transaction_table(transactions)
+    pd.testing.assert_series_equal(result["Дата операции"], expected["Дата операции"])
+    pd.testing.assert_series_equal(result["Сумма операции"], expected["Сумма операции"])
+    assert list(result["Номер карты"]) == list(expected["Номер карты"])
+
+
+def test_stream_rollup(transactions: pd.DataFrame, tmp_path: str) -> None:
+    """Этот тест проверяет, что куб по фрагментам совпадает с кубом по всей таблице"""
+    path = os.path.join(str(tmp_path), "operations.csv")
+    _write(transactions, path)
+    result = stream_rollup(path, chunk_size=1)
+    expected = DailyRollup.from_transactions(transactions)
+    pd.testing.assert_frame_equal(result.cube, expected.cube)
+
+
+def test_iter_transaction_chunks_bounded_memory(tmp_path: str) -> None:
+    """Этот тест проверяет, что пиковая память при потоковом чтении намного меньше полной загрузки файла"""
+    path = os.path.join(str(tmp_path), "operations.csv")
+    rows = 100_000
+    pd.DataFrame(
+        {
+            "Дата операции": ["31.12.2021 16:44:00"] * rows,
+            "Описание": [f"Магазин {i}" for i in range(rows)],
+            "Сумма операции": [-1.0] * rows,
+        }
+    ).to_csv(path, index=False)
+    next(iter_transaction_chunks(path, chunk_size=1_000))
+
+    tracemalloc.start()
+    to_transaction_table(pd.read_csv(path))
+    _, full_peak = tracemalloc.get_traced_memory()
+    tracemalloc.reset_peak()
+    for _ in iter_transaction_chunks(path, chunk_size=1_000):
+        pass
+    _, chunked_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    assert chunked_peak * 4 < full_peak
+
+
+def test_iter_transaction_chunks_unknown_format(tmp_path: str) -> None:
+    with pytest.raises(ValueError):
+        list(iter_transaction_chunks(os.path.join(str(tmp_path), "operations.txt")))
@@ -0,0 +1,67 @@
+import datetime
+import os
+
+import pandas as pd
+import pytest
+
+from src.streaming import iter_transaction_chunks
+from src.synthetic import CARDS, CATEGORY_PROFILES, generate_transactions, iter_synthetic_chunks, write_statement
+from src.transactions import CATEGORY, OPERATION_DATE, STATUS, to_transaction_table
+
+
+@pytest.fixture
+def transactions() -> pd.DataFrame:
+    """Эта фикстура возвращает синтетическую выписку на 20 000 строк"""
+    return generate_transactions(20_000, seed=1)
+
+
+def test_generate_transactions_is_deterministic(transactions: pd.DataFrame) -> None:
+    """Этот тест проверяет, что одинаковое зерно дает одинаковую выписку"""
+    pd.testing.assert_frame_equal(generate_transactions(20_000, seed=1), transactions)
+    assert not generate_transactions(20_000, seed=2).equals(transactions)
+
+
+def test_generate_transactions_schema(transactions: pd.DataFrame) -> None:
+    """Этот тест проверяет столбцы, типы и упорядоченность по дате"""
+    assert len(transactions) == 20_000
+    assert list(transactions.columns) == list(to_transaction_table(transactions).columns)
+    assert transactions[OPERATION_DATE].is_monotonic_increasing
+    assert transactions[OPERATION_DATE].min() >= pd.Timestamp(2018, 1, 1)
+    assert transactions[OPERATION_DATE].max() < pd.Timestamp(2022, 1, 1)
+    assert set(transactions["Номер карты"].dropna()) <= set(CARDS)
+
+
+def test_generate_transactions_shares(transactions: pd.DataFrame) -> None:
+    """Этот тест проверяет доли категорий и успешных операций"""
+    shares = transactions[CATEGORY].value_counts(normalize=True)
+    total = sum(profile.share for profile in CATEGORY_PROFILES)
+    for profile in CATEGORY_PROFILES:
+        assert shares.get(profile.name, 0.0) == pytest.approx(profile.share / total, abs=0.01)
+    assert (transactions[STATUS] == "OK").mean() > 0.98
+
+
+def test_iter_synthetic_chunks(transactions: pd.DataFrame) -> None:
+    """Этот тест проверяет, что фрагменты упорядочены и покрывают период"""
+    start, end = datetime.datetime(2021, 1, 1), datetime.datetime(2021, 7, 1)
+    chunks = list(iter_synthetic_chunks(2_500, seed=3, chunk_size=1_000, start=start, end=end))
+    assert [len(chunk) for chunk in chunks] == [1_000, 1_000, 500]
+    combined = pd.concat(chunks)
+    assert combined[OPERATION_DATE].is_monotonic_increasing
+    assert combined[OPERATION_DATE].min() >= start
+    assert combined[OPERATION_DATE].max() < end
+    with pytest.raises(ValueError):
+        next(iter_synthetic_chunks(10, chunk_size=0))
+
+
+@pytest.mark.parametrize("extension", [".csv", ".ndjson"])
+def test_write_statement_round_trip(tmp_path: str, extension: str) -> None:
+    """Этот тест проверяет, что сохраненная выписка читается как настоящая"""
+    transactions = generate_transactions(500, seed=4)
+    path = os.path.join(tmp_path, f"statement{extension}")
+    write_statement(transactions, path)
+    loaded = pd.concat(iter_transaction_chunks(path))
+    assert len(loaded) == len(transactions)
+    assert loaded[OPERATION_DATE].tolist() == transactions[OPERATION_DATE].tolist()
+    assert loaded["Сумма операции"].tolist() == pytest.approx(transactions["Сумма операции"].tolist())
+    with pytest.raises(ValueError):
+        write_statement(transactions, os.path.join(tmp_path, "statement.txt"))
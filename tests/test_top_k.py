@@ -0,0 +1,65 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.top_k import TopKTracker, top_k_positions, top_transactions, top_transactions_from_chunks
+from src.transactions import to_transaction_table
+
+
+@pytest.fixture
+def transactions() -> pd.DataFrame:
+    """Эта фикстура возвращает типизированную таблицу транзакций за два месяца"""
+    rng = np.random.default_rng(7)
+    size = 1000
+    dates = pd.Timestamp(2021, 11, 1) + pd.to_timedelta(rng.integers(0, 60 * 24, size), unit="h")
+    return to_transaction_table(
+        pd.DataFrame(
+            {
+                "Дата операции": dates,
+                "Номер карты": rng.choice(["*7197", "*4556", "*5091"], size),
+                "Сумма операции": rng.normal(-500.0, 1000.0, size).round(2),
+                "Категория": rng.choice(["Супермаркеты", "Каршеринг", "Переводы", "Фастфуд"], size),
+            }
+        )
+    )
+
+
+def test_top_k_positions() -> None:
+    """Этот тест проверяет порядок, выбор первых из равных и пропуски"""
+    values = [3.0, np.nan, 5.0, 3.0, 1.0, 3.0]
+    assert top_k_positions(values, 3).tolist() == [2, 0, 3]
+    assert top_k_positions(values, 10).tolist() == [2, 0, 3, 5, 4, 1]
+    assert top_k_positions(values, 0).tolist() == []
+
+
+def test_top_transactions_matches_nlargest(transactions: pd.DataFrame) -> None:
+    """Этот тест проверяет совпадение с nlargest"""
+    expected = transactions.nlargest(7, "Сумма операции")
+    pd.testing.assert_frame_equal(top_transactions(transactions, 7), expected)
+
+
+def test_top_transactions_by_card(transactions: pd.DataFrame) -> None:
+    """Этот тест проверяет отбор по каждой карте"""
+    top = top_transactions(transactions, 3, by="card")
+    for card, frame in top.groupby("Номер карты", observed=True):
+        expected = transactions[transactions["Номер карты"] == card].nlargest(3, "Сумма операции")
+        assert frame["Сумма операции"].tolist() == expected["Сумма операции"].tolist()
+
+
+def test_top_transactions_from_chunks(transactions: pd.DataFrame) -> None:
+    """Этот тест проверяет, что отбор по фрагментам совпадает с отбором по всей таблице"""
+    shuffled = transactions.sample(frac=1.0, random_state=1).reset_index(drop=True)
+    chunks = [chunk for _, chunk in shuffled.groupby(np.arange(len(shuffled)) // 128)]
+    tracker = top_transactions_from_chunks(chunks, k=4)
+    for grouping in ["all", "card", "category", "month"]:
+        expected = top_transactions(transactions, 4, by=grouping)
+        assert tracker.top(grouping)["Сумма операции"].tolist() == expected["Сумма операции"].tolist()
+    months = tracker.groups("month")
+    assert list(months) == ["2021-11", "2021-12"]
+    assert all(len(frame) == 4 for frame in months.values())
+
+
+def test_top_k_tracker_rejects_unknown_grouping() -> None:
+    """Этот тест проверяет ошибку для неизвестной группировки"""
+    with pytest.raises(ValueError):
+        TopKTracker(5, ["week"])
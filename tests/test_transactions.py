@@ -0,0 +1,81 @@
+import datetime
+from typing import Dict, List
+
+import pandas as pd
+import pytest
+
+from src.transactions import as_transaction_table, date_window, to_str_records, to_transaction_table
+
+
+@pytest.fixture
+def str_records() -> List[Dict[str, str]]:
+    """Эта фикстура возвращает транзакции, в которых все значения — строки"""
+    records = [
+        {
+            "Дата операции": "31.12.2021 16:44:00",
+            "Номер карты": "*7197",
+            "Статус": "OK",
+            "Сумма операции": "-160.89",
+            "Валюта операции": "RUB",
+            "Категория": "Супермаркеты",
+            "MCC": "5411.0",
+        },
+        {
+            "Дата операции": "30.12.2021 10:00:00",
+            "Номер карты": "*4556",
+            "Статус": "FAILED",
+            "Сумма операции": "-50.0",
+            "Валюта операции": "RUB",
+            "Категория": "Каршеринг",
+            "MCC": "7512.0",
+        },
+    ]
+    return records * 500
+
+
+def test_to_transaction_table_types(str_records: List[Dict[str, str]]) -> None:
+    """Этот тест проверяет типы столбцов типизированной таблицы"""
+    table = as_transaction_table(str_records)
+    assert pd.api.types.is_datetime64_any_dtype(table["Дата операции"])
+    assert table["Сумма операции"].dtype == "float64"
+    for column in ["Номер карты", "Статус", "Валюта операции", "Категория", "MCC"]:
+        assert isinstance(table[column].dtype, pd.CategoricalDtype)
+    assert table["Дата операции"].iloc[-1] == pd.Timestamp(2021, 12, 31, 16, 44)
+
+
+def test_to_transaction_table_sorted_by_date(str_records: List[Dict[str, str]]) -> None:
+    """Этот тест проверяет сортировку по дате операции и индекс дат"""
+    frame = pd.DataFrame(str_records)
+    table = to_transaction_table(frame)
+    assert table.index.is_monotonic_increasing
+    assert (table.index == table["Дата операции"]).all()
+    assert frame["Дата операции"].iloc[0] == "31.12.2021 16:44:00"
+
+
+def test_date_window(str_records: List[Dict[str, str]]) -> None:
+    """Этот тест проверяет выбор транзакций за полуинтервал дат"""
+    table = as_transaction_table(str_records)
+    window = date_window(table, datetime.datetime(2021, 12, 31), datetime.datetime(2022, 1, 1))
+    assert len(window) == 500
+    assert (window["Категория"] == "Супермаркеты").all()
+    assert date_window(table, datetime.datetime(2022, 1, 1), datetime.datetime(2022, 2, 1)).empty
+
+
+def test_to_transaction_table_is_idempotent(str_records: List[Dict[str, str]]) -> None:
+    """Этот тест проверяет, что повторное приведение не создает новую таблицу"""
+    table = as_transaction_table(str_records)
+    assert to_transaction_table(table) is table
+
+
+def test_to_transaction_table_memory(str_records: List[Dict[str, str]]) -> None:
+    """Этот тест проверяет, что типизированная таблица занимает в несколько раз меньше памяти"""
+    str_frame = pd.DataFrame(str_records)
+    table = to_transaction_table(str_frame)
+    assert table.memory_usage(deep=True).sum() * 3 < str_frame.memory_usage(deep=True).sum()
+
+
+def test_to_str_records(str_records: List[Dict[str, str]]) -> None:
+    """Этот тест проверяет, что даты выводятся в формате выписки"""
+    records = to_str_records(as_transaction_table(str_records[:1]))
+    assert records[0]["Дата операции"] == "31.12.2021 16:44:00"
+    assert records[0]["Сумма операции"] == "-160.89"
@@ -33,9 +33,24 @@ def test_get_cards(mock_data: Dict[str, List[Dict[str, str]]]) -> None:
     assert result == []
 
 
+def test_get_cards_from_transactions() -> None:
+    transactions = [
+        {"Номер карты": "*7197", "Статус": "OK", "Сумма операции": "-160.89", "Кэшбэк": "2.0"},
+        {"Номер карты": "*7197", "Статус": "FAILED", "Сумма операции": "-50.0", "Кэшбэк": ""},
+        {"Номер карты": "*4556", "Статус": "OK", "Сумма операции": "-300.0", "Кэшбэк": "3.0"},
+        {"Номер карты": "*4556", "Статус": "OK", "Сумма операции": "1000.0", "Кэшбэк": ""},
+        {"Номер карты": "", "Статус": "OK", "Сумма операции": "-10.0", "Кэшбэк": ""},
+    ]
+    result = get_cards({"transactions": transactions})
+    assert result == [
+        {"last_digits": "4556", "total_spent": 300.0, "cashback": 3.0, "transactions": 2},
+        {"last_digits": "7197", "total_spent": 160.89, "cashback": 2.0, "transactions": 2},
+    ]
+
+
 def test_get_top_transactions(mock_data: Dict[str, List[Dict[str, str]]]) -> None:
     mock_data["transactions"][0]["Сумма операции"] = "100.0"
-    result = get_top_transactions(mock_data)
+    result = get_top_transactions({"transactions": mock_data["transactions"]})
     assert len(result) == 2
     assert result[0]["category"] == "Food"
     assert result[0]["amount"] == "100.0"
@@ -0,0 +1,66 @@
+import json
+import os
+import stat
+
+import pandas as pd
+import pytest
+
+from src.reports import save_report_to_file
+from src.writers import FILE_MODE, write_report, write_reports
+
+
+@pytest.fixture
+def report() -> pd.DataFrame:
+    return pd.DataFrame(
+        {
+            "Категория": ["Каршеринг", "Супермаркеты", "Фастфуд"],
+            "Сумма операции": [-100.5, float("nan"), -3.0],
+            "Число операций": [1, 2, 3],
+            "Дата": pd.to_datetime(["2022-03-01", "2022-03-02", "NaT"]),
+        }
+    )
+
+
+def test_write_json_matches_records(report: pd.DataFrame, tmp_path: str) -> None:
+    """Этот тест проверяет, что JSON записывается списком записей по фрагментам"""
+    path = write_report(report, "report.json", output_dir=str(tmp_path), chunk_rows=2)
+    with open(path, encoding="utf-8") as f:
+        records = json.load(f)
+    assert records == [
+        {"Категория": "Каршеринг", "Сумма операции": -100.5, "Число операций": 1, "Дата": "2022-03-01T00:00:00"},
+        {"Категория": "Супермаркеты", "Сумма операции": None, "Число операций": 2, "Дата": "2022-03-02T00:00:00"},
+        {"Категория": "Фастфуд", "Сумма операции": -3.0, "Число операций": 3, "Дата": None},
+    ]
+    assert os.listdir(str(tmp_path)) == ["report.json"]
+
+
+def test_write_ndjson_and_csv(report: pd.DataFrame, tmp_path: str) -> None:
+    """Этот тест проверяет форматы NDJSON и CSV"""
+    paths = write_reports({"report.ndjson": report, "report.csv": report}, output_dir=str(tmp_path), chunk_rows=2)
+    with open(paths["report.ndjson"], encoding="utf-8") as f:
+        assert [json.loads(line)["Число операций"] for line in f] == [1, 2, 3]
+    restored = pd.read_csv(paths["report.csv"])
+    assert restored["Категория"].tolist() == report["Категория"].tolist()
+    assert restored["Число операций"].tolist() == [1, 2, 3]
+
+
+def test_write_reports_is_all_or_nothing(report: pd.DataFrame, tmp_path: str) -> None:
+    """Этот тест проверяет, что при ошибке ни один файл не появляется"""
+    with pytest.raises(ValueError):
+        write_reports({"first.json": report, "second.xml": report}, output_dir=str(tmp_path))
+    assert os.listdir(str(tmp_path)) == []
+
+
+def test_save_report_to_file_uses_reports_dir(
+    report: pd.DataFrame, tmp_path: str, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Этот тест проверяет, что отчет сохраняется в каталог отчетов из настроек"""
+    monkeypatch.setattr("src.writers.REPORTS_DIR", str(tmp_path))
+    save_report_to_file(report, "spending.csv")
+    assert os.listdir(str(tmp_path)) == ["spending.csv"]
+
+
+def test_write_report_uses_default_file_mode(report: pd.DataFrame, tmp_path: str) -> None:
+    """Этот тест проверяет, что отчет создается с правами по umask, а не 0600 временного файла"""
+    path = write_report(report, "report.csv", output_dir=str(tmp_path))
+    assert stat.S_IMODE(os.stat(path).st_mode) == FILE_MODE